@@ -1,9 +1,11 @@
 from aws_cdk import (
     aws_apigateway,
+    aws_dynamodb,
     aws_iam,
     aws_lambda,
     CfnOutput,
     Duration,
+    RemovalPolicy,
     Stack,
     Tags,
 )
@@ -21,6 +23,19 @@ class InfraStack(Stack):
         Tags.of(self).add("Environment", env_name)
         Tags.of(self).add("ManagedBy", "CDK")
 
+        # Shared tier of the summary cache (see services/summary_cache.py)
+        cache_table = aws_dynamodb.Table(
+            self,
+            id="SummaryCacheTable",
+            table_name=f"{env_name}-text-summary-cache-{self.account}",
+            partition_key=aws_dynamodb.Attribute(
+                name="cache_key", type=aws_dynamodb.AttributeType.STRING
+            ),
+            billing_mode=aws_dynamodb.BillingMode.PAY_PER_REQUEST,
+            time_to_live_attribute="expires_at",
+            removal_policy=RemovalPolicy.DESTROY,  # Only holds cached summaries
+        )
+
         summary_lambda = aws_lambda.Function(
             self,
             id="SummaryLambda",
@@ -33,9 +48,16 @@ class InfraStack(Stack):
             retry_attempts=0,
             environment={
                 "LOG_LEVEL": "INFO",
+                "SUMMARY_CACHE_TABLE": cache_table.table_name,
+                "SUMMARY_CACHE_TTL_SECONDS": "86400",
+                "SUMMARY_CACHE_MAX_ENTRIES": "256",
+                "SUMMARY_BATCH_CONCURRENCY": "4",
+                "SUMMARY_BATCH_MAX_ITEMS": "20",
             },
         )
 
+        cache_table.grant_read_write_data(summary_lambda)
+
         summary_lambda.add_to_role_policy(
             aws_iam.PolicyStatement(
                 effect=aws_iam.Effect.ALLOW,
@@ -121,6 +143,52 @@ class InfraStack(Stack):
             allow_methods=["POST", "OPTIONS"],
             allow_headers=["Content-Type", "x-api-key"],
         )
+        # POST /text/batch - list of {"text", "points"} summarized concurrently
+        batch_resource = text_resource.add_resource("batch")
+        batch_request_model = api.add_model(
+            id="SummaryBatchRequestModel",
+            content_type="application/json",
+            model_name="SummaryBatchRequest",
+            schema=aws_apigateway.JsonSchema(
+                schema=aws_apigateway.JsonSchemaVersion.DRAFT4,
+                type=aws_apigateway.JsonSchemaType.OBJECT,
+                properties={
+                    "items": aws_apigateway.JsonSchema(
+                        type=aws_apigateway.JsonSchemaType.ARRAY,
+                        min_items=1,
+                        max_items=20,  # Keep in sync with SUMMARY_BATCH_MAX_ITEMS
+                        items=aws_apigateway.JsonSchema(
+                            type=aws_apigateway.JsonSchemaType.OBJECT,
+                            properties={
+                                "text": aws_apigateway.JsonSchema(
+                                    type=aws_apigateway.JsonSchemaType.STRING,
+                                    min_length=1,
+                                    max_length=5000,
+                                ),
+                                "points": aws_apigateway.JsonSchema(
+                                    type=aws_apigateway.JsonSchemaType.INTEGER,
+                                    minimum=1,
+                                ),
+                            },
+                            required=["text", "points"],
+                        ),
+                    ),
+                },
+                required=["items"],
+            ),
+        )
+        batch_resource.add_method(
+            "POST",
+            summary_integration,
+            api_key_required=True,
+            request_models={"application/json": batch_request_model},
+            request_validator=request_validator,
+        )
+        batch_resource.add_cors_preflight(
+            allow_origins=["*"],
+            allow_methods=["POST", "OPTIONS"],
+            allow_headers=["Content-Type", "x-api-key"],
+        )
         deployment = aws_apigateway.Deployment(
             self,
             id="SummaryApiDeployment",
@@ -128,6 +196,7 @@ class InfraStack(Stack):
             description="Deployment for Text Summary API with API Key",
         )
         deployment.node.add_dependency(text_resource)
+        deployment.node.add_dependency(batch_resource)
         CfnOutput(
             self,
             id="ApiKeyId",
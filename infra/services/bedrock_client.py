@@ -0,0 +1,313 @@
+"""Shared Bedrock runtime invocation layer.
+
+Every caller goes through one `invoke(model_id, payload)` API instead of
+creating its own `boto3.client("bedrock-runtime")`, so all calls share:
+
+- one botocore client per region with a connection pool sized for
+  concurrent callers (the botocore default is 10 connections)
+- a token bucket per model ID that paces calls to the model's quota. It is
+  adaptive: a throttled call halves the model's rate and successes raise it
+  back, so concurrent callers slow down together instead of each retrying on
+  its own and re-triggering the throttling
+- retries with jittered exponential backoff of throttled calls and of
+  transient failures (connection errors, timeouts, 5xx responses); only
+  throttling slows the model's bucket down. botocore's own retries are
+  turned off on this client so the two don't multiply.
+
+Code that hands a client to a library calling the SDK itself (LangChain)
+bypasses the wrapper, so it gets `get_runtime_client()` instead: the same
+pool size with botocore's standard retries left on.
+
+Limits are per process: on Lambda every container paces itself, so set the
+rates to the account quota divided by the expected concurrency.
+
+Configuration (environment variables):
+- BEDROCK_MAX_POOL_CONNECTIONS  (default 50)
+- BEDROCK_RATE_LIMITS  per-model requests/second, e.g.
+  "amazon.titan-text-express-v1=5,amazon.titan-image-generator-v1=1"
+- BEDROCK_DEFAULT_RATE  requests/second for other models (default 10, 0 = no limit)
+- BEDROCK_MAX_RETRIES  (default 6)
+
+The Lambda bundles are deployed flat and ship byte-identical copies of this
+module as `bedrock_client.py` (infra/services, infra_images/services);
+tests/unit/test_shared_modules.py in infra checks they stay in sync.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from typing import Callable, Iterator, Optional, Union
+
+from botocore.exceptions import (
+    BotoCoreError,
+    ClientError,
+    ConnectionClosedError,
+    ConnectTimeoutError,
+    EndpointConnectionError,
+    ReadTimeoutError,
+)
+
+
+THROTTLING_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "ModelNotReadyException",
+}
+
+# Failures worth retrying as is: the request never got a (non-5xx) answer
+TRANSIENT_ERRORS = (
+    ConnectionClosedError,
+    ConnectTimeoutError,
+    EndpointConnectionError,
+    ReadTimeoutError,
+)
+TRANSIENT_ERROR_CODES = {"InternalServerException", "InternalFailure"}
+
+Payload = Union[dict, str, bytes]
+
+
+def is_throttling_error(error: Exception) -> bool:
+    return (
+        isinstance(error, ClientError)
+        and error.response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+    )
+
+
+def is_transient_error(error: Exception) -> bool:
+    if isinstance(error, ClientError):
+        code = error.response.get("Error", {}).get("Code")
+        status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        return code in TRANSIENT_ERROR_CODES or status >= 500
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+def parse_rate_limits(value: str) -> dict[str, float]:
+    """'model-a=5,model-b=0.5' -> {'model-a': 5.0, 'model-b': 0.5}"""
+    limits = {}
+    for item in value.split(","):
+        if item.strip():
+            model_id, rate = item.rsplit("=", 1)
+            limits[model_id.strip()] = float(rate)
+    return limits
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with an adaptive rate.
+
+    `acquire` reserves a token and sleeps until it is due, so waiting callers
+    are served in order at `rate` per second after an initial `burst`.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        min_rate: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.min_rate = min_rate if min_rate is not None else rate / 16
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Take one token, waiting for it if needed; returns the time waited."""
+        with self._lock:
+            self._refill(self.clock())
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    def on_throttle(self) -> None:
+        with self._lock:
+            self._refill(self.clock())
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def on_success(self) -> None:
+        with self._lock:
+            # Additive increase: recover ~1/10 of the configured rate per call
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+
+
+class BedrockClient:
+    """Rate-limited, retrying wrapper around a bedrock-runtime client."""
+
+    def __init__(
+        self,
+        client=None,
+        region_name: Optional[str] = None,
+        max_pool_connections: int = 50,
+        rate_limits: Optional[dict[str, float]] = None,
+        default_rate: float = 10.0,
+        max_retries: int = 6,
+        base_delay: float = 0.2,
+        max_delay: float = 20.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if client is None:
+            client = new_runtime_client(
+                region_name, max_pool_connections, max_attempts=1
+            )
+        self.client = client
+        self.rate_limits = rate_limits or {}
+        self.default_rate = default_rate
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+        self._buckets: dict[str, Optional[TokenBucket]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, region_name: Optional[str] = None) -> "BedrockClient":
+        return cls(
+            region_name=region_name,
+            max_pool_connections=int(os.getenv("BEDROCK_MAX_POOL_CONNECTIONS", "50")),
+            rate_limits=parse_rate_limits(os.getenv("BEDROCK_RATE_LIMITS", "")),
+            default_rate=float(os.getenv("BEDROCK_DEFAULT_RATE", "10")),
+            max_retries=int(os.getenv("BEDROCK_MAX_RETRIES", "6")),
+        )
+
+    def limiter(self, model_id: str) -> Optional[TokenBucket]:
+        """The model's token bucket (None when the model is not rate limited)."""
+        with self._lock:
+            if model_id not in self._buckets:
+                rate = self.rate_limits.get(model_id, self.default_rate)
+                self._buckets[model_id] = (
+                    TokenBucket(rate, sleep=self.sleep) if rate > 0 else None
+                )
+            return self._buckets[model_id]
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full jitter: uniform in [0, base * 2**attempt], capped at max_delay."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def _call(self, operation: str, model_id: str, payload: Payload):
+        body = json.dumps(payload) if isinstance(payload, dict) else payload
+        bucket = self.limiter(model_id)
+        for attempt in range(self.max_retries + 1):
+            if bucket is not None:
+                bucket.acquire()
+            try:
+                response = getattr(self.client, operation)(
+                    modelId=model_id,
+                    body=body,
+                    accept="application/json",
+                    contentType="application/json",
+                )
+            except (ClientError, BotoCoreError) as e:
+                throttled = is_throttling_error(e)
+                if not (throttled or is_transient_error(e)):
+                    raise
+                if attempt == self.max_retries:
+                    raise
+                if throttled and bucket is not None:
+                    bucket.on_throttle()
+                self.sleep(self.backoff_delay(attempt))
+                continue
+            if bucket is not None:
+                bucket.on_success()
+            return response
+
+    def invoke_raw(self, model_id: str, payload: Payload) -> dict:
+        """InvokeModel response, with the body left unread for streaming decode."""
+        return self._call("invoke_model", model_id, payload)
+
+    def invoke(self, model_id: str, payload: Payload) -> dict:
+        """Invoke a model and return its decoded JSON response body."""
+        response = self.invoke_raw(model_id, payload)
+        return json.loads(response["body"].read())
+
+    def invoke_stream(self, model_id: str, payload: Payload) -> Iterator[dict]:
+        """
+        Yield the decoded chunks of InvokeModelWithResponseStream.
+
+        Only starting the stream is retried. Closing the generator closes the
+        response stream, which stops the generation.
+        """
+        response = self._call("invoke_model_with_response_stream", model_id, payload)
+        events = response["body"]
+        try:
+            for event in events:
+                chunk = event.get("chunk")
+                if chunk:
+                    yield json.loads(chunk["bytes"])
+        finally:
+            events.close()
+
+
+def new_runtime_client(
+    region_name: Optional[str] = None,
+    max_pool_connections: int = 50,
+    max_attempts: Optional[int] = None,
+):
+    """
+    A botocore bedrock-runtime client. `max_attempts=None` keeps the standard
+    retry mode's default attempts; 1 turns SDK retries off.
+    """
+    # Imported here so importing this module stays cheap (cold starts)
+    import boto3
+    from botocore.config import Config
+
+    retries = {"mode": "standard"}
+    if max_attempts is not None:
+        retries["total_max_attempts"] = max_attempts
+    return boto3.client(
+        service_name="bedrock-runtime",
+        region_name=region_name,
+        config=Config(max_pool_connections=max_pool_connections, retries=retries),
+    )
+
+
+_clients: dict[Optional[str], BedrockClient] = {}
+_runtime_clients: dict[Optional[str], object] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(region_name: Optional[str] = None) -> BedrockClient:
+    """The process-wide client for a region (AWS_REGION by default)."""
+    region_name = region_name or os.getenv("AWS_REGION")
+    with _clients_lock:
+        if region_name not in _clients:
+            _clients[region_name] = BedrockClient.from_env(region_name)
+        return _clients[region_name]
+
+
+def get_runtime_client(region_name: Optional[str] = None):
+    """
+    The process-wide plain client for a region, with botocore's standard
+    retries, for libraries (LangChain) that call the SDK themselves.
+    """
+    region_name = region_name or os.getenv("AWS_REGION")
+    with _clients_lock:
+        if region_name not in _runtime_clients:
+            _runtime_clients[region_name] = new_runtime_client(
+                region_name,
+                int(os.getenv("BEDROCK_MAX_POOL_CONNECTIONS", "50")),
+            )
+        return _runtime_clients[region_name]
+
+
+def invoke(model_id: str, payload: Payload) -> dict:
+    return get_client().invoke(model_id, payload)
+
+
+def invoke_stream(model_id: str, payload: Payload) -> Iterator[dict]:
+    return get_client().invoke_stream(model_id, payload)
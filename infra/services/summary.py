@@ -1,7 +1,44 @@
-import boto3
 import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Optional
 
-client = boto3.client(service_name="bedrock-runtime", region_name="eu-west-3")
+from botocore.exceptions import ClientError
+
+import bedrock_client
+import metrics
+from summary_cache import build_cache_from_env, make_cache_key
+
+MODEL_ID = "amazon.titan-text-express-v1"
+
+# Batch mode: cap parallel Bedrock calls to stay within throttling limits
+BATCH_CONCURRENCY = int(os.environ.get("SUMMARY_BATCH_CONCURRENCY", "4"))
+BATCH_MAX_ITEMS = int(os.environ.get("SUMMARY_BATCH_MAX_ITEMS", "20"))
+# Items still running this long into a batch get a timeout error, so a full
+# batch answers before API Gateway's 29 s limit instead of failing as a whole
+BATCH_DEADLINE_SECONDS = float(os.environ.get("SUMMARY_BATCH_DEADLINE_SECONDS", "25"))
+
+# Created on first use rather than at import to keep cold starts short. Module
+# level so warm invocations reuse them (and the cache's in-process tier)
+bedrock = None
+cache = None
+_init_lock = threading.Lock()
+
+
+def get_bedrock() -> bedrock_client.BedrockClient:
+    global bedrock
+    if bedrock is None:
+        bedrock = bedrock_client.get_client("eu-west-3")
+    return bedrock
+
+
+def get_cache():
+    global cache
+    with _init_lock:
+        if cache is None:
+            cache = build_cache_from_env()
+    return cache
 
 
 def get_config(text: str, points: int) -> str:
@@ -19,28 +56,151 @@ def get_config(text: str, points: int) -> str:
     )
 
 
+def summarize(
+    text: str, points: int, abandoned: Optional[threading.Event] = None
+) -> tuple[str, bool]:
+    """
+    Return the summary and whether it was served from the cache.
+
+    Once `abandoned` is set (a batch gave up waiting for this call), the model
+    is no longer invoked and a late result is not cached.
+
+    The summary is generated in one InvokeModel call rather than streamed: the
+    Python runtime behind API Gateway buffers the whole response, so streaming
+    would not get the first tokens to the client any sooner. That needs a
+    streaming-capable front (e.g. a function URL in RESPONSE_STREAM mode).
+    """
+    config = get_config(text, points)
+    cache_key = make_cache_key(MODEL_ID, config)
+    with metrics.span("CacheLookup"):
+        cached = get_cache().get(cache_key)
+    metrics.add("CacheHit", int(cached is not None))
+    if cached is not None:
+        return cached, True
+
+    if abandoned is not None and abandoned.is_set():
+        raise TimeoutError("Abandoned before invoking the model")
+    metrics.set_property("ModelId", MODEL_ID)
+    metrics.add("BedrockRequestBytes", len(config), "Bytes")
+    with metrics.span("InvokeModel"):
+        response_body = get_bedrock().invoke(MODEL_ID, config)
+    result = response_body.get("results")[0]
+    metrics.add("InputTokens", response_body.get("inputTextTokenCount"))
+    metrics.add("OutputTokens", result.get("tokenCount"))
+    result = result.get("outputText")
+    if abandoned is not None and abandoned.is_set():
+        # Finished after its batch answered, possibly in a later invocation
+        # that thawed this thread: don't let it write there
+        return result, False
+    with metrics.span("CacheStore"):
+        get_cache().set(cache_key, result)
+    return result, False
+
+
+def summarize_batch(
+    items: list[dict],
+    concurrency: int = BATCH_CONCURRENCY,
+    timeout: Optional[float] = None,
+) -> list[dict]:
+    """
+    Summarize every {"text", "points"} item with at most `concurrency`
+    Bedrock calls in flight. Results keep the input order; a failing item
+    gets an {"error": ...} entry instead of failing the whole batch, and an
+    item not done within `timeout` seconds gets {"error": "Timeout"}.
+
+    Items past the deadline are abandoned: queued ones never start, and
+    running ones neither invoke the model nor write to the cache from then
+    on. A Bedrock request already in flight can't be interrupted, though.
+    Lambda freezes it with the container, and it completes (with the
+    client's retries and rate-limit tokens) when a later invocation thaws
+    it. The abandoned calls are counted as BatchAbandoned.
+    """
+
+    def summarize_item(item: dict) -> dict:
+        text = item.get("text") if isinstance(item, dict) else None
+        points = item.get("points") if isinstance(item, dict) else None
+        if not text or not points:
+            return {"error": "Missing text or points"}
+        try:
+            summary, _ = summarize(text, points, abandoned)
+            return {"summary": summary}
+        except ClientError as e:
+            return {"error": e.response.get("Error", {}).get("Code", "AWS error")}
+        except Exception:
+            return {"error": "Unexpected internal error"}
+
+    if not items:
+        return []
+    abandoned = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(items))))
+    try:
+        worker = metrics.propagate(summarize_item)
+        futures = [pool.submit(worker, item) for item in items]
+        wait(futures, timeout=timeout)
+        timed_out = sum(not future.done() for future in futures)
+        if timed_out:
+            abandoned.set()
+            metrics.add("BatchTimeouts", timed_out)
+            metrics.add("BatchAbandoned", sum(f.running() for f in futures))
+        return [
+            future.result() if future.done() else {"error": "Timeout"}
+            for future in futures
+        ]
+    finally:
+        # Don't wait for calls past the deadline; queued items never start
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def batch_handler(event, context):
+    with metrics.span("ParseRequest"):
+        body = json.loads(event["body"])
+    items = body.get("items")
+    if not isinstance(items, list) or not items:
+        status, payload = 400, {"error": "Missing items"}
+    elif len(items) > BATCH_MAX_ITEMS:
+        status, payload = 400, {"error": f"At most {BATCH_MAX_ITEMS} items per batch"}
+    else:
+        metrics.add("BatchItems", len(items))
+        timeout = BATCH_DEADLINE_SECONDS
+        if hasattr(context, "get_remaining_time_in_millis"):
+            # Leave a second to serialize the response before Lambda times out
+            remaining = context.get_remaining_time_in_millis() / 1000 - 1
+            timeout = min(timeout, max(0.0, remaining))
+        results = summarize_batch(items, timeout=timeout)
+        status, payload = 200, {"results": results}
+    return {
+        "statusCode": status,
+        "headers": {
+            "Content-Type": "application/json",
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Headers": "Content-Type,x-api-key",
+        },
+        "body": json.dumps(payload),
+    }
+
+
 # Lambda handler
 # API Gateway event
+@metrics.instrument("summary")
 def handler(event, context):
-    body = json.loads(event["body"])
+    if event.get("path", "").endswith("/batch"):
+        metrics.set_property("Mode", "batch")
+        return batch_handler(event, context)
+
+    with metrics.span("ParseRequest"):
+        body = json.loads(event["body"])
     text = body.get("text")
-    points = event["queryStringParameters"]["points"]
+    query_params = event["queryStringParameters"]
+    points = query_params["points"]
     if text and points:
-        config = get_config(text, points)
-        response = client.invoke_model(
-            modelId="amazon.titan-text-express-v1",
-            body=config,
-            accept="application/json",
-            contentType="application/json",
-        )
-        response_body = json.loads(response.get("body").read())
-        result = response_body.get("results")[0].get("outputText")
+        result, cache_hit = summarize(text, points)
         return {
             "statusCode": 200,
             "headers": {
                 "Content-Type": "application/json",
                 "Access-Control-Allow-Origin": "*",
                 "Access-Control-Allow-Headers": "Content-Type,x-api-key",
+                "X-Cache": "HIT" if cache_hit else "MISS",
             },
             "body": json.dumps({"summary": result}),
         }
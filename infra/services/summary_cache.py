@@ -0,0 +1,24 @@
+"""Summary cache: the shared response cache (response_cache.py) configured
+for summaries, which are stored in the table's `summary` attribute.
+
+Configuration (environment variables):
+- SUMMARY_CACHE_MAX_ENTRIES: in-process LRU size (0 disables it, default 256)
+- SUMMARY_CACHE_TTL_SECONDS: TTL for both tiers (default one day)
+- SUMMARY_CACHE_TABLE: DynamoDB table for the shared tier (optional)
+"""
+
+import response_cache
+
+# Re-exported so callers import everything cache-related from here
+from response_cache import (  # noqa: F401
+    DynamoDBCache,
+    LRUCache,
+    TieredCache,
+    make_cache_key,
+)
+
+
+def build_cache_from_env() -> TieredCache:
+    return response_cache.build_cache_from_env(
+        "SUMMARY_CACHE", value_attribute="summary", ttl_seconds=86400, max_entries=256
+    )
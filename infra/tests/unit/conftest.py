@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# Lambda code is deployed from services/ as a flat bundle, so its modules
+# import each other as top-level modules.
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "services"))
@@ -0,0 +1,129 @@
+import io
+import json
+
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError
+
+from bedrock_client import BedrockClient, TokenBucket, parse_rate_limits
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class FlakyBedrock:
+    """Throttles the first `throttles` calls, then returns a Titan response."""
+
+    def __init__(self, throttles: int = 0, code: str = "ThrottlingException"):
+        self.throttles = throttles
+        self.code = code
+        self.calls = []
+
+    def invoke_model(self, modelId, body, accept, contentType):
+        self.calls.append((modelId, json.loads(body)))
+        if len(self.calls) <= self.throttles:
+            raise ClientError({"Error": {"Code": self.code}}, "InvokeModel")
+        payload = {"results": [{"outputText": "ok"}]}
+        return {"body": io.BytesIO(json.dumps(payload).encode())}
+
+
+def test_token_bucket_paces_calls_after_the_burst():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=2, clock=clock, sleep=clock.sleep)
+
+    waits = [bucket.acquire() for _ in range(4)]
+
+    assert waits == [0.0, 0.0, 0.5, 0.5]
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_token_bucket_adapts_to_throttling():
+    bucket = TokenBucket(rate=8, min_rate=1)
+
+    for _ in range(5):
+        bucket.on_throttle()
+    assert bucket.rate == 1
+
+    for _ in range(20):
+        bucket.on_success()
+    assert bucket.rate == 8
+
+
+def test_invoke_retries_throttling_with_backoff():
+    clock = FakeClock()
+    fake = FlakyBedrock(throttles=2)
+    bedrock = BedrockClient(fake, default_rate=0, sleep=clock.sleep)
+
+    response = bedrock.invoke("model", {"inputText": "hi"})
+
+    assert response["results"][0]["outputText"] == "ok"
+    assert fake.calls == [("model", {"inputText": "hi"})] * 3
+    assert len(clock.slept) == 2
+    assert all(0 <= delay <= 0.4 for delay in clock.slept)
+
+
+def test_invoke_gives_up_after_max_retries():
+    fake = FlakyBedrock(throttles=10)
+    bedrock = BedrockClient(fake, max_retries=2, default_rate=0, sleep=lambda s: None)
+
+    with pytest.raises(ClientError):
+        bedrock.invoke("model", "{}")
+    assert len(fake.calls) == 3
+
+
+def test_invoke_does_not_retry_other_errors():
+    fake = FlakyBedrock(throttles=1, code="ValidationException")
+    bedrock = BedrockClient(fake, default_rate=0, sleep=lambda s: None)
+
+    with pytest.raises(ClientError):
+        bedrock.invoke("model", "{}")
+    assert len(fake.calls) == 1
+
+
+def test_invoke_retries_transient_errors_without_slowing_down():
+    calls = []
+
+    class Unreliable(FlakyBedrock):
+        def invoke_model(self, **kwargs):
+            calls.append(kwargs["modelId"])
+            if len(calls) == 1:
+                raise EndpointConnectionError(endpoint_url="https://bedrock")
+            if len(calls) == 2:
+                raise ClientError(
+                    {
+                        "Error": {"Code": "InternalServerException"},
+                        "ResponseMetadata": {"HTTPStatusCode": 500},
+                    },
+                    "InvokeModel",
+                )
+            return super().invoke_model(**kwargs)
+
+    bedrock = BedrockClient(
+        Unreliable(), rate_limits={"model": 4}, sleep=lambda s: None
+    )
+
+    assert bedrock.invoke("model", {})["results"][0]["outputText"] == "ok"
+    assert len(calls) == 3
+    assert bedrock.limiter("model").rate == 4
+
+
+def test_rate_limits_are_per_model():
+    bedrock = BedrockClient(FlakyBedrock(), rate_limits={"slow": 1}, default_rate=0)
+
+    assert bedrock.limiter("slow").rate == 1
+    assert bedrock.limiter("slow") is bedrock.limiter("slow")
+    assert bedrock.limiter("other") is None
+
+
+def test_parse_rate_limits():
+    assert parse_rate_limits("") == {}
+    assert parse_rate_limits("a=5, b.v1:0=0.5") == {"a": 5.0, "b.v1:0": 0.5}
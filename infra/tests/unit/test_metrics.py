@@ -0,0 +1,107 @@
+import json
+import threading
+
+import pytest
+
+import metrics
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_spans_are_recorded_in_milliseconds():
+    clock = FakeClock()
+    recorder = metrics.Metrics("summary", namespace="Test", clock=clock)
+
+    with recorder.span("InvokeModel"):
+        clock.now += 0.25
+    recorder.add("InputTokens", 42)
+    recorder.set_property("ModelId", "amazon.titan-text-express-v1")
+
+    line = recorder.to_emf(timestamp_ms=1000)
+    assert line["InvokeModel"] == 250.0
+    assert line["InputTokens"] == 42
+    assert line["ModelId"] == "amazon.titan-text-express-v1"
+    assert line["Handler"] == "summary"
+    assert line["_aws"] == {
+        "Timestamp": 1000,
+        "CloudWatchMetrics": [
+            {
+                "Namespace": "Test",
+                "Dimensions": [["Handler"]],
+                "Metrics": [
+                    {"Name": "InvokeModel", "Unit": "Milliseconds"},
+                    {"Name": "InputTokens", "Unit": "Count"},
+                ],
+            }
+        ],
+    }
+
+
+def test_repeated_phases_keep_every_value():
+    recorder = metrics.Metrics("image")
+    for size in (10, 20, 30):
+        recorder.add("ImageBytes", size, "Bytes")
+
+    assert recorder.to_emf()["ImageBytes"] == [10, 20, 30]
+
+
+def test_functions_are_no_ops_outside_an_invocation():
+    with metrics.span("Anything"):
+        metrics.add("Value", 1)
+        metrics.set_property("Key", "value")
+
+    assert metrics.current() is None
+
+
+def test_instrumented_handler_emits_one_line(capsys):
+    @metrics.instrument("summary")
+    def handler(event, context):
+        with metrics.span("InvokeModel"):
+            metrics.add("OutputTokens", 7)
+            metrics.add("Skipped", None)
+        return {"statusCode": 200, "body": "{}"}
+
+    handler({"body": '{"text": "hi"}'}, None)
+
+    (line,) = capsys.readouterr().out.splitlines()
+    emf = json.loads(line)
+    assert emf["StatusCode"] == 200
+    assert emf["OutputTokens"] == 7
+    assert emf["RequestBytes"] == len('{"text": "hi"}')
+    assert emf["ResponseBytes"] == 2
+    assert "Skipped" not in emf
+    assert emf["Total"] >= emf["InvokeModel"] >= 0
+
+
+def test_emits_even_when_the_handler_raises(capsys):
+    @metrics.instrument("summary")
+    def handler(event, context):
+        with metrics.span("InvokeModel"):
+            raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        handler({}, None)
+
+    emf = json.loads(capsys.readouterr().out)
+    assert "InvokeModel" in emf and "StatusCode" not in emf
+
+
+def test_propagate_records_from_worker_threads():
+    with metrics.invocation("summary") as recorder:
+
+        def work():
+            metrics.add("Calls", 1)
+
+        threads = [threading.Thread(target=metrics.propagate(work)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert recorder.values["Calls"] == [1, 1, 1]
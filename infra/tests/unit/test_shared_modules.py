@@ -0,0 +1,31 @@
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[3]
+
+# Modules each flat Lambda bundle ships its own copy of
+SHARED_COPIES = {
+    "bedrock_client": [
+        "src/bedrock/client.py",
+        "infra/services/bedrock_client.py",
+        "infra_images/services/bedrock_client.py",
+    ],
+    "metrics": [
+        "infra/services/metrics.py",
+        "infra_images/services/metrics.py",
+        "infra_auth_stack/services/metrics.py",
+    ],
+    "response_cache": [
+        "infra/services/response_cache.py",
+        "infra_images/services/response_cache.py",
+    ],
+}
+
+
+@pytest.mark.parametrize("name", sorted(SHARED_COPIES))
+def test_copies_are_identical(name):
+    original, *copies = SHARED_COPIES[name]
+    expected = (ROOT / original).read_bytes()
+    for copy in copies:
+        assert (ROOT / copy).read_bytes() == expected, f"{copy} differs from {original}"
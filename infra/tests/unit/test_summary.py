@@ -0,0 +1,147 @@
+import io
+import json
+import threading
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+import summary
+from bedrock_client import BedrockClient
+from summary_cache import LRUCache, TieredCache
+
+
+class FakeBedrock:
+    """Echoes the prompt back and records how many calls overlap."""
+
+    def __init__(self, fail_on: str = "") -> None:
+        self.fail_on = fail_on
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def invoke_model(self, modelId, body, accept, contentType):
+        prompt = json.loads(body)["inputText"]
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(0.01)
+            if self.fail_on and self.fail_on in prompt:
+                raise ClientError(
+                    {"Error": {"Code": "ThrottlingException"}}, "InvokeModel"
+                )
+            payload = {"results": [{"outputText": prompt[-5:]}]}
+            return {"body": io.BytesIO(json.dumps(payload).encode())}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def bedrock(monkeypatch):
+    fake = FakeBedrock(fail_on="boom")
+    monkeypatch.setattr(summary, "bedrock", BedrockClient(fake, max_retries=0))
+    monkeypatch.setattr(summary, "cache", TieredCache(LRUCache()))
+    return fake
+
+
+def test_batch_keeps_input_order_and_isolates_errors(bedrock):
+    items = [{"text": f"doc-{i}", "points": 2} for i in range(6)]
+    items[2] = {"text": "boom!", "points": 2}
+    items[4] = {"text": "", "points": 2}
+
+    results = summary.summarize_batch(items, concurrency=3)
+
+    assert [r.get("summary") for r in results] == [
+        "doc-0", "doc-1", None, "doc-3", None, "doc-5",
+    ]
+    assert results[2] == {"error": "ThrottlingException"}
+    assert results[4] == {"error": "Missing text or points"}
+    assert bedrock.max_in_flight <= 3
+
+
+def test_batch_handler_rejects_oversized_batches(bedrock, monkeypatch):
+    monkeypatch.setattr(summary, "BATCH_MAX_ITEMS", 2)
+    event = {
+        "path": "/text/batch",
+        "body": json.dumps({"items": [{"text": "a", "points": 1}] * 3}),
+    }
+
+    response = summary.handler(event, None)
+
+    assert response["statusCode"] == 400
+    assert bedrock.calls == 0
+
+
+def test_batch_returns_timeout_errors_for_unfinished_items(bedrock):
+    items = [{"text": f"doc-{i}", "points": 2} for i in range(50)]
+
+    # FakeBedrock takes 10 ms per call; one worker can't finish 50 in 0.1 s
+    results = summary.summarize_batch(items, concurrency=1, timeout=0.1)
+
+    assert results[0] == {"summary": "doc-0"}
+    assert results[-1] == {"error": "Timeout"}
+    assert len(results) == 50
+
+
+def test_item_finishing_after_the_batch_returned_is_not_cached(
+    bedrock, monkeypatch
+):
+    release, finished = threading.Event(), threading.Event()
+    invoke, summarize = bedrock.invoke_model, summary.summarize
+
+    def slow_invoke(**kwargs):
+        if "later" in json.loads(kwargs["body"])["inputText"]:
+            release.wait(5)
+        return invoke(**kwargs)
+
+    def tracked_summarize(text, points, abandoned=None):
+        try:
+            return summarize(text, points, abandoned)
+        finally:
+            if text == "later":
+                finished.set()
+
+    monkeypatch.setattr(bedrock, "invoke_model", slow_invoke)
+    monkeypatch.setattr(summary, "summarize", tracked_summarize)
+    items = [{"text": "quick", "points": 2}, {"text": "later", "points": 2}]
+    event = {"path": "/text/batch", "body": json.dumps({"items": items})}
+    monkeypatch.setattr(summary, "BATCH_DEADLINE_SECONDS", 0.2)
+
+    response = summary.handler(event, None)
+    results = json.loads(response["body"])["results"]
+    assert results == [{"summary": "quick"}, {"error": "Timeout"}]
+
+    # The abandoned call completes later, e.g. once a new invocation thaws it
+    release.set()
+    assert finished.wait(5)
+    assert len(summary.cache.tiers[0]) == 1
+    assert summarize("later", 2) == ("later", False)
+    assert bedrock.calls == 3
+
+
+def test_abandoned_item_does_not_invoke_the_model(bedrock):
+    abandoned = threading.Event()
+    abandoned.set()
+
+    with pytest.raises(TimeoutError):
+        summary.summarize("late", 2, abandoned)
+    assert bedrock.calls == 0
+
+
+def test_repeated_summary_is_served_from_cache(bedrock):
+    event = {
+        "body": json.dumps({"text": "same text"}),
+        "queryStringParameters": {"points": "3"},
+    }
+
+    first = summary.handler(event, None)
+    second = summary.handler(event, None)
+
+    assert first["headers"]["X-Cache"] == "MISS"
+    assert second["headers"]["X-Cache"] == "HIT"
+    assert json.loads(second["body"]) == json.loads(first["body"])
+    assert bedrock.calls == 1
@@ -0,0 +1,116 @@
+import json
+
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError
+
+from summary_cache import DynamoDBCache, LRUCache, TieredCache, make_cache_key
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_config(text: str, temperature: float = 0) -> str:
+    return json.dumps(
+        {
+            "inputText": text,
+            "textGenerationConfig": {"maxTokenCount": 4096, "temperature": temperature},
+        }
+    )
+
+
+def test_cache_key_is_stable_and_content_addressed():
+    config = make_config("Summarize this")
+    reordered = json.dumps(dict(reversed(list(json.loads(config).items()))))
+
+    assert make_cache_key("model-a", config) == make_cache_key("model-a", reordered)
+    assert make_cache_key("model-a", config) != make_cache_key("model-b", config)
+    assert make_cache_key("model-a", config) != make_cache_key(
+        "model-a", make_config("Summarize this", temperature=0.5)
+    )
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+
+    assert cache.get("a") == "1"
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
+    assert len(cache) == 2
+
+
+def test_lru_expires_entries():
+    clock = FakeClock()
+    cache = LRUCache(max_entries=2, ttl_seconds=60, clock=clock)
+    cache.set("a", "1")
+
+    clock.now += 61
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_tiered_cache_backfills_faster_tier():
+    local, shared = LRUCache(), LRUCache()
+    cache = TieredCache(local, shared)
+    shared.set("key", "summary")
+
+    assert cache.get("key") == "summary"
+    assert local.get("key") == "summary"
+
+    cache.set("other", "value")
+    assert local.get("other") == shared.get("other") == "value"
+
+
+class FakeDynamoDB:
+    def __init__(self, error: Exception = None) -> None:
+        self.items = {}
+        self.error = error
+
+    def get_item(self, TableName, Key):
+        if self.error:
+            raise self.error
+        item = self.items.get(Key["cache_key"]["S"])
+        return {"Item": item} if item else {}
+
+    def put_item(self, TableName, Item):
+        if self.error:
+            raise self.error
+        self.items[Item["cache_key"]["S"]] = Item
+
+
+def test_dynamodb_tier_stores_values_with_a_ttl():
+    clock = FakeClock()
+    client = FakeDynamoDB()
+    cache = DynamoDBCache(
+        "table", value_attribute="summary", ttl_seconds=60, client=client, clock=clock
+    )
+    cache.set("key", "summary")
+
+    assert client.items["key"]["summary"] == {"S": "summary"}
+    assert cache.get("key") == "summary"
+    clock.now += 61
+    assert cache.get("key") is None
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        ClientError(
+            {"Error": {"Code": "ProvisionedThroughputExceededException"}}, "GetItem"
+        ),
+        EndpointConnectionError(endpoint_url="https://dynamodb"),
+    ],
+)
+def test_dynamodb_tier_failures_are_cache_misses(error):
+    cache = DynamoDBCache("table", client=FakeDynamoDB(error))
+
+    cache.set("key", "summary")
+    assert cache.get("key") is None
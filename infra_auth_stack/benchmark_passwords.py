@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Password Hashing Cost Benchmark
+
+Picks the strongest cost parameters for each password hasher (Argon2id,
+scrypt, PBKDF2, see services/passwords.py) that still fit a target login
+latency and the memory of the auth Lambda, and prints the environment
+variables to configure them.
+
+Lambda CPU is proportional to memory (1769 MB = 1 vCPU), so a 256 MB function
+gets ~15% of a core. Hashing is single-threaded, so times measured here are
+divided by that share to estimate the Lambda latency. Run it with
+--no-cpu-scaling when running inside a function of the target size.
+
+Usage:
+    # Defaults: 250 ms target, 256 MB Lambda, half of it for hashing
+    python benchmark_passwords.py
+
+    python benchmark_passwords.py --target-ms 400 --lambda-memory-mb 512
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+# The hashers live in the Lambda bundle
+sys.path.insert(0, str(Path(__file__).resolve().parent / "services"))
+
+import passwords  # noqa: E402
+
+LAMBDA_MB_PER_VCPU = 1769
+BENCHMARK_PASSWORD = "correct horse battery staple"
+
+
+def measure_ms(hasher, samples: int) -> float:
+    """Median time of one hash, in milliseconds"""
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash(BENCHMARK_PASSWORD)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def largest_fitting(
+    build: Callable[[int], object],
+    costs: list[int],
+    estimate_ms: Callable[[object], float],
+    target_ms: float,
+) -> Optional[tuple[object, float]]:
+    """Highest cost in `costs` (ascending) whose estimated latency fits"""
+    best = None
+    for cost in costs:
+        hasher = build(cost)
+        latency = estimate_ms(hasher)
+        if latency > target_ms:
+            break
+        best = (hasher, latency)
+    return best
+
+
+def tune_argon2id(estimate_ms, target_ms: float, memory_budget_kib: int):
+    """Most memory that fits with t=1, then as many passes as still fit"""
+    memory_costs = []
+    memory_kib = 8 * 1024
+    while memory_kib <= memory_budget_kib:
+        memory_costs.append(memory_kib)
+        memory_kib *= 2
+    best = largest_fitting(
+        lambda m: passwords.Argon2idHasher(time_cost=1, memory_kib=m),
+        memory_costs,
+        estimate_ms,
+        target_ms,
+    )
+    if best is None:
+        return None
+    memory_kib = best[0].memory_kib
+    return largest_fitting(
+        lambda t: passwords.Argon2idHasher(time_cost=t, memory_kib=memory_kib),
+        list(range(1, 11)),
+        estimate_ms,
+        target_ms,
+    )
+
+
+def tune_scrypt(estimate_ms, target_ms: float, memory_budget_kib: int):
+    memory_fits = [
+        ln
+        for ln in range(12, 21)
+        if passwords.ScryptHasher(ln=ln).memory_bytes <= memory_budget_kib * 1024
+    ]
+    return largest_fitting(
+        lambda ln: passwords.ScryptHasher(ln=ln), memory_fits, estimate_ms, target_ms
+    )
+
+
+def tune_pbkdf2(estimate_ms, target_ms: float):
+    # Cost is linear in iterations: calibrate once, then verify the pick
+    probe = passwords.Pbkdf2Hasher(iterations=100_000)
+    per_iteration_ms = estimate_ms(probe) / 100_000
+    iterations = int(target_ms / per_iteration_ms) // 10_000 * 10_000
+    if iterations < 10_000:
+        return None
+    hasher = passwords.Pbkdf2Hasher(iterations=iterations)
+    return hasher, estimate_ms(hasher)
+
+
+def env_vars(hasher) -> dict:
+    if isinstance(hasher, passwords.Argon2idHasher):
+        return {
+            "PASSWORD_HASHER": hasher.scheme,
+            "ARGON2_TIME_COST": hasher.time_cost,
+            "ARGON2_MEMORY_KIB": hasher.memory_kib,
+            "ARGON2_PARALLELISM": hasher.parallelism,
+        }
+    if isinstance(hasher, passwords.ScryptHasher):
+        return {
+            "PASSWORD_HASHER": hasher.scheme,
+            "SCRYPT_LN": hasher.ln,
+            "SCRYPT_R": hasher.r,
+            "SCRYPT_P": hasher.p,
+        }
+    return {"PASSWORD_HASHER": hasher.scheme, "PBKDF2_ITERATIONS": hasher.iterations}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Tune password hashing cost for the auth Lambda"
+    )
+    parser.add_argument(
+        "--target-ms",
+        type=float,
+        default=250,
+        help="Latency budget for one hash on the Lambda (default 250)",
+    )
+    parser.add_argument(
+        "--lambda-memory-mb",
+        type=int,
+        default=256,
+        help="Memory size of the auth Lambda (default 256)",
+    )
+    parser.add_argument(
+        "--memory-fraction",
+        type=float,
+        default=0.5,
+        help="Share of the Lambda memory one hash may use (default 0.5)",
+    )
+    parser.add_argument(
+        "--samples", type=int, default=5, help="Timed runs per candidate"
+    )
+    parser.add_argument(
+        "--no-cpu-scaling",
+        action="store_true",
+        help="Don't scale timings by the Lambda CPU share (run inside Lambda)",
+    )
+    args = parser.parse_args()
+
+    cpu_share = min(1.0, args.lambda_memory_mb / LAMBDA_MB_PER_VCPU)
+    scale = 1.0 if args.no_cpu_scaling else 1 / cpu_share
+    memory_budget_kib = int(args.lambda_memory_mb * 1024 * args.memory_fraction)
+
+    def estimate_ms(hasher) -> float:
+        return measure_ms(hasher, args.samples) * scale
+
+    print(
+        f"\n⏱️  Target {args.target_ms:.0f} ms on a {args.lambda_memory_mb} MB Lambda "
+        f"(CPU share {cpu_share:.2f}, timings x{scale:.1f}), "
+        f"hash memory ≤ {memory_budget_kib // 1024} MiB\n"
+    )
+
+    results = []
+    if passwords.argon2 is not None:
+        results.append(tune_argon2id(estimate_ms, args.target_ms, memory_budget_kib))
+    else:
+        print("⚠️  argon2-cffi not installed, skipping Argon2id")
+    results.append(tune_scrypt(estimate_ms, args.target_ms, memory_budget_kib))
+    results.append(tune_pbkdf2(estimate_ms, args.target_ms))
+
+    print(f"{'Hasher':<16} {'Est. latency':>12} {'Memory':>10}  Parameters")
+    print("-" * 75)
+    for result in results:
+        if result is None:
+            continue
+        hasher, latency = result
+        params = {k: v for k, v in env_vars(hasher).items() if k != "PASSWORD_HASHER"}
+        memory = f"{hasher.memory_bytes // (1024 * 1024)} MiB"
+        print(f"{hasher.scheme:<16} {latency:>9.0f} ms {memory:>10}  {params}")
+
+    # Memory-hard schemes first, in order of preference
+    recommended = next((result for result in results if result is not None), None)
+    if recommended is None:
+        print("\n❌ No configuration fits the target, raise --target-ms")
+        return
+
+    print("\n✅ Recommended Lambda environment:")
+    for key, value in env_vars(recommended[0]).items():
+        print(f"   {key}={value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,18 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Environment variables read by services/passwords.py
+PASSWORD_HASHER_SETTINGS = (
+    "PASSWORD_HASHER",
+    "ARGON2_TIME_COST",
+    "ARGON2_MEMORY_KIB",
+    "ARGON2_PARALLELISM",
+    "SCRYPT_LN",
+    "SCRYPT_R",
+    "SCRYPT_P",
+    "PBKDF2_ITERATIONS",
+)
+
 
 class InfraAuthStackStack(Stack):
     """
@@ -89,11 +101,22 @@ class InfraAuthStackStack(Stack):
                 "JWT_SECRET": jwt_secret,
                 "JWT_EXPIRATION_HOURS": jwt_expiration,
                 "LOG_LEVEL": "INFO",
+                # 🔒 Password hashing: the defaults live in services/passwords.py
+                # (Argon2id at the OWASP minimum), shared with manage_users.py;
+                # only overrides set at deploy time are forwarded, e.g. values
+                # re-tuned for this memory size with benchmark_passwords.py
+                **{
+                    name: os.environ[name]
+                    for name in PASSWORD_HASHER_SETTINGS
+                    if os.environ.get(name)
+                },
             },
         )
 
         # Grant Lambda permission to read from DynamoDB
         users_table.grant_read_data(auth_lambda)
+        # Legacy/outdated password hashes are upgraded on login
+        users_table.grant(auth_lambda, "dynamodb:UpdateItem")
 
         # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
         # 🔄 PROXY LAMBDA - Forwards requests to existing APIs
@@ -133,6 +156,12 @@ class InfraAuthStackStack(Stack):
                 "IMAGE_API_KEY": image_api_key,
                 "TEXT_API_URL": text_api_url,
                 "TEXT_API_KEY": text_api_key,
+                # 🔌 Pooled HTTP transport (see services/http_pool.py)
+                "PROXY_POOL_MAXSIZE": "10",
+                "PROXY_CONNECT_TIMEOUT": "3.05",
+                "PROXY_READ_TIMEOUT": "28",  # Below the 30s Lambda timeout
+                # 🎟️ Validated JWT cache (see services/token_cache.py)
+                "TOKEN_CACHE_MAX_ENTRIES": "1024",
             },
         )
 
@@ -207,6 +236,25 @@ class InfraAuthStackStack(Stack):
             api_key_required=False,  # We use JWT instead of API keys!
         )
 
+        # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+        # 📍 ENDPOINTS: POST /proxy/image/jobs + GET /proxy/image/jobs/{job_id}
+        # (async image generation: submit a job, then poll its status)
+        # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+        image_jobs_proxy_resource = image_proxy_resource.add_resource("jobs")
+        image_jobs_proxy_resource.add_method(
+            "POST",
+            image_proxy_integration,
+            api_key_required=False,  # We use JWT instead!
+        )
+        image_job_proxy_resource = image_jobs_proxy_resource.add_resource(
+            "{job_id}"
+        )
+        image_job_proxy_resource.add_method(
+            "GET",
+            image_proxy_integration,
+            api_key_required=False,  # We use JWT instead!
+        )
+
         # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
         # 📍 ENDPOINT: POST /proxy/text (requires JWT in Authorization header)
         # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -219,6 +267,16 @@ class InfraAuthStackStack(Stack):
             api_key_required=False,  # We use JWT instead!
         )
 
+        # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+        # 📍 ENDPOINT: POST /proxy/text/batch (requires JWT in Authorization header)
+        # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+        text_batch_proxy_resource = text_proxy_resource.add_resource("batch")
+        text_batch_proxy_resource.add_method(
+            "POST",
+            text_proxy_integration,
+            api_key_required=False,  # We use JWT instead!
+        )
+
         # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
         # 🚀 FORCE API DEPLOYMENT
         # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -230,7 +288,10 @@ class InfraAuthStackStack(Stack):
         )
         deployment.node.add_dependency(login_resource)
         deployment.node.add_dependency(image_proxy_resource)
+        deployment.node.add_dependency(image_jobs_proxy_resource)
+        deployment.node.add_dependency(image_job_proxy_resource)
         deployment.node.add_dependency(text_proxy_resource)
+        deployment.node.add_dependency(text_batch_proxy_resource)
 
         # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
         # 📤 OUTPUTS - Important values after deployment
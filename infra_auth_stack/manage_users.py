@@ -8,23 +8,40 @@ Usage:
     # Add a user
     python manage_users.py add --username john_doe --password secret123 --email john@example.com
 
-    # List all users
-    python manage_users.py list
+    # List all users (parallel scan; table, csv or jsonl output)
+    python manage_users.py list --format csv --segments 8 > users.csv
+
+    # Bulk import users from a CSV or JSONL file
+    # (columns: username, password or password_hash, email)
+    python manage_users.py import --file users.csv
 
     # Delete a user
     python manage_users.py delete --username john_doe
 """
 
 import argparse
-import hashlib
 import boto3
+import csv
+import json
+import queue
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from botocore.config import Config
+from botocore.exceptions import ClientError
 
+# Same hashers as the auth Lambda (configured by the same PASSWORD_HASHER,
+# ARGON2_*/SCRYPT_*/PBKDF2_* environment variables)
+sys.path.insert(0, str(Path(__file__).resolve().parent / "services"))
 
-def hash_password(password: str) -> str:
-    """Hash a password using SHA-256"""
-    return hashlib.sha256(password.encode()).hexdigest()
+from passwords import hash_password  # noqa: E402
 
 
 def add_user(
@@ -39,56 +56,346 @@ def add_user(
     table = dynamodb.Table(table_name)
 
     try:
-        # Check if user already exists
-        response = table.get_item(Key={"username": username})
-        if "Item" in response:
-            print(f"❌ User '{username}' already exists!")
-            return
-
-        # Add new user
-        password_hash = hash_password(password)
         item = {
             "username": username,
-            "password_hash": password_hash,
+            "password_hash": hash_password(password),
             "created_at": datetime.utcnow().isoformat(),
         }
 
         if email:
             item["email"] = email
 
-        table.put_item(Item=item)
+        # One conditional write instead of a get followed by a put
+        table.put_item(
+            Item=item, ConditionExpression="attribute_not_exists(username)"
+        )
         print(f"✅ User '{username}' created successfully!")
         print(f"   Email: {email or 'N/A'}")
 
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            print(f"❌ User '{username}' already exists!")
+        else:
+            print(f"❌ Error adding user: {str(e)}")
     except Exception as e:
         print(f"❌ Error adding user: {str(e)}")
 
 
-def list_users(table_name: str, region: str = "us-west-2") -> None:
-    """List all users in the DynamoDB table"""
-    dynamodb = boto3.resource("dynamodb", region_name=region)
-    table = dynamodb.Table(table_name)
+# Attributes listed/exported (never the password hash)
+USER_FIELDS = ["username", "email", "created_at"]
+
+# Scanned users buffered for a slow consumer
+SCAN_QUEUE_SIZE = 1000
+# Users handed to one import worker at a time
+IMPORT_CHUNK_SIZE = 500
+# Import failures printed individually (the rest are only counted)
+MAX_REPORTED_FAILURES = 20
+# A throttled put that outlasts botocore's own retries is retried this many
+# more times, backing off from WRITE_RETRY_BASE_SECONDS, before it fails
+MAX_WRITE_ATTEMPTS = 8
+WRITE_RETRY_BASE_SECONDS = 0.5
+THROTTLING_CODES = {
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+}
+
+# Adaptive retries also slow the client down while the table throttles
+CLIENT_CONFIG = Config(retries={"mode": "adaptive", "max_attempts": 10})
+
+_local = threading.local()
+
+
+def _table(table_name: str, region: str):
+    # boto3 resources are not thread safe: one session per worker thread,
+    # reused by every chunk that thread writes
+    tables = getattr(_local, "tables", None)
+    if tables is None:
+        tables = _local.tables = {}
+    if (table_name, region) not in tables:
+        dynamodb = boto3.session.Session().resource(
+            "dynamodb", region_name=region, config=CLIENT_CONFIG
+        )
+        tables[table_name, region] = dynamodb.Table(table_name)
+    return tables[table_name, region]
 
-    try:
-        response = table.scan()
-        items = response.get("Items", [])
 
-        if not items:
-            print("📭 No users found in the table")
+def _put_with_retry(table, item: Dict[str, Any], condition: Dict[str, str]) -> None:
+    """put_item, retrying throttling errors with exponential backoff and jitter"""
+    for attempt in range(MAX_WRITE_ATTEMPTS):
+        try:
+            table.put_item(Item=item, **condition)
             return
-
-        print(f"\n👥 Found {len(items)} user(s):\n")
-        print(f"{'Username':<20} {'Email':<30} {'Created At':<25}")
-        print("-" * 75)
-
-        for item in items:
+        except ClientError as e:
+            code = e.response["Error"]["Code"]
+            if code not in THROTTLING_CODES or attempt == MAX_WRITE_ATTEMPTS - 1:
+                raise
+            time.sleep(WRITE_RETRY_BASE_SECONDS * 2**attempt * random.random())
+
+
+def scan_segment(
+    table_name: str, region: str, segment: int, total_segments: int
+) -> Iterator[Dict[str, Any]]:
+    """Yield every user of one scan segment, following LastEvaluatedKey"""
+    table = _table(table_name, region)
+    kwargs = {
+        "ProjectionExpression": ", ".join(f"#{f}" for f in USER_FIELDS),
+        "ExpressionAttributeNames": {f"#{f}": f for f in USER_FIELDS},
+        "Segment": segment,
+        "TotalSegments": total_segments,
+    }
+    while True:
+        response = table.scan(**kwargs)
+        yield from response.get("Items", [])
+        if "LastEvaluatedKey" not in response:
+            return
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def iter_users(
+    table_name: str, region: str = "us-west-2", segments: int = 4
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield every user, scanning `segments` parallel segments
+
+    Items are streamed through a bounded queue as pages arrive, so memory
+    stays flat however large the table is. Order is not guaranteed. A
+    consumer that stops early (closes the generator) stops the scanners too.
+    """
+    items: queue.Queue = queue.Queue(maxsize=SCAN_QUEUE_SIZE)
+    done = object()
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        # Never block for good on a full queue nobody reads any more
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def scan(segment: int) -> None:
+        try:
+            for item in scan_segment(table_name, region, segment, segments):
+                if not put(item):
+                    return
+        finally:
+            put(done)
+
+    with ThreadPoolExecutor(max_workers=segments) as executor:
+        futures = [executor.submit(scan, segment) for segment in range(segments)]
+        try:
+            remaining = segments
+            while remaining:
+                item = items.get()
+                if item is done:
+                    remaining -= 1
+                else:
+                    yield item
+        finally:
+            # Also on early exit, before the executor waits for the scanners
+            stop.set()
+        for future in futures:
+            future.result()  # re-raise scan errors
+
+
+def write_users(
+    users: Iterable[Dict[str, Any]], output_format: str, output: TextIO
+) -> int:
+    """Stream users to `output` as a table, CSV or JSONL; returns the count"""
+    count = 0
+    if output_format == "csv":
+        writer = csv.DictWriter(output, fieldnames=USER_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+    elif output_format == "table":
+        print(f"{'Username':<20} {'Email':<30} {'Created At':<25}", file=output)
+        print("-" * 75, file=output)
+
+    for item in users:
+        if output_format == "csv":
+            writer.writerow(item)
+        elif output_format == "jsonl":
+            output.write(json.dumps(item, default=str) + "\n")
+        else:
             username = item.get("username", "N/A")
             email = item.get("email", "N/A")
             created_at = item.get("created_at", "N/A")
-            print(f"{username:<20} {email:<30} {created_at:<25}")
+            print(f"{username:<20} {email:<30} {created_at:<25}", file=output)
+        count += 1
+    return count
+
+
+def list_users(
+    table_name: str,
+    region: str = "us-west-2",
+    segments: int = 4,
+    output_format: str = "table",
+    output: TextIO = sys.stdout,
+) -> None:
+    """List all users in the DynamoDB table"""
+    try:
+        count = write_users(
+            iter_users(table_name, region, segments), output_format, output
+        )
+        # Summary on stderr so csv/jsonl output stays machine-readable
+        if not count:
+            print("📭 No users found in the table", file=sys.stderr)
+        else:
+            print(f"\n👥 Found {count} user(s)", file=sys.stderr)
 
     except Exception as e:
-        print(f"❌ Error listing users: {str(e)}")
+        print(f"❌ Error listing users: {str(e)}", file=sys.stderr)
+
+
+def read_users(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream user records from a .csv or .jsonl file"""
+    with open(path, newline="") as file:
+        if path.endswith(".csv"):
+            for row in csv.DictReader(file):
+                yield {key: value for key, value in row.items() if value}
+        else:
+            for line in file:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        # Reported as a failed record rather than ending the import
+                        yield line.strip()
+
+
+def _prepare_item(record: Dict[str, Any]) -> Dict[str, Any]:
+    """DynamoDB item for an import record (hashes plain passwords)"""
+    if not isinstance(record, dict):
+        raise ValueError("not a JSON object")
+    username = str(record.get("username", "")).strip()
+    password_hash = record.get("password_hash") or (
+        hash_password(record["password"]) if record.get("password") else None
+    )
+    if not username or not password_hash:
+        raise ValueError("each user needs a username and a password/password_hash")
+    item = {
+        "username": username,
+        "password_hash": password_hash,
+        "created_at": record.get("created_at") or datetime.utcnow().isoformat(),
+    }
+    if record.get("email"):
+        item["email"] = record["email"]
+    return item
+
+
+def _prepare_record(
+    numbered: Tuple[int, Dict[str, Any]],
+) -> Tuple[int, Optional[Dict[str, Any]], Optional[str]]:
+    """Process pool worker: (record number, item or None, error or None)"""
+    number, record = numbered
+    try:
+        return number, _prepare_item(record), None
+    except Exception as e:
+        return number, None, str(e)
+
+
+def _import_chunk(
+    table_name: str,
+    region: str,
+    items: List[Tuple[int, Dict[str, Any]]],
+    overwrite: bool,
+) -> Tuple[int, int, List[Tuple[int, str]]]:
+    """
+    Write one chunk of (record number, item) pairs one conditional put at a
+    time, retrying throttled puts; returns (written, skipped, failures)
+    """
+    table = _table(table_name, region)
+    condition = {}
+    if not overwrite:
+        condition["ConditionExpression"] = "attribute_not_exists(username)"
+    written = skipped = 0
+    failures = []
+    for number, item in items:
+        try:
+            _put_with_retry(table, item, condition)
+            written += 1
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                skipped += 1
+            else:
+                failures.append((number, f"{item['username']}: {e}"))
+    return written, skipped, failures
+
+
+def import_users(
+    table_name: str,
+    path: str,
+    region: str = "us-west-2",
+    concurrency: int = 8,
+    overwrite: bool = False,
+) -> Tuple[int, int, List[Tuple[int, str]]]:
+    """
+    Bulk import users from a CSV/JSONL file
+
+    Records are streamed in chunks: plain passwords are hashed across a
+    process pool (hashing is deliberately slow, see services/passwords.py;
+    records with a `password_hash` skip it), then up to `concurrency` chunks
+    are written at once. Each user is one conditional put, so unless
+    --overwrite is given an existing user (even one created mid-import) is
+    skipped, never replaced. Throttled puts are retried with backoff; a bad
+    record or a write that still fails is reported with its record number
+    and the import carries on.
+
+    Returns (written, skipped, failures).
+    """
+    start = time.perf_counter()
+    written = skipped = 0
+    failures: List[Tuple[int, str]] = []
+    records = enumerate(read_users(path), start=1)
+
+    def collect(future) -> None:
+        nonlocal written, skipped
+        chunk_written, chunk_skipped, chunk_failures = future.result()
+        written += chunk_written
+        skipped += chunk_skipped
+        failures.extend(chunk_failures)
+
+    with ProcessPoolExecutor() as hashers, ThreadPoolExecutor(
+        max_workers=concurrency
+    ) as writers:
+        pending = []
+        while chunk := list(islice(records, IMPORT_CHUNK_SIZE)):
+            items = []
+            for number, item, error in hashers.map(
+                _prepare_record, chunk, chunksize=16
+            ):
+                if error is None:
+                    items.append((number, item))
+                else:
+                    failures.append((number, error))
+            pending.append(
+                writers.submit(_import_chunk, table_name, region, items, overwrite)
+            )
+            # Bounded: never more than `concurrency` chunks in flight
+            while len(pending) >= concurrency:
+                collect(pending.pop(0))
+                processed = written + skipped + len(failures)
+                print(f"⏳ {processed} users processed...", file=sys.stderr)
+        for future in pending:
+            collect(future)
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Imported {written} user(s) in {elapsed:.1f}s")
+    if skipped:
+        print(f"   Skipped {skipped} existing user(s)")
+    if failures:
+        failures.sort()
+        print(f"❌ {len(failures)} record(s) failed:", file=sys.stderr)
+        for number, error in failures[:MAX_REPORTED_FAILURES]:
+            print(f"   record {number}: {error}", file=sys.stderr)
+        if len(failures) > MAX_REPORTED_FAILURES:
+            print(
+                f"   ... and {len(failures) - MAX_REPORTED_FAILURES} more",
+                file=sys.stderr,
+            )
+    return written, skipped, failures
 
 
 def delete_user(table_name: str, username: str, region: str = "us-west-2") -> None:
@@ -155,6 +462,49 @@ def main():
         default="eu-west-3",
         help="AWS region",
     )
+    list_parser.add_argument(
+        "--format",
+        choices=["table", "csv", "jsonl"],
+        default="table",
+        help="Output format (streamed to stdout)",
+    )
+    list_parser.add_argument(
+        "--segments",
+        type=int,
+        default=4,
+        help="Parallel scan segments",
+    )
+
+    # Bulk import command
+    import_parser = subparsers.add_parser(
+        "import", help="Bulk import users from a CSV or JSONL file"
+    )
+    import_parser.add_argument(
+        "--file",
+        required=True,
+        help="CSV/JSONL with username, password or password_hash, email",
+    )
+    import_parser.add_argument(
+        "--table-name",
+        default="prod-users-table-969341425463",
+        help="DynamoDB table name",
+    )
+    import_parser.add_argument(
+        "--region",
+        default="eu-west-3",
+        help="AWS region",
+    )
+    import_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Chunks of users written in parallel",
+    )
+    import_parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="Replace existing users instead of skipping them",
+    )
 
     # Delete user command
     delete_parser = subparsers.add_parser("delete", help="Delete a user")
@@ -184,7 +534,13 @@ def main():
     if args.command == "add":
         add_user(table_name, args.username, args.password, args.email, args.region)
     elif args.command == "list":
-        list_users(table_name, args.region)
+        list_users(table_name, args.region, args.segments, args.format)
+    elif args.command == "import":
+        _, _, failures = import_users(
+            table_name, args.file, args.region, args.concurrency, args.overwrite
+        )
+        if failures:
+            sys.exit(1)
     elif args.command == "delete":
         delete_user(table_name, args.username, args.region)
 
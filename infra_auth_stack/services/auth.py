@@ -1,36 +1,83 @@
 import json
 import os
-import hashlib
-import hmac
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
-import boto3
 from botocore.exceptions import ClientError
 
-# For JWT operations
-import jwt
+# Per-phase timings, emitted as CloudWatch embedded metrics
+import metrics
 
-# For making HTTP requests to existing APIs
-import requests
+# Validated tokens, so repeat requests skip signature verification
+from token_cache import TokenCache
+
+# Heavier dependencies are imported where they are first needed, so each of
+# the two Lambdas only loads what its own path uses on a cold start:
+# - jwt: JWT operations (both)
+# - boto3 + passwords: DynamoDB users table and password hashing (login)
+# - requests + http_pool: pooled calls to the existing APIs (proxy)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# ⚙️ Configuration (read once per container, not on every request)
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+USERS_TABLE = os.environ.get("USERS_TABLE")
+JWT_SECRET = os.environ.get("JWT_SECRET")
+JWT_EXPIRATION_HOURS = int(os.environ.get("JWT_EXPIRATION_HOURS", "24"))
+IMAGE_API_URL = os.environ.get("IMAGE_API_URL")
+IMAGE_API_KEY = os.environ.get("IMAGE_API_KEY")
+TEXT_API_URL = os.environ.get("TEXT_API_URL")
+TEXT_API_KEY = os.environ.get("TEXT_API_KEY")
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-# 🗄️ DynamoDB Client
+# 🗄️ DynamoDB Client (created on first login, reused while warm)
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-dynamodb = boto3.resource("dynamodb")
+dynamodb = None
+
+token_cache = TokenCache()
+
+
+def get_dynamodb():
+    """DynamoDB resource, created on first use"""
+    global dynamodb
+    if dynamodb is None:
+        import boto3
+
+        dynamodb = boto3.resource("dynamodb")
+    return dynamodb
 
 
 def hash_password(password: str) -> str:
-    """
-    Hash a password using SHA-256
-    In production, use bcrypt or argon2 instead!
-    """
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash a password with the configured hasher (see passwords.py)"""
+    import passwords
+
+    return passwords.hash_password(password)
 
 
 def verify_password(stored_hash: str, provided_password: str) -> bool:
-    """Verify a password against its hash"""
-    return hmac.compare_digest(stored_hash, hash_password(provided_password))
+    """Verify a password against its hash (any supported scheme)"""
+    import passwords
+
+    return passwords.verify_password(stored_hash, provided_password)
+
+
+def upgrade_password_hash(table: Any, username: str, old_hash: str, new_hash: str):
+    """
+    Replace a legacy/outdated hash after a successful login
+
+    Conditional on the old hash so a concurrent password change always wins.
+    Failures only delay the upgrade to the next login.
+    """
+    try:
+        table.update_item(
+            Key={"username": username},
+            UpdateExpression="SET password_hash = :new",
+            ConditionExpression="password_hash = :old",
+            ExpressionAttributeValues={":new": new_hash, ":old": old_hash},
+        )
+        print(f"🔁 Password hash upgraded for user: {username}")
+    except ClientError as e:
+        print(f"⚠️ Could not upgrade password hash: {str(e)}")
 
 
 def generate_jwt(username: str, jwt_secret: str, expiration_hours: int = 24) -> str:
@@ -42,6 +89,8 @@ def generate_jwt(username: str, jwt_secret: str, expiration_hours: int = 24) ->
     - exp: Expiration timestamp
     - iat: Issued at timestamp
     """
+    import jwt
+
     now = datetime.utcnow()
     payload = {
         "username": username,
@@ -56,6 +105,8 @@ def validate_jwt(token: str, jwt_secret: str) -> Optional[Dict[str, Any]]:
     Validate JWT token and return payload
     Returns None if invalid
     """
+    import jwt
+
     try:
         payload = jwt.decode(token, jwt_secret, algorithms=["HS256"])
         return payload
@@ -67,6 +118,21 @@ def validate_jwt(token: str, jwt_secret: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+def authenticate(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Claims of a valid token, from the cache when it was already verified
+
+    A cache hit is a dict lookup; a miss runs the full `validate_jwt`.
+    """
+    payload = token_cache.get(token)
+    metrics.add("TokenCacheHit", int(payload is not None))
+    if payload is None:
+        payload = validate_jwt(token, JWT_SECRET)
+        if payload:
+            token_cache.set(token, payload)
+    return payload
+
+
 def cors_response(status_code: int, body: Dict[str, Any]) -> Dict[str, Any]:
     """Helper to create CORS-enabled responses"""
     return {
@@ -84,6 +150,7 @@ def cors_response(status_code: int, body: Dict[str, Any]) -> Dict[str, Any]:
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # 🔐 LAMBDA 1: LOGIN HANDLER
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+@metrics.instrument("login")
 def login_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Handle user login requests
@@ -101,6 +168,8 @@ def login_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         "expires_in": 86400
     }
     """
+    import passwords
+
     print("🔐 Login request received")
 
     try:
@@ -113,20 +182,16 @@ def login_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         if not username or not password:
             return cors_response(400, {"error": "Username and password required"})
 
-        # Get environment variables
-        table_name = os.environ.get("USERS_TABLE")
-        jwt_secret = os.environ.get("JWT_SECRET")
-        jwt_expiration = int(os.environ.get("JWT_EXPIRATION_HOURS", "24"))
-
-        if not table_name or not jwt_secret:
+        if not USERS_TABLE or not JWT_SECRET:
             print("❌ Missing environment variables")
             return cors_response(500, {"error": "Server configuration error"})
 
         # Query DynamoDB
-        table = dynamodb.Table(table_name)
+        table = get_dynamodb().Table(USERS_TABLE)
 
         try:
-            response = table.get_item(Key={"username": username})
+            with metrics.span("GetUser"):
+                response = table.get_item(Key={"username": username})
         except ClientError as e:
             print(f"❌ DynamoDB error: {str(e)}")
             return cors_response(500, {"error": "Database error"})
@@ -134,18 +199,31 @@ def login_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         # Check if user exists
         if "Item" not in response:
             print(f"❌ User not found: {username}")
+            # Same hashing cost as a real check, so timing doesn't leak usernames
+            with metrics.span("VerifyPassword"):
+                passwords.dummy_verify(password)
             return cors_response(401, {"error": "Invalid credentials"})
 
         user = response["Item"]
         stored_password_hash = user.get("password_hash", "")
 
         # Verify password
-        if not verify_password(stored_password_hash, password):
+        with metrics.span("VerifyPassword"):
+            valid, new_hash = passwords.verify_and_update(
+                stored_password_hash, password
+            )
+        if not valid:
             print(f"❌ Invalid password for user: {username}")
             return cors_response(401, {"error": "Invalid credentials"})
 
+        # Transparently move legacy SHA-256 / outdated hashes to the current hasher
+        if new_hash:
+            with metrics.span("UpgradeHash"):
+                upgrade_password_hash(table, username, stored_password_hash, new_hash)
+
         # Generate JWT token
-        token = generate_jwt(username, jwt_secret, jwt_expiration)
+        with metrics.span("IssueToken"):
+            token = generate_jwt(username, JWT_SECRET, JWT_EXPIRATION_HOURS)
 
         print(f"✅ Login successful for user: {username}")
 
@@ -154,7 +232,7 @@ def login_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             {
                 "token": token,
                 "username": username,
-                "expires_in": jwt_expiration * 3600,  # Convert hours to seconds
+                "expires_in": JWT_EXPIRATION_HOURS * 3600,  # Hours to seconds
             },
         )
 
@@ -168,6 +246,7 @@ def login_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # 🔄 LAMBDA 2: PROXY HANDLER
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+@metrics.instrument("proxy")
 def proxy_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Proxy requests to existing APIs after JWT validation
@@ -180,8 +259,16 @@ def proxy_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 
     Endpoints:
     - POST /proxy/image → calls IMAGE_API_URL
+    - POST /proxy/image/jobs → calls IMAGE_API_URL + /jobs (async generation)
+    - GET /proxy/image/jobs/{job_id} → calls IMAGE_API_URL + /jobs/{job_id}
     - POST /proxy/text → calls TEXT_API_URL
+    - POST /proxy/text/batch → calls TEXT_API_URL + /batch
     """
+    import requests
+
+    # Pooled keep-alive session shared across warm invocations
+    import http_pool
+
     print("🔄 Proxy request received")
 
     try:
@@ -198,10 +285,10 @@ def proxy_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             )
 
         token = auth_header.replace("Bearer ", "")
-        jwt_secret = os.environ.get("JWT_SECRET")
 
-        # Validate token
-        payload = validate_jwt(token, jwt_secret)
+        # Validate token (cached after the first successful verification)
+        with metrics.span("Authenticate"):
+            payload = authenticate(token)
         if not payload:
             return cors_response(401, {"error": "Invalid or expired token"})
 
@@ -212,16 +299,28 @@ def proxy_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         # STEP 2: Determine target API based on path
         # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
         path = event.get("path", "")
+        method = event.get("httpMethod", "POST")
         request_body = event.get("body", "{}")
 
         if "/image" in path:
-            target_url = os.environ.get("IMAGE_API_URL")
-            api_key = os.environ.get("IMAGE_API_KEY")
+            target_url = IMAGE_API_URL
+            # Forward sub-paths (e.g. /jobs/{job_id}) under the image endpoint
+            sub_path = path.split("/image", 1)[1].rstrip("/")
+            if target_url and sub_path:
+                target_url = f"{target_url.rstrip('/')}{sub_path}"
+            api_key = IMAGE_API_KEY
             endpoint_name = "image"
 
+        elif "/text/batch" in path:
+            target_url = TEXT_API_URL
+            if target_url:
+                target_url = f"{target_url.rstrip('/')}/batch"
+            api_key = TEXT_API_KEY
+            endpoint_name = "text batch"
+
         elif "/text" in path:
-            target_url = os.environ.get("TEXT_API_URL")
-            api_key = os.environ.get("TEXT_API_KEY")
+            target_url = TEXT_API_URL
+            api_key = TEXT_API_KEY
             endpoint_name = "text"
 
             # Add query parameters for text endpoint
@@ -239,19 +338,24 @@ def proxy_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
         # STEP 3: Call existing API with API key
         # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+        metrics.set_property("Endpoint", endpoint_name)
         print(f"🔄 Forwarding to {endpoint_name} API: {target_url}")
         print(f"🔑 Using API key: {api_key[:10]}...")
 
-        # Make HTTP request to existing API
-        response = requests.post(
-            target_url,
-            headers={
-                "x-api-key": api_key,  # The secret API key!
-                "Content-Type": "application/json",
-            },
-            data=request_body,
-            timeout=30,
-        )
+        # Make HTTP request to existing API (reuses pooled connections)
+        with metrics.span("Backend"):
+            response = http_pool.request(
+                method,
+                target_url,
+                headers={
+                    "x-api-key": api_key,  # The secret API key!
+                    "Content-Type": "application/json",
+                    # Authenticated user, recorded by the backends (e.g. S3 metadata)
+                    "X-Forwarded-User": username,
+                },
+                data=request_body if method != "GET" else None,
+            )
+        metrics.set_property("BackendStatusCode", response.status_code)
 
         print(f"✅ Response from {endpoint_name} API: {response.status_code}")
 
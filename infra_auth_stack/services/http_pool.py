@@ -0,0 +1,128 @@
+"""
+Pooled keep-alive HTTP transport for the proxy Lambda
+
+The session lives at module level, so warm invocations reuse the TCP/TLS
+connections already open to the image and text API Gateways instead of
+paying a fresh handshake on every proxied call. Each request records a
+PoolHits or PoolMisses metric in the current invocation (see metrics.py).
+
+Configuration (environment variables):
+- PROXY_POOL_CONNECTIONS: number of per-host pools to keep (default 4)
+- PROXY_POOL_MAXSIZE: connections kept alive per host (default 10)
+- PROXY_CONNECT_TIMEOUT: connect timeout in seconds (default 3.05)
+- PROXY_READ_TIMEOUT: read timeout in seconds (default 28)
+"""
+
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+
+POOL_CONNECTIONS = int(os.environ.get("PROXY_POOL_CONNECTIONS", "4"))
+POOL_MAXSIZE = int(os.environ.get("PROXY_POOL_MAXSIZE", "10"))
+CONNECT_TIMEOUT = float(os.environ.get("PROXY_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.environ.get("PROXY_READ_TIMEOUT", "28"))
+
+_session: Optional[requests.Session] = None
+_adapter: Optional[HTTPAdapter] = None
+_lock = threading.Lock()
+
+# Pool hits = requests served on an already open connection
+_stats = {"hits": 0, "misses": 0}
+
+
+def build_session(
+    pool_connections: int = POOL_CONNECTIONS, pool_maxsize: int = POOL_MAXSIZE
+) -> tuple[requests.Session, HTTPAdapter]:
+    """Create a session whose adapter keeps `pool_maxsize` connections per host"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=0,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session, adapter
+
+
+def get_session() -> tuple[requests.Session, HTTPAdapter]:
+    """Return the shared session, creating it on first use"""
+    global _session, _adapter
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session, _adapter = build_session()
+    return _session, _adapter
+
+
+def request(method: str, url: str, **kwargs: Any) -> requests.Response:
+    """
+    Send a request through the shared pool and record whether the connection
+    was reused
+
+    Accepts the same keyword arguments as `requests.request`; the timeout
+    defaults to (PROXY_CONNECT_TIMEOUT, PROXY_READ_TIMEOUT).
+    """
+    session, adapter = get_session()
+    kwargs.setdefault("timeout", (CONNECT_TIMEOUT, READ_TIMEOUT))
+
+    connections_before = _count_connections(adapter)
+    try:
+        return session.request(method, url, **kwargs)
+    finally:
+        with _lock:
+            hit = _count_connections(adapter) == connections_before
+            _stats["hits" if hit else "misses"] += 1
+        metrics.add("PoolHits", int(hit))
+        metrics.add("PoolMisses", int(not hit))
+
+
+def post(url: str, **kwargs: Any) -> requests.Response:
+    """POST through the shared pool (see `request`)"""
+    return request("POST", url, **kwargs)
+
+
+def _count_connections(adapter: HTTPAdapter) -> int:
+    """Total connections opened so far across every host pool"""
+    pools = adapter.poolmanager.pools
+    return sum(
+        pool.num_connections
+        for pool in (pools.get(key) for key in pools.keys())
+        if pool is not None
+    )
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Connection reuse metrics since the container started
+
+    Returns overall hit/miss counters plus, per host, how many requests were
+    sent and how many new connections had to be opened.
+    """
+    hosts = {}
+    if _adapter is not None:
+        pools = _adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            hosts[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                "requests": pool.num_requests,
+                "connections": pool.num_connections,
+            }
+
+    with _lock:
+        hits, misses = _stats["hits"], _stats["misses"]
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 3) if total else 0.0,
+        "hosts": hosts,
+    }
@@ -0,0 +1,198 @@
+"""Per-invocation timing spans and CloudWatch Embedded Metric Format output.
+
+A handler decorated with `@instrument("image")` collects, for one invocation:
+
+- spans: `with span("InvokeModel"): ...` records the phase's duration in
+  milliseconds (a phase run several times, e.g. one upload per image, keeps
+  every value)
+- values: `add("InputTokens", 42)`, payload sizes, cache hits
+- properties: `set_property("ModelId", ...)`, searchable but not metrics
+
+and prints them as one EMF JSON line when it returns (or raises).
+CloudWatch Logs turns the line into metrics under the `Handler` dimension,
+and Logs Insights can break an invocation down by phase.
+
+Outside an instrumented invocation the functions do nothing, so instrumented
+helpers can still be called directly (tests, scripts). Threads started by the
+handler must be given `propagate(fn)` to record into the same invocation.
+
+Configuration (environment variables):
+- METRICS_NAMESPACE  CloudWatch namespace (default "BedrockServices")
+- METRICS_ENABLED  "false" turns the output off (default "true")
+
+Copy shared by the Lambda bundles (each is deployed flat): infra/services,
+infra_images/services and infra_auth_stack/services; keep them in sync.
+"""
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+NAMESPACE = os.environ.get("METRICS_NAMESPACE", "BedrockServices")
+ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() != "false"
+
+# EMF accepts at most 100 values per metric and line
+MAX_VALUES = 100
+
+_current: contextvars.ContextVar[Optional["Metrics"]] = contextvars.ContextVar(
+    "metrics", default=None
+)
+_cold_start = True
+
+
+class Metrics:
+    """Spans, values and properties of one invocation."""
+
+    def __init__(
+        self,
+        handler: str,
+        namespace: str = NAMESPACE,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.handler = handler
+        self.namespace = namespace
+        self.clock = clock
+        self.values: dict[str, list[float]] = {}
+        self.units: dict[str, str] = {}
+        self.properties: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, value: float, unit: str = "Count") -> None:
+        with self._lock:
+            values = self.values.setdefault(name, [])
+            if len(values) < MAX_VALUES:
+                values.append(value)
+            self.units[name] = unit
+
+    def set_property(self, name: str, value: Any) -> None:
+        with self._lock:
+            self.properties[name] = value
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.add(name, round((self.clock() - start) * 1000, 3), "Milliseconds")
+
+    def to_emf(self, timestamp_ms: Optional[int] = None) -> dict:
+        if timestamp_ms is None:
+            timestamp_ms = int(time.time() * 1000)
+        with self._lock:
+            line = {
+                "_aws": {
+                    "Timestamp": timestamp_ms,
+                    "CloudWatchMetrics": [
+                        {
+                            "Namespace": self.namespace,
+                            "Dimensions": [["Handler"]],
+                            "Metrics": [
+                                {"Name": name, "Unit": self.units[name]}
+                                for name in self.values
+                            ],
+                        }
+                    ],
+                },
+                "Handler": self.handler,
+                **self.properties,
+            }
+            for name, values in self.values.items():
+                line[name] = values[0] if len(values) == 1 else list(values)
+        return line
+
+    def emit(self) -> None:
+        # Lambda sends stdout to CloudWatch Logs; EMF needs the bare JSON line
+        print(json.dumps(self.to_emf(), default=str), flush=True)
+
+
+def current() -> Optional[Metrics]:
+    return _current.get()
+
+
+def add(name: str, value: Optional[float], unit: str = "Count") -> None:
+    """Record `value` in the current invocation (skipped when None)."""
+    metrics = _current.get()
+    if metrics is not None and value is not None:
+        metrics.add(name, value, unit)
+
+
+def set_property(name: str, value: Any) -> None:
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.set_property(name, value)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time the block as phase `name` of the current invocation."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    with metrics.span(name):
+        yield
+
+
+def propagate(fn: Callable) -> Callable:
+    """`fn` recording into the caller's invocation when run on another thread."""
+    metrics = _current.get()
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        token = _current.set(metrics)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+
+    return run
+
+
+@contextmanager
+def invocation(handler: str, context: Any = None) -> Iterator[Metrics]:
+    """Collect the metrics of one invocation and emit them at the end."""
+    global _cold_start
+    metrics = Metrics(handler)
+    metrics.set_property("ColdStart", _cold_start)
+    _cold_start = False
+    request_id = getattr(context, "aws_request_id", None)
+    if request_id:
+        metrics.set_property("RequestId", request_id)
+    token = _current.set(metrics)
+    try:
+        with metrics.span("Total"):
+            yield metrics
+    finally:
+        _current.reset(token)
+        if ENABLED:
+            metrics.emit()
+
+
+def instrument(handler: str) -> Callable:
+    """
+    Decorator: run a Lambda handler inside `invocation(handler, context)`,
+    recording the API Gateway request / response body sizes and status code.
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(event, context):
+            with invocation(handler, context) as metrics:
+                if isinstance(event, dict) and isinstance(event.get("body"), str):
+                    metrics.add("RequestBytes", len(event["body"]), "Bytes")
+                response = fn(event, context)
+                if isinstance(response, dict) and "statusCode" in response:
+                    metrics.set_property("StatusCode", response["statusCode"])
+                    if isinstance(response.get("body"), str):
+                        metrics.add("ResponseBytes", len(response["body"]), "Bytes")
+                return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,297 @@
+"""
+Pluggable password hashing
+
+Hashes are self-describing strings, so every stored hash says how to verify
+itself and hashers can be changed or re-tuned without a migration:
+
+- Argon2id  `$argon2id$v=19$m=<KiB>,t=<passes>,p=<lanes>$<salt>$<hash>`
+  (argon2-cffi format, needs the optional `argon2-cffi` package)
+- scrypt    `$scrypt$ln=<log2 N>,r=<r>,p=<p>$<salt>$<hash>`
+- PBKDF2    `$pbkdf2-sha256$i=<iterations>$<salt>$<hash>`
+- legacy    64 hex chars, unsalted SHA-256 (verify only)
+
+Salts are 16 random bytes per hash; salt and hash are unpadded base64.
+`verify_and_update` tells the caller when a hash (legacy, another scheme or
+outdated parameters) should be replaced by one from the current hasher, so
+users are upgraded transparently the next time they log in.
+
+Configuration (environment variables, see benchmark_passwords.py for tuning):
+- PASSWORD_HASHER: argon2id | scrypt | pbkdf2-sha256 (default argon2id, or
+  scrypt when argon2-cffi is not installed)
+- ARGON2_TIME_COST, ARGON2_MEMORY_KIB, ARGON2_PARALLELISM
+- SCRYPT_LN, SCRYPT_R, SCRYPT_P
+- PBKDF2_ITERATIONS
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import re
+import warnings
+from typing import Dict, Optional, Tuple
+
+try:
+    import argon2
+except ImportError:  # optional dependency
+    argon2 = None
+
+
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+_LEGACY_SHA256 = re.compile(r"[0-9a-f]{64}")
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode().rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.b64decode(data + "=" * (-len(data) % 4))
+
+
+def _parse_params(params: str) -> Dict[str, int]:
+    pairs = (param.split("=") for param in params.split(","))
+    return {key: int(value) for key, value in pairs}
+
+
+class Argon2idHasher:
+    """Argon2id (memory-hard, preferred); `memory_kib` is the per-hash RAM"""
+
+    scheme = "argon2id"
+
+    def __init__(
+        self, time_cost: int = 2, memory_kib: int = 19456, parallelism: int = 1
+    ) -> None:
+        if argon2 is None:
+            raise RuntimeError("argon2id hashing requires the argon2-cffi package")
+        self.time_cost = time_cost
+        self.memory_kib = memory_kib
+        self.parallelism = parallelism
+        self._hasher = argon2.PasswordHasher(
+            time_cost=time_cost,
+            memory_cost=memory_kib,
+            parallelism=parallelism,
+            hash_len=HASH_BYTES,
+            salt_len=SALT_BYTES,
+            type=argon2.Type.ID,
+        )
+
+    @property
+    def memory_bytes(self) -> int:
+        return self.memory_kib * 1024
+
+    def hash(self, password: str) -> str:
+        return self._hasher.hash(password)
+
+    def verify(self, encoded: str, password: str) -> bool:
+        try:
+            return self._hasher.verify(encoded, password)
+        except (
+            argon2.exceptions.VerificationError,
+            argon2.exceptions.InvalidHashError,
+        ):
+            return False
+
+    def needs_rehash(self, encoded: str) -> bool:
+        return self._hasher.check_needs_rehash(encoded)
+
+
+class ScryptHasher:
+    """scrypt from the standard library; uses 128 * r * 2**ln bytes per hash"""
+
+    scheme = "scrypt"
+
+    def __init__(self, ln: int = 14, r: int = 8, p: int = 1) -> None:
+        self.ln = ln
+        self.r = r
+        self.p = p
+
+    @property
+    def memory_bytes(self) -> int:
+        return 128 * self.r * (2**self.ln)
+
+    def _derive(self, password: str, salt: bytes, ln: int, r: int, p: int) -> bytes:
+        memory = 128 * r * (2**ln)
+        return hashlib.scrypt(
+            password.encode(),
+            salt=salt,
+            n=2**ln,
+            r=r,
+            p=p,
+            maxmem=memory + 1024 * 1024,
+            dklen=HASH_BYTES,
+        )
+
+    def hash(self, password: str) -> str:
+        salt = os.urandom(SALT_BYTES)
+        digest = self._derive(password, salt, self.ln, self.r, self.p)
+        params = f"ln={self.ln},r={self.r},p={self.p}"
+        return f"$scrypt${params}${_b64encode(salt)}${_b64encode(digest)}"
+
+    def verify(self, encoded: str, password: str) -> bool:
+        _, _, params, salt, digest = encoded.split("$")
+        values = _parse_params(params)
+        expected = self._derive(
+            password, _b64decode(salt), values["ln"], values["r"], values["p"]
+        )
+        return hmac.compare_digest(expected, _b64decode(digest))
+
+    def needs_rehash(self, encoded: str) -> bool:
+        return _parse_params(encoded.split("$")[2]) != {
+            "ln": self.ln,
+            "r": self.r,
+            "p": self.p,
+        }
+
+
+class Pbkdf2Hasher:
+    """PBKDF2-HMAC-SHA256 (not memory-hard; for FIPS-style requirements)"""
+
+    scheme = "pbkdf2-sha256"
+    memory_bytes = 0
+
+    def __init__(self, iterations: int = 600_000) -> None:
+        self.iterations = iterations
+
+    def hash(self, password: str) -> str:
+        salt = os.urandom(SALT_BYTES)
+        digest = hashlib.pbkdf2_hmac(
+            "sha256", password.encode(), salt, self.iterations, HASH_BYTES
+        )
+        return (
+            f"$pbkdf2-sha256$i={self.iterations}"
+            f"${_b64encode(salt)}${_b64encode(digest)}"
+        )
+
+    def verify(self, encoded: str, password: str) -> bool:
+        _, _, params, salt, digest = encoded.split("$")
+        expected = hashlib.pbkdf2_hmac(
+            "sha256",
+            password.encode(),
+            _b64decode(salt),
+            _parse_params(params)["i"],
+            HASH_BYTES,
+        )
+        return hmac.compare_digest(expected, _b64decode(digest))
+
+    def needs_rehash(self, encoded: str) -> bool:
+        return _parse_params(encoded.split("$")[2])["i"] != self.iterations
+
+
+# The one default for the auth Lambda, manage_users.py and the stack (which
+# only forwards PASSWORD_HASHER and cost overrides set at deploy time)
+DEFAULT_HASHER = Argon2idHasher.scheme
+FALLBACK_HASHER = ScryptHasher.scheme
+
+
+def hasher_from_env(scheme: Optional[str] = None):
+    """Build the hasher named by PASSWORD_HASHER with its tuned parameters"""
+    env = os.environ
+    scheme = scheme or env.get("PASSWORD_HASHER")
+    if not scheme:
+        scheme = DEFAULT_HASHER
+        if argon2 is None:
+            # Still verifiable everywhere; the auth Lambda upgrades it on login
+            warnings.warn(
+                "argon2-cffi is not installed, hashing passwords with scrypt",
+                RuntimeWarning,
+            )
+            scheme = FALLBACK_HASHER
+    if scheme == Argon2idHasher.scheme:
+        return Argon2idHasher(
+            time_cost=int(env.get("ARGON2_TIME_COST", "2")),
+            memory_kib=int(env.get("ARGON2_MEMORY_KIB", "19456")),
+            parallelism=int(env.get("ARGON2_PARALLELISM", "1")),
+        )
+    if scheme == ScryptHasher.scheme:
+        return ScryptHasher(
+            ln=int(env.get("SCRYPT_LN", "14")),
+            r=int(env.get("SCRYPT_R", "8")),
+            p=int(env.get("SCRYPT_P", "1")),
+        )
+    if scheme == Pbkdf2Hasher.scheme:
+        return Pbkdf2Hasher(iterations=int(env.get("PBKDF2_ITERATIONS", "600000")))
+    raise ValueError(f"Unknown password hasher: {scheme}")
+
+
+def identify(encoded: str) -> str:
+    """Scheme of a stored hash ('sha256' for legacy hashes)"""
+    if _LEGACY_SHA256.fullmatch(encoded):
+        return "sha256"
+    parts = encoded.split("$")
+    if len(parts) < 5 or parts[0]:
+        raise ValueError("Unrecognized password hash format")
+    return parts[1]
+
+
+# Current hasher, configured once per container
+default_hasher = hasher_from_env()
+_verifiers = {default_hasher.scheme: default_hasher}
+
+
+def _verifier(scheme: str):
+    # Parameters come from each hash, so default-cost instances can verify any
+    if scheme not in _verifiers:
+        _verifiers[scheme] = {
+            Argon2idHasher.scheme: Argon2idHasher,
+            ScryptHasher.scheme: ScryptHasher,
+            Pbkdf2Hasher.scheme: Pbkdf2Hasher,
+        }[scheme]()
+    return _verifiers[scheme]
+
+
+def hash_password(password: str) -> str:
+    """Hash a password with the current hasher and a fresh random salt"""
+    return default_hasher.hash(password)
+
+
+def verify_and_update(encoded: str, password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password against any supported stored hash
+
+    Returns (valid, new_hash). `new_hash` is set when the password is valid but
+    its hash is legacy SHA-256, uses another scheme or outdated parameters; the
+    caller should store it in place of the old one.
+    """
+    try:
+        scheme = identify(encoded)
+    except ValueError:
+        return False, None
+
+    if scheme == "sha256":
+        legacy = hashlib.sha256(password.encode()).hexdigest()
+        if not hmac.compare_digest(encoded, legacy):
+            return False, None
+        return True, hash_password(password)
+
+    try:
+        verifier = _verifier(scheme)
+        valid = verifier.verify(encoded, password)
+    except (KeyError, ValueError, RuntimeError):
+        return False, None
+    if not valid:
+        return False, None
+    if verifier is not default_hasher or default_hasher.needs_rehash(encoded):
+        return True, hash_password(password)
+    return True, None
+
+
+_dummy_hash: Optional[str] = None
+
+
+def dummy_verify(password: str) -> None:
+    """
+    Spend the same time as a real verification (for unknown usernames), so
+    response times don't reveal which usernames exist
+    """
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = hash_password(os.urandom(16).hex())
+    default_hasher.verify(_dummy_hash, password)
+
+
+def verify_password(encoded: str, password: str) -> bool:
+    """Verify a password against any supported stored hash"""
+    return verify_and_update(encoded, password)[0]
@@ -0,0 +1,75 @@
+"""
+Cache of validated JWTs for the proxy Lambda
+
+A token is presented on every proxied call for its whole lifetime, so once its
+signature has been verified the decoded claims are kept, keyed by a SHA-256
+digest of the token (the raw bearer token is never stored). Entries expire at
+the token's own `exp`, so a cached token is never accepted past the moment
+`jwt.decode` would start rejecting it. Only successful validations are cached.
+
+Configuration (environment variables):
+- TOKEN_CACHE_MAX_ENTRIES: tokens kept per container (default 1024, 0 disables)
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+MAX_ENTRIES = int(os.environ.get("TOKEN_CACHE_MAX_ENTRIES", "1024"))
+
+
+def token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+class TokenCache:
+    """Bounded LRU of token digest -> (exp, claims)"""
+
+    def __init__(
+        self,
+        max_entries: int = MAX_ENTRIES,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[bytes, tuple[float, Dict[str, Any]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Claims of a previously validated, still unexpired token"""
+        key = token_digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, token: str, claims: Dict[str, Any]) -> None:
+        """Remember claims returned by a successful `jwt.decode`"""
+        expires_at = claims.get("exp")
+        # Tokens without exp never expire on their own; don't pin them in memory
+        if self.max_entries <= 0 or not isinstance(expires_at, (int, float)):
+            return
+        key = token_digest(token)
+        with self._lock:
+            self._entries[key] = (expires_at, claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
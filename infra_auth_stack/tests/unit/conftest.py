@@ -0,0 +1,10 @@
+import os
+import sys
+from pathlib import Path
+
+# Lambda code is deployed from services/ as a flat bundle, so its modules
+# import each other as top-level modules.
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "services"))
+
+# boto3 needs a region to create the login Lambda's DynamoDB resource
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
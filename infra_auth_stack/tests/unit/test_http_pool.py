@@ -0,0 +1,46 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import http_pool
+import metrics
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_post_reuses_pooled_connection():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), EchoHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/text"
+    try:
+        before = http_pool.get_pool_stats()
+        with metrics.invocation("proxy") as invocation:
+            for _ in range(3):
+                response = http_pool.post(url, data='{"text": "hi"}')
+                assert response.text == '{"text": "hi"}'
+        stats = http_pool.get_pool_stats()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert stats["misses"] - before["misses"] == 1
+    assert stats["hits"] - before["hits"] == 2
+    host = stats["hosts"][f"http://127.0.0.1:{server.server_address[1]}"]
+    assert host == {"requests": 3, "connections": 1}
+    # Emitted per request, so CloudWatch can chart reuse over time
+    assert invocation.values["PoolHits"] == [0, 1, 1]
+    assert invocation.values["PoolMisses"] == [1, 0, 0]
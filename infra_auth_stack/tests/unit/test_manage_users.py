@@ -0,0 +1,206 @@
+import json
+import threading
+
+import pytest
+from botocore.exceptions import ClientError
+
+import manage_users
+
+
+def conditional_check_failed() -> ClientError:
+    return ClientError(
+        {"Error": {"Code": "ConditionalCheckFailedException"}}, "PutItem"
+    )
+
+
+class FakeTable:
+    """Users table: paged segment scans and (conditional) puts."""
+
+    def __init__(self, users=(), page_size: int = 2) -> None:
+        self.items = {user["username"]: dict(user) for user in users}
+        self.page_size = page_size
+        self.scanned_pages = 0
+        self.fail_puts_for = set()
+        # username -> puts still to throttle
+        self.throttle_puts = {}
+        self._lock = threading.Lock()
+
+    def scan(self, Segment, TotalSegments, ExclusiveStartKey=None, **kwargs):
+        with self._lock:
+            self.scanned_pages += 1
+            names = sorted(self.items)[Segment::TotalSegments]
+        start = 0
+        if ExclusiveStartKey:
+            start = names.index(ExclusiveStartKey["username"]) + 1
+        page = names[start : start + self.page_size]
+        response = {"Items": [dict(self.items[name]) for name in page]}
+        if start + self.page_size < len(names):
+            response["LastEvaluatedKey"] = {"username": page[-1]}
+        return response
+
+    def put_item(self, Item, ConditionExpression=None):
+        with self._lock:
+            if self.throttle_puts.get(Item["username"]):
+                self.throttle_puts[Item["username"]] -= 1
+                raise ClientError(
+                    {"Error": {"Code": "ProvisionedThroughputExceededException"}},
+                    "PutItem",
+                )
+            if Item["username"] in self.fail_puts_for:
+                raise ClientError(
+                    {"Error": {"Code": "ValidationException"}}, "PutItem"
+                )
+            if ConditionExpression and Item["username"] in self.items:
+                raise conditional_check_failed()
+            self.items[Item["username"]] = dict(Item)
+
+
+@pytest.fixture
+def table(monkeypatch):
+    table = FakeTable()
+    monkeypatch.setattr(manage_users, "_table", lambda name, region: table)
+    return table
+
+
+def users(count: int):
+    return [{"username": f"user{n:04d}", "email": f"{n}@x"} for n in range(count)]
+
+
+def test_iter_users_reads_every_segment_and_page(table):
+    table.items = {user["username"]: user for user in users(25)}
+
+    found = list(manage_users.iter_users("users", segments=4))
+
+    assert sorted(item["username"] for item in found) == sorted(table.items)
+
+
+def test_iter_users_stops_scanning_when_the_consumer_stops(table, monkeypatch):
+    # Far more users than the queue holds: scanners block unless told to stop
+    monkeypatch.setattr(manage_users, "SCAN_QUEUE_SIZE", 3)
+    table.items = {user["username"]: user for user in users(200)}
+    table.page_size = 10
+    first = []
+
+    def take_one():
+        scan = manage_users.iter_users("users", segments=4)
+        first.append(next(scan))
+        scan.close()
+
+    thread = threading.Thread(target=take_one, daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+
+    assert not thread.is_alive(), "iter_users deadlocked on early exit"
+    assert len(first) == 1
+    assert table.scanned_pages < 20
+
+
+def write_jsonl(tmp_path, records) -> str:
+    path = tmp_path / "users.jsonl"
+    lines = [
+        record if isinstance(record, str) else json.dumps(record) for record in records
+    ]
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def test_import_skips_existing_users_with_a_conditional_put(table, tmp_path):
+    table.items = {"ana": {"username": "ana", "password_hash": "old"}}
+    path = write_jsonl(
+        tmp_path,
+        [
+            {"username": "ana", "password_hash": "new"},
+            {"username": "bob", "password_hash": "h1", "email": "bob@x"},
+            {"username": "bob", "password_hash": "h2"},
+        ],
+    )
+
+    written, skipped, failures = manage_users.import_users("users", path)
+
+    assert (written, skipped, failures) == (1, 2, [])
+    assert table.items["ana"]["password_hash"] == "old"
+    assert table.items["bob"]["password_hash"] == "h1"
+
+
+def test_import_overwrite_replaces_existing_users(table, tmp_path):
+    table.items = {"ana": {"username": "ana", "password_hash": "old"}}
+    path = write_jsonl(tmp_path, [{"username": "ana", "password_hash": "new"}])
+
+    assert manage_users.import_users("users", path, overwrite=True) == (1, 0, [])
+    assert table.items["ana"]["password_hash"] == "new"
+
+
+def test_import_reports_bad_records_and_carries_on(table, tmp_path, monkeypatch):
+    monkeypatch.setattr(manage_users, "IMPORT_CHUNK_SIZE", 2)
+    table.fail_puts_for = {"carl"}
+    path = write_jsonl(
+        tmp_path,
+        [
+            {"username": "ana", "password_hash": "h"},
+            {"username": "", "password_hash": "h"},
+            "{not json",
+            {"username": "bob", "password_hash": "h"},
+            {"username": "carl", "password_hash": "h"},
+            {"username": "dora", "password_hash": "h"},
+        ],
+    )
+
+    written, skipped, failures = manage_users.import_users(
+        "users", path, concurrency=2
+    )
+
+    assert (written, skipped) == (3, 0)
+    assert sorted(table.items) == ["ana", "bob", "dora"]
+    assert [number for number, _ in sorted(failures)] == [2, 3, 5]
+    assert "username" in dict(failures)[2]
+    assert "not a JSON object" in dict(failures)[3]
+    assert "carl" in dict(failures)[5]
+
+
+def test_import_retries_throttled_puts(table, tmp_path, monkeypatch):
+    monkeypatch.setattr(manage_users, "WRITE_RETRY_BASE_SECONDS", 0)
+    table.throttle_puts = {"ana": 3, "bob": manage_users.MAX_WRITE_ATTEMPTS}
+    path = write_jsonl(
+        tmp_path,
+        [
+            {"username": "ana", "password_hash": "h"},
+            {"username": "bob", "password_hash": "h"},
+        ],
+    )
+
+    written, skipped, failures = manage_users.import_users("users", path)
+
+    # ana gets through on the fourth attempt; bob is throttled on every one
+    assert (written, skipped) == (1, 0)
+    assert sorted(table.items) == ["ana"]
+    assert [number for number, _ in failures] == [2]
+    assert "ProvisionedThroughputExceededException" in failures[0][1]
+
+
+def test_table_is_created_once_per_thread(monkeypatch):
+    sessions = []
+
+    class FakeSession:
+        def __init__(self):
+            sessions.append(self)
+
+        def resource(self, service_name, region_name, config):
+            return self
+
+        def Table(self, name):
+            return (self, name)
+
+    monkeypatch.setattr(manage_users.boto3.session, "Session", FakeSession)
+    monkeypatch.setattr(manage_users, "_local", threading.local())
+
+    first = manage_users._table("users", "us-west-2")
+    assert manage_users._table("users", "us-west-2") is first
+    other = []
+    thread = threading.Thread(
+        target=lambda: other.append(manage_users._table("users", "us-west-2"))
+    )
+    thread.start()
+    thread.join()
+
+    assert other[0] is not first
+    assert len(sessions) == 2
@@ -0,0 +1,118 @@
+import hashlib
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import auth
+import passwords
+
+# Cheap parameters: these tests check behavior, not cost
+FAST_HASHERS = {
+    "argon2id": lambda: passwords.Argon2idHasher(time_cost=1, memory_kib=1024),
+    "scrypt": lambda: passwords.ScryptHasher(ln=10),
+    "pbkdf2-sha256": lambda: passwords.Pbkdf2Hasher(iterations=1000),
+}
+
+
+@pytest.fixture(params=list(FAST_HASHERS))
+def hasher(request, monkeypatch):
+    if request.param == "argon2id" and passwords.argon2 is None:
+        pytest.skip("argon2-cffi not installed")
+    fast = FAST_HASHERS[request.param]()
+    monkeypatch.setattr(passwords, "default_hasher", fast)
+    monkeypatch.setattr(passwords, "_verifiers", {fast.scheme: fast})
+    return fast
+
+
+def test_salted_self_describing_hashes(hasher):
+    first = passwords.hash_password("secret123")
+    second = passwords.hash_password("secret123")
+
+    assert first != second  # per-hash salt
+    assert passwords.identify(first) == hasher.scheme
+    assert passwords.verify_and_update(first, "secret123") == (True, None)
+    assert passwords.verify_and_update(first, "wrong") == (False, None)
+
+
+def test_legacy_sha256_is_upgraded_on_success(hasher):
+    legacy = hashlib.sha256(b"secret123").hexdigest()
+
+    valid, new_hash = passwords.verify_and_update(legacy, "secret123")
+
+    assert valid and passwords.identify(new_hash) == hasher.scheme
+    assert passwords.verify_and_update(new_hash, "secret123") == (True, None)
+    assert passwords.verify_and_update(legacy, "wrong") == (False, None)
+
+
+def test_other_scheme_or_outdated_cost_is_upgraded(monkeypatch):
+    old = passwords.ScryptHasher(ln=10)
+    monkeypatch.setattr(passwords, "default_hasher", old)
+    monkeypatch.setattr(passwords, "_verifiers", {old.scheme: old})
+    stored = passwords.hash_password("secret123")
+
+    stronger = passwords.ScryptHasher(ln=11)
+    monkeypatch.setattr(passwords, "default_hasher", stronger)
+    monkeypatch.setattr(passwords, "_verifiers", {stronger.scheme: stronger})
+    valid, new_hash = passwords.verify_and_update(stored, "secret123")
+    assert valid and "ln=11" in new_hash
+
+    pbkdf2 = passwords.Pbkdf2Hasher(iterations=1000)
+    monkeypatch.setattr(passwords, "default_hasher", pbkdf2)
+    valid, new_hash = passwords.verify_and_update(stored, "secret123")
+    assert valid and passwords.identify(new_hash) == "pbkdf2-sha256"
+
+
+@pytest.mark.parametrize("stored", ["", "plain", "$unknown$x$y$z", "$scrypt$bad"])
+def test_malformed_hashes_never_verify(hasher, stored):
+    assert passwords.verify_and_update(stored, "secret123") == (False, None)
+
+
+class FakeTable:
+    def __init__(self, item):
+        self.item = item
+        self.updates = []
+
+    def get_item(self, Key):
+        return {"Item": dict(self.item)} if Key == {"username": "ana"} else {}
+
+    def update_item(self, **kwargs):
+        self.updates.append(kwargs)
+        self.item["password_hash"] = kwargs["ExpressionAttributeValues"][":new"]
+
+
+def login(monkeypatch, table, password):
+    monkeypatch.setattr(auth, "USERS_TABLE", "users")
+    monkeypatch.setattr(auth, "JWT_SECRET", "test-secret")
+    monkeypatch.setattr(auth, "dynamodb", SimpleNamespace(Table=lambda name: table))
+    event = {"body": json.dumps({"username": "ana", "password": password})}
+    return auth.login_handler(event, None)["statusCode"]
+
+
+def test_login_transparently_rehashes_legacy_passwords(hasher, monkeypatch):
+    legacy = hashlib.sha256(b"secret123").hexdigest()
+    table = FakeTable({"username": "ana", "password_hash": legacy})
+
+    assert login(monkeypatch, table, "wrong") == 401
+    assert table.updates == []
+
+    assert login(monkeypatch, table, "secret123") == 200
+    [update] = table.updates
+    assert update["ExpressionAttributeValues"][":old"] == legacy
+    assert passwords.identify(table.item["password_hash"]) == hasher.scheme
+
+    # Already on the current hasher: no further writes
+    assert login(monkeypatch, table, "secret123") == 200
+    assert len(table.updates) == 1
+
+
+def test_argon2id_is_the_default_hasher(monkeypatch):
+    monkeypatch.delenv("PASSWORD_HASHER", raising=False)
+    if passwords.argon2 is None:
+        with pytest.warns(RuntimeWarning, match="argon2-cffi"):
+            assert passwords.hasher_from_env().scheme == "scrypt"
+    else:
+        assert passwords.hasher_from_env().scheme == "argon2id"
+
+    monkeypatch.setenv("PASSWORD_HASHER", "pbkdf2-sha256")
+    assert passwords.hasher_from_env().scheme == "pbkdf2-sha256"
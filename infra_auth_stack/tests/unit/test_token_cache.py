@@ -0,0 +1,78 @@
+import time
+
+import jwt
+import pytest
+
+import auth
+from token_cache import TokenCache
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire_at_the_token_exp():
+    clock = FakeClock()
+    cache = TokenCache(clock=clock)
+    cache.set("token", {"username": "ana", "exp": 1060})
+
+    assert cache.get("token") == {"username": "ana", "exp": 1060}
+    clock.now = 1060
+    assert cache.get("token") is None
+    assert len(cache) == 0
+
+
+def test_bounded_lru_and_tokens_without_exp_are_not_cached():
+    cache = TokenCache(max_entries=2, clock=FakeClock())
+    cache.set("a", {"exp": 2000})
+    cache.set("b", {"exp": 2000})
+    cache.get("a")
+    cache.set("c", {"exp": 2000})
+    cache.set("d", {"username": "no-exp"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.get("d") is None
+
+
+@pytest.fixture
+def jwt_setup(monkeypatch):
+    monkeypatch.setattr(auth, "JWT_SECRET", "test-secret")
+    monkeypatch.setattr(auth, "token_cache", TokenCache())
+    calls = []
+    validate_jwt = auth.validate_jwt
+
+    def counting_validate(token, secret):
+        calls.append(token)
+        return validate_jwt(token, secret)
+
+    monkeypatch.setattr(auth, "validate_jwt", counting_validate)
+    return calls
+
+
+def test_authenticate_verifies_each_token_once(jwt_setup):
+    token = auth.generate_jwt("ana", "test-secret")
+
+    for _ in range(3):
+        assert auth.authenticate(token)["username"] == "ana"
+
+    assert jwt_setup == [token]
+    assert auth.token_cache.hits == 2
+
+
+def test_invalid_and_expired_tokens_are_rejected_and_not_cached(jwt_setup):
+    forged = auth.generate_jwt("ana", "other-secret")
+    expired = jwt.encode(
+        {"username": "ana", "exp": int(time.time()) - 10}, "test-secret"
+    )
+
+    for token in (forged, forged, expired):
+        assert auth.authenticate(token) is None
+
+    assert len(jwt_setup) == 3
+    assert len(auth.token_cache) == 0
@@ -6,6 +6,8 @@ from aws_cdk import (
     aws_apigateway,
     aws_iam,
     aws_s3,
+    aws_dynamodb,
+    RemovalPolicy,
     Tags,
 )
 from constructs import Construct
@@ -55,25 +57,74 @@ class InfraImagesStack(Stack):
             ],
         )
 
+        # 🗃️ DYNAMODB TABLE for async image generation jobs
+        jobs_table = aws_dynamodb.Table(
+            self,
+            id="ImageJobsTable",
+            partition_key=aws_dynamodb.Attribute(
+                name="job_id", type=aws_dynamodb.AttributeType.STRING
+            ),
+            billing_mode=aws_dynamodb.BillingMode.PAY_PER_REQUEST,
+            time_to_live_attribute="expires_at",  # jobs expire after a day
+            removal_policy=RemovalPolicy.DESTROY,
+        )
+
+        # 🗃️ DYNAMODB TABLE for the generated-image cache (see services/image_cache.py)
+        image_cache_table = aws_dynamodb.Table(
+            self,
+            id="ImageCacheTable",
+            partition_key=aws_dynamodb.Attribute(
+                name="cache_key", type=aws_dynamodb.AttributeType.STRING
+            ),
+            billing_mode=aws_dynamodb.BillingMode.PAY_PER_REQUEST,
+            time_to_live_attribute="expires_at",
+            removal_policy=RemovalPolicy.DESTROY,  # Only holds S3 keys
+        )
+
         # 📦 LAMBDA FUNCTION for generating images
+        image_function_name = f"{env_name}-image-generation-lambda-{self.account}"
+        # Async jobs run outside API Gateway's 29s limit
+        image_timeout_seconds = 90
         image_lambda = aws_lambda.Function(
             self,
             id="ImageLambda",
-            function_name=f"{env_name}-image-generation-lambda-{self.account}",
+            function_name=image_function_name,
             runtime=aws_lambda.Runtime.PYTHON_3_12,
             code=aws_lambda.Code.from_asset("services"),
             handler="image.handler",
-            timeout=Duration.seconds(30),
+            timeout=Duration.seconds(image_timeout_seconds),
             memory_size=512,  # more memory -> faster execution
             retry_attempts=0,  # no retries -> faster execution
             environment={
                 "S3_BUCKET": image_bucket.bucket_name,
+                "JOBS_TABLE": jobs_table.table_name,
+                # Job status reports RUNNING jobs older than this as failed
+                "JOB_TIMEOUT_SECONDS": str(image_timeout_seconds),
+                "IMAGE_CACHE_TABLE": image_cache_table.table_name,
+                # Must stay below the 30-day bucket lifecycle expiration
+                "IMAGE_CACHE_TTL_SECONDS": str(7 * 86400),
+                "IMAGE_CACHE_MAX_ENTRIES": "1024",
                 "LOG_LEVEL": "INFO",
             },
         )
 
         # 🔑 GRANT READ AND WRITE ACCESS TO S3 BUCKET
         image_bucket.grant_read_write(image_lambda)
+        # 🔑 GRANT ACCESS TO THE JOBS TABLE
+        jobs_table.grant_read_write_data(image_lambda)
+        image_cache_table.grant_read_write_data(image_lambda)
+        # 🔑 ALLOW THE LAMBDA TO INVOKE ITSELF (async job worker)
+        # Built from the name rather than image_lambda.function_arn to avoid a
+        # circular dependency between the function and its own role policy
+        image_lambda.add_to_role_policy(
+            aws_iam.PolicyStatement(
+                effect=aws_iam.Effect.ALLOW,
+                resources=[
+                    f"arn:aws:lambda:{self.region}:{self.account}:function:{image_function_name}"
+                ],
+                actions=["lambda:InvokeFunction"],
+            )
+        )
         # 🔑 GRANT ACCESS TO BEDROCK
         image_lambda.add_to_role_policy(
             aws_iam.PolicyStatement(
@@ -142,7 +193,13 @@ class InfraImagesStack(Stack):
                         type=aws_apigateway.JsonSchemaType.STRING,
                         min_length=1,
                         max_length=500,
-                    )
+                    ),
+                    # Optional: variations generated in one model invocation
+                    "number_of_images": aws_apigateway.JsonSchema(
+                        type=aws_apigateway.JsonSchemaType.INTEGER,
+                        minimum=1,
+                        maximum=5,
+                    ),
                 },
                 required=["description"],
             ),
@@ -167,6 +224,29 @@ class InfraImagesStack(Stack):
             allow_headers=["Content-Type", "x-api-key"],
         )
 
+        # 📍 ASYNC JOBS: POST /image/jobs submits, GET /image/jobs/{job_id} polls
+        jobs_resource = image_resource.add_resource("jobs")
+        jobs_resource.add_method(
+            "POST",
+            image_integration,
+            api_key_required=True,
+            request_models={"application/json": request_model},
+            request_validator=request_validator,
+        )
+        jobs_resource.add_cors_preflight(
+            allow_origins=["*"],
+            allow_methods=["POST", "OPTIONS"],
+            allow_headers=["Content-Type", "x-api-key"],
+        )
+
+        job_resource = jobs_resource.add_resource("{job_id}")
+        job_resource.add_method("GET", image_integration, api_key_required=True)
+        job_resource.add_cors_preflight(
+            allow_origins=["*"],
+            allow_methods=["GET", "OPTIONS"],
+            allow_headers=["Content-Type", "x-api-key"],
+        )
+
         # 🚀 FORCE API DEPLOYMENT (ensures changes are applied)
         deployment = aws_apigateway.Deployment(
             self,
@@ -175,6 +255,8 @@ class InfraImagesStack(Stack):
             description="Deployment for Image API with API Key",
         )
         deployment.node.add_dependency(image_resource)
+        deployment.node.add_dependency(jobs_resource)
+        deployment.node.add_dependency(job_resource)
 
         # 📤 OUTPUTS - Display important values after deployment
         CfnOutput(
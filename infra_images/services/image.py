@@ -1,112 +1,388 @@
-import base64
-import boto3
+import io
 import json
 import logging
 import os
+import threading
+import time
+import uuid
 from botocore.exceptions import ClientError
-from time import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional
+from urllib.parse import quote
+
+import bedrock_client
+import jobs
+import metrics
+from image_cache import build_cache_from_env, make_cache_key, normalize_description
+from image_stream import iter_images, transfer_config
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 AWS_REGION_BEDROCK = "us-west-2"
+IMAGE_MODEL_ID = "amazon.titan-image-generator-v1"
+# A fixed seed makes a prompt + config always produce the same image, which is
+# what lets generated images be reused (see image_cache.py)
+IMAGE_SEED = int(os.getenv("IMAGE_SEED", "0"))
+# Titan Image Generator G1 returns at most 5 images per invocation
+MAX_IMAGES = 5
 S3_BUCKET = os.getenv("S3_BUCKET")
 if not S3_BUCKET:
     raise ValueError("S3_BUCKET is not set")
+# The worker's Lambda timeout: a job still RUNNING this long after it started
+# had its worker killed, and one still PENDING this long after it was
+# submitted lost its async event; neither will ever finish
+JOB_TIMEOUT_SECONDS = int(os.getenv("JOB_TIMEOUT_SECONDS", "90"))
+
+# Clients, job store and cache are created on first use rather than at import
+# to keep cold starts short (e.g. a job status poll never needs Bedrock), and
+# kept at module level so warm invocations reuse them
+bedrock = None
+s3_client = None
+
+# Async jobs: the store survives across warm invocations; the dispatcher
+# defaults to an async self-invocation (tests swap in jobs.InlineDispatcher)
+job_store = None
+job_dispatcher = None
+
+# Request hash -> S3 keys of the images already generated for it
+cache = None
+
+_init_lock = threading.Lock()
+
+
+def get_bedrock() -> bedrock_client.BedrockClient:
+    global bedrock
+    if bedrock is None:
+        bedrock = bedrock_client.get_client(AWS_REGION_BEDROCK)
+    return bedrock
+
+
+def get_s3_client():
+    global s3_client
+    with _init_lock:
+        if s3_client is None:
+            import boto3
+
+            s3_client = boto3.client(service_name="s3")
+    return s3_client
+
+
+def get_job_dispatcher(function_name: str):
+    global job_dispatcher
+    with _init_lock:
+        if job_dispatcher is None:
+            job_dispatcher = jobs.LambdaDispatcher(function_name)
+    return job_dispatcher
+
+
+def get_job_store():
+    global job_store
+    with _init_lock:
+        if job_store is None:
+            job_store = jobs.build_job_store()
+    return job_store
+
+
+def get_cache():
+    global cache
+    with _init_lock:
+        if cache is None:
+            cache = build_cache_from_env()
+    return cache
+
 
-client = boto3.client(service_name="bedrock-runtime", region_name=AWS_REGION_BEDROCK)
-s3_client = boto3.client(service_name="s3")
+def cors_response(status_code: int, body: dict) -> dict:
+    return {
+        "statusCode": status_code,
+        "headers": {
+            "Content-Type": "application/json",
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Headers": "Content-Type,x-api-key",
+        },
+        "body": json.dumps(body),
+    }
 
 
-def get_titan_config(description: str):
+def get_titan_config(description: str, number_of_images: int = 1):
     return json.dumps(
         {
             "taskType": "TEXT_IMAGE",
             "textToImageParams": {"text": description},
             "imageGenerationConfig": {
-                "numberOfImages": 1,
+                "numberOfImages": number_of_images,
                 "height": 512,
                 "width": 512,
                 "cfgScale": 8.0,
+                "seed": IMAGE_SEED,
             },
         }
     )
 
 
-def save_image_to_s3(base64_image: str):
-    image_file = base64.b64decode(base64_image)
-    timestamp = int(time())
-    image_name = str(timestamp) + ".jpg"
+def new_image_key(now: Optional[datetime] = None) -> str:
+    """
+    Unique object key: `images/<shard>/<YYYY>/<MM>/<DD>/<id>.jpg`.
 
-    s3_client.put_object(
-        Bucket=S3_BUCKET,
-        Key=image_name,
-        Body=image_file,
-    )
+    The id is a random UUID, so concurrent invocations never collide, and its
+    first two hex digits pick one of 256 shard prefixes, which spreads S3
+    request throughput instead of piling every write onto one increasing
+    prefix. The date partition keeps day-based listings and sweeps cheap.
+    """
+    now = now or datetime.now(timezone.utc)
+    object_id = uuid.uuid4().hex
+    return f"images/{object_id[:2]}/{now:%Y/%m/%d}/{object_id}.jpg"
+
+
+def image_metadata(prompt_hash: str, user: Optional[str] = None) -> dict:
+    """S3 user metadata stored with each generated image (values must be ASCII)."""
+    return {
+        "prompt-hash": prompt_hash,
+        "model-id": IMAGE_MODEL_ID,
+        "user": quote(user or "anonymous", safe=""),
+    }
 
-    signed_url = s3_client.generate_presigned_url(
+
+def upload_image_stream(image_file, metadata: Optional[dict] = None) -> str:
+    """Stream a decoded image file object to S3 (multipart when large)."""
+    image_name = new_image_key()
+    with metrics.span("Upload"):
+        get_s3_client().upload_fileobj(
+            image_file,
+            S3_BUCKET,
+            image_name,
+            ExtraArgs={"Metadata": metadata or {}},
+            Config=transfer_config(),
+        )
+    return image_name
+
+
+def get_presigned_url(image_name: str) -> str:
+    return get_s3_client().generate_presigned_url(
         "get_object",
         Params={"Bucket": S3_BUCKET, "Key": image_name},
         ExpiresIn=1000,
     )
-    return signed_url
 
 
+def get_presigned_urls(image_names: list[str]) -> list[str]:
+    # Signing is local (no S3 round trip), so a batch is just a loop
+    with metrics.span("Presign"):
+        return [get_presigned_url(image_name) for image_name in image_names]
+
+
+def generate_images(
+    description: str, number_of_images: int = 1, user: Optional[str] = None
+) -> list[str]:
+    """
+    Generate images with one Titan invocation and upload them to S3,
+    returning their keys in model order.
+
+    The response body is decoded as it is read (see image_stream.py). All
+    images share that one stream, so every image but the last is decoded
+    into memory and uploaded in the background while the next one is read;
+    the last one streams straight into its upload.
+    """
+    titan_config = get_titan_config(
+        normalize_description(description), number_of_images
+    )
+    metadata = image_metadata(make_cache_key(IMAGE_MODEL_ID, titan_config), user)
+    metrics.set_property("ModelId", IMAGE_MODEL_ID)
+    metrics.add("BedrockRequestBytes", len(titan_config), "Bytes")
+    # Until the response headers: the body is read while decoding below
+    with metrics.span("InvokeModel"):
+        response = get_bedrock().invoke_raw(IMAGE_MODEL_ID, titan_config)
+    headers = response.get("ResponseMetadata", {}).get("HTTPHeaders", {})
+    if "content-length" in headers:
+        metrics.add("BedrockResponseBytes", int(headers["content-length"]), "Bytes")
+
+    upload = metrics.propagate(upload_image_stream)
+    with ThreadPoolExecutor(max_workers=number_of_images) as executor:
+        with metrics.span("DecodeAndUpload"):
+            uploads = []
+            for index, image_file in enumerate(iter_images(response.get("body"))):
+                if index < number_of_images - 1:
+                    decoded = io.BytesIO(image_file.read())
+                    metrics.add("ImageBytes", len(decoded.getbuffer()), "Bytes")
+                    uploads.append(executor.submit(upload, decoded, metadata))
+                else:
+                    uploads.append(executor.submit(upload, image_file, metadata))
+                    # The stream must be fully consumed before moving on
+                    uploads[-1].result()
+            image_names = [future.result() for future in uploads]
+    metrics.add("Images", len(image_names))
+
+    if not image_names:
+        raise ValueError("No images returned by model")
+    return image_names
+
+
+def image_cache_key(description: str, number_of_images: int = 1) -> str:
+    return make_cache_key(
+        IMAGE_MODEL_ID,
+        get_titan_config(normalize_description(description), number_of_images),
+    )
+
+
+def get_images(
+    description: str, number_of_images: int = 1, user: Optional[str] = None
+) -> tuple[list[str], bool]:
+    """
+    Return the S3 keys of the images for `description` and whether they were
+    served from the cache. A hit skips Bedrock and S3 uploads entirely.
+    """
+    cache_key = image_cache_key(description, number_of_images)
+    with metrics.span("CacheLookup"):
+        cached = get_cache().get(cache_key)
+    metrics.add("CacheHit", int(cached is not None))
+    if cached is not None:
+        return json.loads(cached), True
+
+    image_names = generate_images(description, number_of_images, user)
+    with metrics.span("CacheStore"):
+        get_cache().set(cache_key, json.dumps(image_names))
+    return image_names, False
+
+
+def parse_number_of_images(body: dict) -> int:
+    number_of_images = body.get("number_of_images", 1)
+    if (
+        not isinstance(number_of_images, int)
+        or isinstance(number_of_images, bool)
+        or not 1 <= number_of_images <= MAX_IMAGES
+    ):
+        raise ValueError(f"number_of_images must be between 1 and {MAX_IMAGES}")
+    return number_of_images
+
+
+def get_request_user(event: dict) -> Optional[str]:
+    """User forwarded by the auth proxy, if any (only recorded as metadata)."""
+    headers = {k.lower(): v for k, v in (event.get("headers") or {}).items()}
+    return headers.get("x-forwarded-user")
+
+
+def submit_job(
+    description: str, number_of_images: int, user: Optional[str], context
+) -> dict:
+    """Record a pending job and hand it to the worker without waiting for it."""
+    job = get_job_store().create(
+        jobs.new_job_id(),
+        {
+            "description": description,
+            "number_of_images": number_of_images,
+            "user": user,
+        },
+    )
+    cached = get_cache().get(image_cache_key(description, number_of_images))
+    if cached is not None:
+        # Already generated: the job is done before the first poll
+        get_job_store().update(
+            job["job_id"], status=jobs.SUCCEEDED, image_keys=json.loads(cached)
+        )
+        return {**job, "status": jobs.SUCCEEDED}
+
+    try:
+        get_job_dispatcher(context.function_name).dispatch({"job_id": job["job_id"]})
+    except Exception:
+        # No worker will ever pick the job up: don't leave it pending
+        get_job_store().update(
+            job["job_id"], status=jobs.FAILED, error="Dispatch failed"
+        )
+        raise
+    return job
+
+
+def run_job(event: dict) -> None:
+    """Worker: generate the image of a submitted job and record the outcome."""
+    job_id = event["job_id"]
+    job = get_job_store().get(job_id)
+    # Conditional PENDING -> RUNNING, so a duplicate delivery can't run it twice
+    if not job or not get_job_store().claim(job_id):
+        logger.warning(f"Skipping job {job_id}: not pending")
+        return
+    request = job["request"]
+    try:
+        image_keys, _ = get_images(
+            request["description"],
+            request.get("number_of_images", 1),
+            request.get("user"),
+        )
+    except Exception as e:
+        logger.error(f"Job {job_id} failed: {e}")
+        get_job_store().update(job_id, status=jobs.FAILED, error=str(e))
+        return
+    get_job_store().update(job_id, status=jobs.SUCCEEDED, image_keys=image_keys)
+
+
+def job_status(job_id: str) -> dict:
+    job = get_job_store().get(job_id)
+    if not job:
+        return cors_response(404, {"error": "Unknown job"})
+    status = job["status"]
+    if status == jobs.RUNNING:
+        # The worker timed out (or crashed) without recording an outcome
+        started_at = job["updated_at"]
+    elif status == jobs.PENDING:
+        # The async event never reached a worker
+        started_at = job["created_at"]
+    else:
+        started_at = None
+    if started_at is not None and time.time() - started_at > JOB_TIMEOUT_SECONDS:
+        status = jobs.FAILED
+    body = {"job_id": job_id, "status": status}
+    if status == jobs.SUCCEEDED:
+        # Minted on every poll so the URLs are always fresh
+        image_urls = get_presigned_urls(job["image_keys"])
+        body["image_url"] = image_urls[0]
+        body["image_urls"] = image_urls
+    elif status == jobs.FAILED:
+        body["error"] = "Image generation failed"
+    return cors_response(200, body)
+
+
+@metrics.instrument("image")
 def handler(event, context):
+    # Async invocation from submit_job (not an API Gateway event)
+    if "job_id" in event and "httpMethod" not in event:
+        metrics.set_property("Resource", "job-worker")
+        return run_job(event)
+
     try:
-        body = json.loads(event["body"])
+        resource = event.get("resource", "/image")
+        metrics.set_property("Resource", resource)
+        if resource == "/image/jobs/{job_id}":
+            return job_status(event["pathParameters"]["job_id"])
+
+        with metrics.span("ParseRequest"):
+            body = json.loads(event["body"])
         description = body.get("description")
         if not description:
             logger.error("Missing description in the request body")
-            return {
-                "statusCode": 400,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "Content-Type,x-api-key",
-                },
-                "body": json.dumps({"error": "Missing description"}),
-            }
-        titan_config = get_titan_config(description)
-        response = client.invoke_model(
-            body=titan_config,
-            modelId="amazon.titan-image-generator-v1",
-            accept="application/json",
-            contentType="application/json",
+            return cors_response(400, {"error": "Missing description"})
+        try:
+            number_of_images = parse_number_of_images(body)
+        except ValueError as e:
+            return cors_response(400, {"error": str(e)})
+        user = get_request_user(event)
+
+        if resource == "/image/jobs":
+            job = submit_job(description, number_of_images, user, context)
+            return cors_response(
+                202, {"job_id": job["job_id"], "status": job["status"]}
+            )
+
+        image_keys, cache_hit = get_images(description, number_of_images, user)
+        image_urls = get_presigned_urls(image_keys)
+        # `image_url` (the first image) is kept for single-image clients
+        response = cors_response(
+            200, {"image_url": image_urls[0], "image_urls": image_urls}
         )
-        response_body = json.loads(response.get("body").read())
-        if not response_body.get("images"):
-            raise ValueError("No images returned by model")
-        base64_image = response_body.get("images")[0]
-        signed_url = save_image_to_s3(base64_image)
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,x-api-key",
-            },
-            "body": json.dumps({"image_url": signed_url}),
-        }
+        response["headers"]["X-Cache"] = "HIT" if cache_hit else "MISS"
+        return response
     except ClientError as e:
         logger.error(f"AWS service error: {e}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,x-api-key",
-            },
-            "body": json.dumps({"error": "AWS service error"}),
-        }
+        return cors_response(500, {"error": "AWS service error"})
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,x-api-key",
-            },
-            "body": json.dumps({"error": "Unexpected internal error"}),
-        }
+        return cors_response(500, {"error": "Unexpected internal error"})
@@ -0,0 +1,35 @@
+"""Generated-image cache: the shared response cache (response_cache.py)
+configured to map a request hash to the S3 keys of the images already
+generated for it, stored as a JSON list in the table's `image_keys` attribute.
+
+Configuration (environment variables):
+- IMAGE_CACHE_MAX_ENTRIES: in-process LRU size (0 disables it, default 1024)
+- IMAGE_CACHE_TTL_SECONDS: TTL for both tiers (default 7 days); must stay below
+  the bucket lifecycle expiration so a cached key never points at a deleted
+  image
+- IMAGE_CACHE_TABLE: DynamoDB table for the shared tier (optional)
+"""
+
+import response_cache
+
+# Re-exported so callers import everything cache-related from here
+from response_cache import (  # noqa: F401
+    DynamoDBCache,
+    LRUCache,
+    TieredCache,
+    make_cache_key,
+)
+
+
+def normalize_description(description: str) -> str:
+    """Collapse whitespace so trivially different prompts share a cache entry."""
+    return " ".join(description.split())
+
+
+def build_cache_from_env() -> TieredCache:
+    return response_cache.build_cache_from_env(
+        "IMAGE_CACHE",
+        value_attribute="image_keys",
+        ttl_seconds=7 * 86400,
+        max_entries=1024,
+    )
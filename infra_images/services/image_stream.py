@@ -0,0 +1,165 @@
+"""
+Streaming decode of Titan image responses.
+
+A Titan response is `{"images": ["<base64>", ...], ...}`. Parsing it with
+`json.loads` keeps the raw body, every base64 string and then the decoded
+bytes in memory at once. Here the body is scanned as it is read: each image
+is exposed as a file-like object that decodes its base64 string in small
+chunks, so it can be streamed straight into `s3_client.upload_fileobj`
+(multipart for large images) with only a chunk or a part in memory.
+"""
+
+import binascii
+import io
+from typing import Iterator, Optional
+
+# Bytes pulled from the HTTP body per read
+READ_CHUNK_SIZE = 64 * 1024
+
+_transfer_config = None
+
+_WHITESPACE = b" \t\r\n"
+
+
+def transfer_config():
+    """
+    S3 upload settings for streamed images, built on first use (importing
+    boto3.s3.transfer is a large share of a cold start).
+
+    S3 multipart parts must be at least 5 MiB; a single thread keeps exactly one
+    part buffered at a time. Images below the threshold go up in one put_object.
+    """
+    global _transfer_config
+    if _transfer_config is None:
+        from boto3.s3.transfer import TransferConfig
+
+        _transfer_config = TransferConfig(
+            multipart_threshold=8 * 1024 * 1024,
+            multipart_chunksize=5 * 1024 * 1024,
+            max_concurrency=1,
+            use_threads=False,
+        )
+    return _transfer_config
+
+
+class _Scanner:
+    """Minimal forward-only tokenizer over a byte stream."""
+
+    def __init__(self, stream, chunk_size: int = READ_CHUNK_SIZE) -> None:
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._buffer = b""
+        self._pos = 0
+
+    def _fill(self) -> bool:
+        chunk = self._stream.read(self._chunk_size)
+        if not chunk:
+            return False
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def skip_past(self, token: bytes) -> bool:
+        """Advance just after the next occurrence of `token`."""
+        while True:
+            index = self._buffer.find(token, self._pos)
+            if index >= 0:
+                self._pos = index + len(token)
+                return True
+            # Keep a tail in case the token straddles two chunks
+            self._pos = max(self._pos, len(self._buffer) - len(token) + 1)
+            if not self._fill():
+                return False
+
+    def next_byte(self) -> Optional[int]:
+        """Next non-whitespace byte (consumed), or None at the end of the body."""
+        while True:
+            while self._pos < len(self._buffer):
+                byte = self._buffer[self._pos]
+                self._pos += 1
+                if byte not in _WHITESPACE:
+                    return byte
+            if not self._fill():
+                return None
+
+    def read_string(self) -> tuple[bytes, bool]:
+        """
+        Raw bytes of the current JSON string up to the end of the buffer, and
+        whether the closing quote was reached. Backslashes are dropped: the
+        only escape base64 can contain is the optional `\\/`.
+        """
+        if self._pos >= len(self._buffer) and not self._fill():
+            raise ValueError("Truncated image payload")
+        end = self._buffer.find(b'"', self._pos)
+        done = end >= 0
+        if not done:
+            end = len(self._buffer)
+        raw = self._buffer[self._pos : end]
+        self._pos = end + 1 if done else end
+        return raw.replace(b"\\", b""), done
+
+
+class Base64ImageReader(io.RawIOBase):
+    """Read-only file object yielding the decoded bytes of one image."""
+
+    def __init__(self, scanner: _Scanner) -> None:
+        self._scanner = scanner
+        self._pending = bytearray()  # base64 not decoded yet (< 4 chars)
+        self._decoded = bytearray()  # decoded but not read yet
+        self._done = False
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def _decode_more(self) -> None:
+        raw, self._done = self._scanner.read_string()
+        self._pending += raw
+        usable = len(self._pending) if self._done else len(self._pending) // 4 * 4
+        if usable:
+            self._decoded += binascii.a2b_base64(self._pending[:usable])
+            del self._pending[:usable]
+
+    def readinto(self, buffer) -> int:
+        while not self._decoded and not self._done:
+            self._decode_more()
+        size = min(len(buffer), len(self._decoded))
+        buffer[:size] = self._decoded[:size]
+        del self._decoded[:size]
+        self.bytes_read += size
+        return size
+
+    def drain(self) -> None:
+        """Skip whatever is left of this image."""
+        while not self._done:
+            _, self._done = self._scanner.read_string()
+        self._pending.clear()
+        self._decoded.clear()
+
+
+def iter_images(
+    stream, chunk_size: int = READ_CHUNK_SIZE
+) -> Iterator[Base64ImageReader]:
+    """
+    Yield one reader per entry of the `images` array of a Titan response body.
+
+    Readers share the underlying stream, so each must be consumed (or is
+    drained automatically) before the next one is produced.
+    """
+    scanner = _Scanner(stream, chunk_size)
+    if not scanner.skip_past(b'"images"'):
+        return
+    if scanner.next_byte() != ord(":") or scanner.next_byte() != ord("["):
+        raise ValueError("Malformed images array in model response")
+
+    while True:
+        byte = scanner.next_byte()
+        if byte == ord(","):
+            continue
+        if byte == ord("]"):
+            return
+        if byte != ord('"'):
+            raise ValueError("Malformed images array in model response")
+        reader = Base64ImageReader(scanner)
+        yield reader
+        reader.drain()
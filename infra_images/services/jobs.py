@@ -0,0 +1,166 @@
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+PENDING = "PENDING"
+RUNNING = "RUNNING"
+SUCCEEDED = "SUCCEEDED"
+FAILED = "FAILED"
+
+# Finished or abandoned jobs are dropped by the table TTL after a day
+JOB_TTL_SECONDS = 24 * 3600
+
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex
+
+
+class InMemoryJobStore:
+    """Local stand-in for the DynamoDB job table (tests, local runs)."""
+
+    def __init__(self) -> None:
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job_id: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        now = int(time.time())
+        job = {
+            "job_id": job_id,
+            "status": PENDING,
+            "request": request,
+            "created_at": now,
+            "updated_at": now,
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+        return dict(job)
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        with self._lock:
+            self._jobs[job_id].update(fields, updated_at=int(time.time()))
+
+    def claim(self, job_id: str) -> bool:
+        """Move a PENDING job to RUNNING; False if it is not pending."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job or job["status"] != PENDING:
+                return False
+            job.update(status=RUNNING, updated_at=int(time.time()))
+            return True
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+
+class DynamoDBJobStore:
+    """
+    Jobs table: partition key `job_id` (S), TTL attribute `expires_at`.
+    The original request is stored as a JSON string.
+    """
+
+    def __init__(self, table_name: str) -> None:
+        import boto3
+
+        self._table = boto3.resource("dynamodb").Table(table_name)
+
+    def create(self, job_id: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        now = int(time.time())
+        job = {
+            "job_id": job_id,
+            "status": PENDING,
+            "request": json.dumps(request),
+            "created_at": now,
+            "updated_at": now,
+            "expires_at": now + JOB_TTL_SECONDS,
+        }
+        self._table.put_item(Item=job)
+        return {**job, "request": request}
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        fields["updated_at"] = int(time.time())
+        names = {f"#{key}": key for key in fields}
+        values = {f":{key}": value for key, value in fields.items()}
+        self._table.update_item(
+            Key={"job_id": job_id},
+            UpdateExpression="SET " + ", ".join(f"#{key} = :{key}" for key in fields),
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values,
+        )
+
+    def claim(self, job_id: str) -> bool:
+        """
+        Move a PENDING job to RUNNING; False if it is not pending. Conditional,
+        so of two deliveries of the same job only one gets to run it.
+        """
+        from botocore.exceptions import ClientError
+
+        try:
+            self._table.update_item(
+                Key={"job_id": job_id},
+                UpdateExpression="SET #status = :running, #updated_at = :now",
+                ConditionExpression="#status = :pending",
+                ExpressionAttributeNames={
+                    "#status": "status",
+                    "#updated_at": "updated_at",
+                },
+                ExpressionAttributeValues={
+                    ":running": RUNNING,
+                    ":pending": PENDING,
+                    ":now": int(time.time()),
+                },
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return False
+            raise
+        return True
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        item = self._table.get_item(Key={"job_id": job_id}).get("Item")
+        if not item:
+            return None
+        item["request"] = json.loads(item.get("request", "{}"))
+        for key in ("created_at", "updated_at", "expires_at"):
+            if key in item:
+                item[key] = int(item[key])
+        return item
+
+
+def build_job_store():
+    """DynamoDB store when JOBS_TABLE is set, in-memory store otherwise."""
+    table_name = os.getenv("JOBS_TABLE")
+    if table_name:
+        return DynamoDBJobStore(table_name)
+    return InMemoryJobStore()
+
+
+class LambdaDispatcher:
+    """Runs the worker by invoking the Lambda asynchronously (InvocationType=Event)."""
+
+    def __init__(self, function_name: str) -> None:
+        import boto3
+
+        self.function_name = function_name
+        self._client = boto3.client("lambda")
+
+    def dispatch(self, payload: Dict[str, Any]) -> None:
+        self._client.invoke(
+            FunctionName=self.function_name,
+            InvocationType="Event",
+            Payload=json.dumps(payload).encode(),
+        )
+
+
+class InlineDispatcher:
+    """Runs the worker in-process right away (tests, local runs)."""
+
+    def __init__(self, worker: Callable[[Dict[str, Any]], Any]) -> None:
+        self.worker = worker
+
+    def dispatch(self, payload: Dict[str, Any]) -> None:
+        self.worker(payload)
@@ -0,0 +1,199 @@
+"""Two-tier cache of model responses, keyed by request content.
+
+- `LRUCache`: in-process tier, lives as long as the warm Lambda container
+- `DynamoDBCache`: shared tier, one table item per key with a TTL
+- `TieredCache`: looks the tiers up fastest first and back-fills on a hit
+
+The summary and image bundles each configure it for their own responses
+(summary_cache.py, image_cache.py).
+
+Copy shared by the Lambda bundles (each is deployed flat): infra/services and
+infra_images/services; tests/unit/test_shared_modules.py in infra checks they
+stay in sync.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+logger = logging.getLogger(__name__)
+
+# DynamoDB rejects items above 400 KB, keep some headroom for the key/attributes
+DEFAULT_MAX_ITEM_BYTES = 350 * 1024
+
+
+def make_cache_key(model_id: str, config: str) -> str:
+    """
+    Content-addressed key for a model request.
+
+    `config` is the JSON request body, so the key covers the prompt and the
+    whole generation config. It is re-serialized with sorted keys so that
+    equivalent payloads always hash the same.
+    """
+    canonical = json.dumps(json.loads(config), sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha256()
+    digest.update(model_id.encode())
+    digest.update(b"\n")
+    digest.update(canonical.encode())
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """
+    In-process tier, lives as long as the warm Lambda container.
+
+    Also used as the local in-memory backend for offline tests. Thread safe,
+    so batch requests can share it across worker threads.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: int = 3600,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DynamoDBCache:
+    """
+    Shared tier backed by a DynamoDB table, shared by every container.
+
+    Table layout: partition key `cache_key` (S), the value in the
+    `value_attribute` (S) and `expires_at` (N, configured as the table TTL
+    attribute). DynamoDB deletes expired items lazily, so `expires_at` is also
+    checked on read. Failures (throttling, network errors) are logged and
+    treated as misses: the cache never fails a request.
+
+    Uses the low-level client rather than a Table resource because clients
+    are thread safe and resources are not.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        value_attribute: str = "value",
+        ttl_seconds: int = 86400,
+        max_item_bytes: int = DEFAULT_MAX_ITEM_BYTES,
+        client=None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.table_name = table_name
+        self.value_attribute = value_attribute
+        self.ttl_seconds = ttl_seconds
+        self.max_item_bytes = max_item_bytes
+        if client is None:
+            import boto3
+
+            client = boto3.client("dynamodb")
+        self._client = client
+        self._clock = clock
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            response = self._client.get_item(
+                TableName=self.table_name, Key={"cache_key": {"S": key}}
+            )
+        except (ClientError, BotoCoreError) as e:
+            logger.warning(f"Cache read from {self.table_name} failed: {e}")
+            return None
+        item = response.get("Item")
+        if not item or int(item.get("expires_at", {}).get("N", 0)) <= self._clock():
+            return None
+        return item.get(self.value_attribute, {}).get("S")
+
+    def set(self, key: str, value: str) -> None:
+        if len(value.encode()) > self.max_item_bytes:
+            return
+        try:
+            self._client.put_item(
+                TableName=self.table_name,
+                Item={
+                    "cache_key": {"S": key},
+                    self.value_attribute: {"S": value},
+                    "expires_at": {"N": str(int(self._clock() + self.ttl_seconds))},
+                },
+            )
+        except (ClientError, BotoCoreError) as e:
+            logger.warning(f"Cache write to {self.table_name} failed: {e}")
+
+
+class TieredCache:
+    """
+    Looks tiers up in order (fastest first) and back-fills the faster tiers
+    on a hit in a slower one. Writes go to every tier.
+    """
+
+    def __init__(self, *tiers) -> None:
+        self.tiers = list(tiers)
+
+    def get(self, key: str) -> Optional[str]:
+        for index, tier in enumerate(self.tiers):
+            value = tier.get(key)
+            if value is not None:
+                for faster in self.tiers[:index]:
+                    faster.set(key, value)
+                return value
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        for tier in self.tiers:
+            tier.set(key, value)
+
+
+def build_cache_from_env(
+    prefix: str, value_attribute: str, ttl_seconds: int, max_entries: int
+) -> TieredCache:
+    """
+    Build the cache from the Lambda environment, overriding the defaults:
+    - {prefix}_MAX_ENTRIES: in-process LRU size (0 disables it)
+    - {prefix}_TTL_SECONDS: TTL for both tiers
+    - {prefix}_TABLE: DynamoDB table for the shared tier (optional)
+    """
+    ttl_seconds = int(os.environ.get(f"{prefix}_TTL_SECONDS", str(ttl_seconds)))
+    max_entries = int(os.environ.get(f"{prefix}_MAX_ENTRIES", str(max_entries)))
+    table_name = os.environ.get(f"{prefix}_TABLE")
+
+    tiers = [LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)]
+    if table_name:
+        tiers.append(
+            DynamoDBCache(
+                table_name, value_attribute=value_attribute, ttl_seconds=ttl_seconds
+            )
+        )
+    return TieredCache(*tiers)
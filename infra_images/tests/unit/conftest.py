@@ -0,0 +1,71 @@
+import base64
+import io
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Lambda code is deployed from services/ as a flat bundle, so its modules
+# import each other as top-level modules.
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "services"))
+
+# image.py refuses to import without a bucket name
+os.environ.setdefault("S3_BUCKET", "test-image-bucket")
+
+
+class FakeBedrock:
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.calls = 0
+
+    def invoke_model(self, body, modelId, accept, contentType):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        config = json.loads(body)["imageGenerationConfig"]
+        images = [
+            base64.b64encode(f"jpeg-{i}".encode()).decode()
+            for i in range(config["numberOfImages"])
+        ]
+        payload = {"images": images}
+        return {"body": io.BytesIO(json.dumps(payload).encode())}
+
+
+class FakeS3:
+    def __init__(self) -> None:
+        self.objects = {}
+        self.metadata = {}
+
+    def put_object(self, Bucket, Key, Body, Metadata=None):
+        self.objects[Key] = Body
+        self.metadata[Key] = Metadata
+
+    def upload_fileobj(self, Fileobj, Bucket, Key, ExtraArgs=None, Config=None):
+        self.objects[Key] = Fileobj.read()
+        self.metadata[Key] = (ExtraArgs or {}).get("Metadata")
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        return f"https://{Params['Bucket']}.s3/{Params['Key']}?signed"
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    import image
+    import jobs
+    from bedrock_client import BedrockClient
+    from image_cache import LRUCache, TieredCache
+
+    bedrock, s3 = FakeBedrock(), FakeS3()
+    dispatched = []
+
+    def worker(payload):
+        dispatched.append(payload)
+
+    monkeypatch.setattr(image, "bedrock", BedrockClient(bedrock, max_retries=0))
+    monkeypatch.setattr(image, "s3_client", s3)
+    monkeypatch.setattr(image, "job_store", jobs.InMemoryJobStore())
+    monkeypatch.setattr(image, "job_dispatcher", jobs.InlineDispatcher(worker))
+    monkeypatch.setattr(image, "cache", TieredCache(LRUCache()))
+    return bedrock, s3, dispatched
@@ -0,0 +1,95 @@
+import json
+import re
+from datetime import datetime, timezone
+
+import pytest
+
+import image
+
+
+def generate(headers=None, **request):
+    event = {
+        "resource": "/image",
+        "httpMethod": "POST",
+        "headers": headers,
+        "body": json.dumps(request),
+    }
+    response = image.handler(event, None)
+    return response["statusCode"], json.loads(response["body"])
+
+
+def test_several_images_from_one_invocation(backend):
+    bedrock, s3, _ = backend
+
+    status_code, body = generate(description="a red fox", number_of_images=4)
+
+    assert status_code == 200
+    assert bedrock.calls == 1
+    assert len(s3.objects) == 4
+    # URLs follow the model's image order
+    keys = [url.split(".s3/")[1].split("?")[0] for url in body["image_urls"]]
+    expected = [f"jpeg-{i}".encode() for i in range(4)]
+    assert [s3.objects[key] for key in keys] == expected
+    assert body["image_url"] == body["image_urls"][0]
+
+
+def test_single_image_by_default(backend):
+    _, s3, _ = backend
+
+    status_code, body = generate(description="a red fox")
+
+    assert status_code == 200
+    assert len(body["image_urls"]) == 1
+    assert len(s3.objects) == 1
+
+
+@pytest.mark.parametrize("number_of_images", [0, 6, "2", True])
+def test_rejects_invalid_image_counts(backend, number_of_images):
+    status_code, body = generate(
+        description="a fox", number_of_images=number_of_images
+    )
+
+    assert status_code == 400
+    assert "number_of_images" in body["error"]
+
+
+def test_image_keys_are_unique_sharded_and_date_partitioned():
+    now = datetime(2024, 3, 9, tzinfo=timezone.utc)
+    keys = {image.new_image_key(now) for _ in range(1000)}
+
+    assert len(keys) == 1000
+    for key in keys:
+        match = re.fullmatch(
+            r"images/([0-9a-f]{2})/2024/03/09/([0-9a-f]{32})\.jpg", key
+        )
+        assert match and match.group(2).startswith(match.group(1))
+    assert len({key.split("/")[1] for key in keys}) > 200
+
+
+def test_images_are_stored_with_prompt_user_and_model_metadata(backend):
+    _, s3, _ = backend
+
+    generate(headers={"X-Forwarded-User": "zoë"}, description="a red fox")
+
+    [metadata] = s3.metadata.values()
+    assert metadata == {
+        "prompt-hash": image.image_cache_key("a red fox"),
+        "model-id": image.IMAGE_MODEL_ID,
+        "user": "zo%C3%AB",
+    }
+
+
+def test_emits_phase_breakdown_as_embedded_metrics(backend, capsys):
+    generate(description="a red fox", number_of_images=2)
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    emf = next(line for line in lines if "_aws" in line)
+    assert emf["Handler"] == "image"
+    assert emf["ModelId"] == image.IMAGE_MODEL_ID
+    assert emf["StatusCode"] == 200
+    assert emf["Images"] == 2
+    assert len(emf["Upload"]) == 2
+    for phase in ("ParseRequest", "CacheLookup", "InvokeModel", "Presign", "Total"):
+        assert emf[phase] >= 0
+    declared = {m["Name"] for m in emf["_aws"]["CloudWatchMetrics"][0]["Metrics"]}
+    assert {"InvokeModel", "Upload", "RequestBytes", "ResponseBytes"} <= declared
@@ -0,0 +1,53 @@
+import json
+
+import image
+from image_cache import make_cache_key, normalize_description
+
+
+def generate(description):
+    event = {
+        "resource": "/image",
+        "httpMethod": "POST",
+        "body": json.dumps({"description": description}),
+    }
+    return image.handler(event, None)
+
+
+def test_cache_key_covers_description_and_config(monkeypatch):
+    key = make_cache_key("model", image.get_titan_config("a red fox"))
+
+    assert key == make_cache_key(
+        "model", image.get_titan_config(normalize_description("  a  red\tfox "))
+    )
+    assert key != make_cache_key("model", image.get_titan_config("a blue fox"))
+    monkeypatch.setattr(image, "IMAGE_SEED", 42)
+    assert key != make_cache_key("model", image.get_titan_config("a red fox"))
+
+
+def test_repeated_prompt_skips_bedrock_and_reuses_s3_object(backend):
+    bedrock, s3, _ = backend
+
+    first = generate("a red fox")
+    second = generate(" a red   fox")
+
+    assert first["headers"]["X-Cache"] == "MISS"
+    assert second["headers"]["X-Cache"] == "HIT"
+    assert bedrock.calls == 1
+    assert len(s3.objects) == 1
+    assert json.loads(first["body"]) == json.loads(second["body"])
+
+
+def test_cached_prompt_job_succeeds_without_dispatch(backend):
+    bedrock, _, dispatched = backend
+    generate("a red fox")
+
+    event = {
+        "resource": "/image/jobs",
+        "httpMethod": "POST",
+        "body": json.dumps({"description": "a red fox"}),
+    }
+    response = image.handler(event, None)
+
+    assert json.loads(response["body"])["status"] == "SUCCEEDED"
+    assert dispatched == []
+    assert bedrock.calls == 1
@@ -0,0 +1,160 @@
+import json
+
+import image
+
+
+class FakeContext:
+    function_name = "image-lambda"
+
+
+def submit(description="a red fox"):
+    event = {
+        "resource": "/image/jobs",
+        "httpMethod": "POST",
+        "body": json.dumps({"description": description}),
+    }
+    return image.handler(event, FakeContext())
+
+
+def poll(job_id):
+    event = {
+        "resource": "/image/jobs/{job_id}",
+        "httpMethod": "GET",
+        "pathParameters": {"job_id": job_id},
+    }
+    response = image.handler(event, FakeContext())
+    return response["statusCode"], json.loads(response["body"])
+
+
+def test_submit_returns_immediately_and_worker_completes_job(backend):
+    bedrock, s3, dispatched = backend
+
+    response = submit()
+    assert response["statusCode"] == 202
+    job_id = json.loads(response["body"])["job_id"]
+    # Submitting only dispatches the worker, it never calls the model
+    assert bedrock.calls == 0
+    assert poll(job_id) == (200, {"job_id": job_id, "status": "PENDING"})
+
+    # The async invocation carries only the job id
+    assert dispatched == [{"job_id": job_id}]
+    assert image.handler(dispatched[0], FakeContext()) is None
+
+    status_code, body = poll(job_id)
+    assert status_code == 200
+    assert body["status"] == "SUCCEEDED"
+    [key] = s3.objects
+    assert body["image_url"].endswith(f"/{key}?signed")
+    assert bedrock.calls == 1
+
+
+def test_failed_job_reports_error_and_is_not_rerun(backend):
+    bedrock, _, dispatched = backend
+    bedrock.fail = True
+
+    job_id = json.loads(submit()["body"])["job_id"]
+    image.handler(dispatched[0], FakeContext())
+    image.handler(dispatched[0], FakeContext())  # duplicate delivery
+
+    assert poll(job_id) == (
+        200,
+        {"job_id": job_id, "status": "FAILED", "error": "Image generation failed"},
+    )
+    assert bedrock.calls == 1
+
+
+def test_unknown_job_and_missing_description(backend):
+    assert poll("does-not-exist")[0] == 404
+    assert submit(description="")["statusCode"] == 400
+
+
+def test_job_with_several_images_returns_every_url(backend):
+    bedrock, s3, dispatched = backend
+    event = {
+        "resource": "/image/jobs",
+        "httpMethod": "POST",
+        "body": json.dumps({"description": "a red fox", "number_of_images": 3}),
+    }
+    job_id = json.loads(image.handler(event, FakeContext())["body"])["job_id"]
+    image.handler(dispatched[0], FakeContext())
+
+    status_code, body = poll(job_id)
+    assert body["status"] == "SUCCEEDED"
+    assert len(body["image_urls"]) == 3
+    assert bedrock.calls == 1
+
+
+def test_only_one_delivery_claims_a_pending_job(backend):
+    _, _, dispatched = backend
+    job_id = json.loads(submit()["body"])["job_id"]
+    store = image.get_job_store()
+
+    assert store.claim(job_id) is True
+    assert store.claim(job_id) is False
+    assert store.claim("does-not-exist") is False
+    # A worker arriving after the claim leaves the running job alone
+    image.handler(dispatched[0], FakeContext())
+    assert poll(job_id)[1]["status"] == "RUNNING"
+
+
+def test_running_job_past_the_worker_timeout_is_reported_failed(
+    backend, monkeypatch
+):
+    job_id = json.loads(submit()["body"])["job_id"]
+    store = image.get_job_store()
+    store.claim(job_id)
+    assert poll(job_id)[1]["status"] == "RUNNING"
+
+    started = store.get(job_id)["updated_at"]
+    monkeypatch.setattr(
+        image.time, "time", lambda: started + image.JOB_TIMEOUT_SECONDS + 1
+    )
+    assert poll(job_id) == (
+        200,
+        {"job_id": job_id, "status": "FAILED", "error": "Image generation failed"},
+    )
+
+
+def test_pending_job_past_the_worker_timeout_is_reported_failed(
+    backend, monkeypatch
+):
+    job_id = json.loads(submit()["body"])["job_id"]
+    assert poll(job_id)[1]["status"] == "PENDING"
+
+    # The async event was lost: no worker ever claims the job
+    created = image.get_job_store().get(job_id)["created_at"]
+    monkeypatch.setattr(
+        image.time, "time", lambda: created + image.JOB_TIMEOUT_SECONDS + 1
+    )
+    assert poll(job_id)[1]["status"] == "FAILED"
+
+
+def test_failed_dispatch_marks_the_job_failed(backend, monkeypatch):
+    class BrokenDispatcher:
+        def dispatch(self, payload):
+            raise RuntimeError("lambda unavailable")
+
+    monkeypatch.setattr(image, "job_dispatcher", BrokenDispatcher())
+
+    assert submit()["statusCode"] == 500
+    [job] = image.get_job_store()._jobs.values()
+    assert job["status"] == "FAILED"
+    assert poll(job["job_id"])[1]["status"] == "FAILED"
+
+
+def test_dispatcher_is_created_once_and_reused(backend, monkeypatch):
+    created = []
+
+    class FakeLambdaDispatcher:
+        def __init__(self, function_name):
+            created.append(function_name)
+
+        def dispatch(self, payload):
+            pass
+
+    monkeypatch.setattr(image.jobs, "LambdaDispatcher", FakeLambdaDispatcher)
+    monkeypatch.setattr(image, "job_dispatcher", None)
+
+    assert submit()["statusCode"] == 202
+    assert submit(description="a blue fox")["statusCode"] == 202
+    assert created == ["image-lambda"]
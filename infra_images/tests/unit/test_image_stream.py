@@ -0,0 +1,57 @@
+import base64
+import io
+import json
+import os
+
+import pytest
+
+from image_stream import iter_images
+
+
+def titan_body(images, escape_slashes=False):
+    body = json.dumps({"images": images, "error": None})
+    if escape_slashes:
+        body = body.replace("/", "\\/")
+    return io.BytesIO(body.encode())
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_decodes_every_image_across_chunk_boundaries(chunk_size):
+    originals = [os.urandom(3000), os.urandom(1), b"", os.urandom(10_001)]
+    body = titan_body(
+        [base64.b64encode(image).decode() for image in originals],
+        escape_slashes=True,
+    )
+
+    decoded = [reader.read() for reader in iter_images(body, chunk_size=chunk_size)]
+
+    assert decoded == originals
+
+
+def test_partially_read_images_are_skipped():
+    originals = [os.urandom(500), os.urandom(500)]
+    body = titan_body([base64.b64encode(image).decode() for image in originals])
+
+    readers = iter_images(body, chunk_size=16)
+    first = next(readers)
+    assert first.read(10) == originals[0][:10]
+
+    assert next(readers).read() == originals[1]
+    assert list(readers) == []
+
+
+def test_reads_in_bounded_chunks():
+    image = os.urandom(64 * 1024)
+    body = titan_body([base64.b64encode(image).decode()])
+
+    reader = next(iter_images(body, chunk_size=1024))
+    parts = iter(lambda: reader.read(4096), b"")
+
+    assert all(len(part) <= 4096 for part in parts)
+    assert reader.bytes_read == len(image)
+
+
+def test_missing_images_yields_nothing():
+    body = io.BytesIO(b'{"error": "ValidationException"}')
+
+    assert list(iter_images(body)) == []
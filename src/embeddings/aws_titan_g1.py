@@ -1,13 +1,11 @@
-import boto3
 import json
 import os
 from dotenv import load_dotenv
 
+from src.bedrock.client import invoke
+
 load_dotenv()
 
-client = boto3.client(
-    service_name="bedrock-runtime", region_name=os.getenv("AWS_REGION")
-)
 model_id = os.getenv("EMBED_MODEL_ID")
 
 input_text = "Please recommend books with a theme similar to the movie 'Inception'."
@@ -15,11 +13,8 @@ input_text = "Please recommend books with a theme similar to the movie 'Inceptio
 # Create the request for the model.
 request = json.dumps({"inputText": input_text})
 
-# Invoke the model with the request.
-response = client.invoke_model(modelId=model_id, body=request)
-
-# Decode the model's native response body.
-model_response = json.loads(response["body"].read())
+# Invoke the model with the request and decode its native response body.
+model_response = invoke(model_id, request)
 
 # Extract and print the generated embedding and the input text token count.
 embedding = model_response["embedding"]
@@ -0,0 +1,282 @@
+"""Embedding cache shared by every Bedrock embedding call site.
+
+Vectors are keyed by model ID, model parameters (e.g. dimensions, normalize)
+and a SHA-256 of the input (text or raw image bytes) and stored as float32
+blobs in a single SQLite file, so a vector costs 4 bytes per dimension on
+disk. The cache is bounded: once it holds more than `max_entries` vectors the
+least recently used ones are evicted.
+
+- `EmbeddingCache.get_or_compute` wraps a single embedding call,
+  `get_or_compute_many` a list of them (one transaction for the new vectors)
+- `CachedEmbeddings` wraps a LangChain `Embeddings` (e.g. BedrockEmbeddings)
+
+Configuration (environment variables):
+- EMBEDDING_CACHE_PATH         (default .cache/embeddings.sqlite3)
+- EMBEDDING_CACHE_MAX_ENTRIES  (default 100000)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence, Union
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+DEFAULT_CACHE_PATH = ".cache/embeddings.sqlite3"
+DEFAULT_MAX_ENTRIES = 100_000
+
+Content = Union[str, bytes]
+
+
+def content_key(
+    model_id: str, content: Content, model_kwargs: Optional[dict] = None
+) -> str:
+    """Cache key for an input: the same text or image always maps to the same key."""
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    digest = hashlib.sha256()
+    digest.update(model_id.encode("utf-8"))
+    digest.update(b"\0")
+    if model_kwargs:
+        # Same model, other dimensions / normalization: a different vector
+        digest.update(json.dumps(model_kwargs, sort_keys=True).encode("utf-8"))
+        digest.update(b"\0")
+    digest.update(data)
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite-backed, LRU-bounded store of float32 embedding vectors."""
+
+    def __init__(
+        self, path: str = DEFAULT_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # One connection shared by all threads, serialized by the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    model_id TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS embeddings_last_used "
+                "ON embeddings (last_used)"
+            )
+            # Kept up to date by put_many/_evict so puts don't count the table
+            # (other processes sharing the file are only seen on reopen)
+            (self._count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM embeddings"
+            ).fetchone()
+
+    @classmethod
+    def from_env(cls) -> "EmbeddingCache":
+        return cls(
+            path=os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH),
+            max_entries=int(
+                os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES))
+            ),
+        )
+
+    def get_many(
+        self,
+        model_id: str,
+        contents: Sequence[Content],
+        model_kwargs: Optional[dict] = None,
+    ) -> list[Optional[list[float]]]:
+        """Cached vectors for `contents`, None where the input is not cached."""
+        keys = [content_key(model_id, content, model_kwargs) for content in contents]
+        found: dict[str, bytes] = {}
+        with self._lock, self._conn:
+            # Stay below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start : start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+        return [
+            np.frombuffer(found[key], dtype=np.float32).tolist() if key in found else None
+            for key in keys
+        ]
+
+    def put_many(
+        self,
+        model_id: str,
+        contents: Sequence[Content],
+        vectors: Sequence[Sequence[float]],
+        model_kwargs: Optional[dict] = None,
+    ) -> None:
+        """Store the vectors of `contents` in one transaction."""
+        now = time.time()
+        rows = [
+            (
+                content_key(model_id, content, model_kwargs),
+                model_id,
+                np.asarray(vector, dtype=np.float32).tobytes(),
+                now,
+            )
+            for content, vector in zip(contents, vectors)
+        ]
+        with self._lock, self._conn:
+            inserted = self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, model_id, vector, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            ).rowcount
+            if inserted < len(rows):
+                # Some keys were already cached: refresh those rows in place
+                self._conn.executemany(
+                    "UPDATE embeddings SET vector = ?, last_used = ? WHERE key = ?",
+                    [(vector, used, key) for key, _, vector, used in rows],
+                )
+            self._count += inserted
+            self._evict()
+
+    def get(
+        self, model_id: str, content: Content, model_kwargs: Optional[dict] = None
+    ) -> Optional[list[float]]:
+        return self.get_many(model_id, [content], model_kwargs)[0]
+
+    def put(
+        self,
+        model_id: str,
+        content: Content,
+        vector: Sequence[float],
+        model_kwargs: Optional[dict] = None,
+    ) -> None:
+        self.put_many(model_id, [content], [vector], model_kwargs)
+
+    def get_or_compute(
+        self,
+        model_id: str,
+        content: Content,
+        compute: Callable[[], list[float]],
+        model_kwargs: Optional[dict] = None,
+    ) -> list[float]:
+        """Return the cached vector, or call `compute` (the Bedrock call) and cache it."""
+        vector = self.get(model_id, content, model_kwargs)
+        if vector is None:
+            vector = compute()
+            self.put(model_id, content, vector, model_kwargs)
+        return vector
+
+    def get_or_compute_many(
+        self,
+        model_id: str,
+        contents: Sequence[Content],
+        compute: Callable[[Content], list[float]],
+        model_kwargs: Optional[dict] = None,
+    ) -> list[list[float]]:
+        """
+        Vectors for every input: cached ones from one lookup, the rest from
+        `compute(content)`, stored together in one transaction.
+        """
+        vectors = self.get_many(model_id, contents, model_kwargs)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            # Compute each distinct missing input once
+            unique = list(dict.fromkeys(contents[i] for i in missing))
+            computed = {content: compute(content) for content in unique}
+            self.put_many(model_id, unique, list(computed.values()), model_kwargs)
+            for i in missing:
+                vectors[i] = computed[contents[i]]
+        return vectors
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count
+
+    def _evict(self) -> None:
+        """Drop the least recently used vectors above `max_entries` (lock held)."""
+        excess = self._count - self.max_entries
+        if excess > 0:
+            self._count -= self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                (excess,),
+            ).rowcount
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    LangChain `Embeddings` wrapper that only sends cache misses to the
+    underlying model. Exposes `model_id` like BedrockEmbeddings does.
+
+    `model_kwargs` defaults to the wrapped model's (BedrockEmbeddings keeps
+    dimensions / normalize there), looked up through wrapper layers.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model_id: str,
+        cache: EmbeddingCache,
+        model_kwargs: Optional[dict] = None,
+    ) -> None:
+        self.embeddings = embeddings
+        self.model_id = model_id
+        self.cache = cache
+        if model_kwargs is None:
+            model_kwargs = find_model_kwargs(embeddings)
+        self.model_kwargs = model_kwargs
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors = self.cache.get_many(self.model_id, texts, self.model_kwargs)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            # Embed each distinct missing text once
+            unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+            computed = dict(
+                zip(unique_texts, self.embeddings.embed_documents(unique_texts))
+            )
+            self.cache.put_many(
+                self.model_id,
+                list(computed),
+                list(computed.values()),
+                self.model_kwargs,
+            )
+            for i in missing:
+                vectors[i] = computed[texts[i]]
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.cache.get_or_compute(
+            self.model_id,
+            text,
+            lambda: self.embeddings.embed_query(text),
+            self.model_kwargs,
+        )
+
+
+def find_model_kwargs(embeddings: Any) -> Optional[dict]:
+    """`model_kwargs` of `embeddings` or of the model it wraps (`.embeddings`)."""
+    while embeddings is not None:
+        model_kwargs = getattr(embeddings, "model_kwargs", None)
+        if model_kwargs:
+            return dict(model_kwargs)
+        embeddings = getattr(embeddings, "embeddings", None)
+    return None
@@ -1,23 +1,15 @@
-import boto3
-import json
 import os
 from dotenv import load_dotenv
-import numpy as np
 
+from src.bedrock.client import invoke
+from src.embeddings.cache import EmbeddingCache
+from src.embeddings.similarity import SimilarityIndex
 
-load_dotenv()
 
-client = boto3.client(
-    service_name="bedrock-runtime", region_name=os.getenv("AWS_REGION")
-)
+load_dotenv()
 
 model_id = os.getenv("EMBED_MODEL_ID")
-
-
-# Helper functions for cosine similarity
-def cosine_similarity(vec1, vec2):
-    v1, v2 = np.array(vec1), np.array(vec2)
-    return float(np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2)))
+embedding_cache = EmbeddingCache.from_env()
 
 
 facts = [
@@ -36,31 +28,27 @@ query = "A small domesticated carnivore"
 
 
 def get_embeddings(text: str) -> list[float]:
-    response = client.invoke_model(
-        modelId=model_id,
-        body=json.dumps({"inputText": text}),
-        accept="application/json",
-        contentType="application/json",
-    )
-    response_body = json.loads(response.get("body").read())
-    return response_body["embedding"]
-
-
-# Get the embeddings for the facts
-fact_embeddings = []
-for fact in facts:
-    fact_embeddings.append(
-        {
-            "fact": fact,
-            "embedding": get_embeddings(fact),
-        }
+    return embedding_cache.get_or_compute(
+        model_id, text, lambda: invoke_embedding_model(text)
     )
 
 
-# Get the similarity between the query and the facts
+def invoke_embedding_model(text: str) -> list[float]:
+    return invoke(model_id, {"inputText": text})["embedding"]
+
+
+# Get the embeddings for the facts (new ones cached in one transaction) and
+# stack them into one normalized matrix
+fact_embeddings = embedding_cache.get_or_compute_many(
+    model_id, facts, invoke_embedding_model
+)
+fact_index = SimilarityIndex(fact_embeddings, labels=facts)
+
+
+# Get the similarity between the query and every fact in one matrix product
 query_embedding = get_embeddings(query)
-for fact_embedding in fact_embeddings:
-    similarity = cosine_similarity(query_embedding, fact_embedding["embedding"])
-    print(
-        f"Similarity between '{query}' and '{fact_embedding['fact']}': {similarity:.3f}"
-    )
+for fact, similarity in zip(facts, fact_index.scores(query_embedding)):
+    print(f"Similarity between '{query}' and '{fact}': {similarity:.3f}")
+
+best_fact, best_score = fact_index.top_k(query_embedding, k=1)[0]
+print(f"\nClosest fact: '{best_fact}' ({best_score:.3f})")
@@ -1,24 +1,16 @@
 import base64
-import boto3
-import json
 import os
 from dotenv import load_dotenv
-import numpy as np
 
+from src.bedrock.client import invoke
+from src.embeddings.cache import EmbeddingCache
+from src.embeddings.similarity import SimilarityIndex
 
-load_dotenv()
 
-client = boto3.client(
-    service_name="bedrock-runtime", region_name=os.getenv("AWS_REGION")
-)
+load_dotenv()
 
 model_id = os.getenv("EMBED_MODEL_ID")
-
-
-# Helper functions for cosine similarity
-def cosine_similarity(vec1, vec2):
-    v1, v2 = np.array(vec1), np.array(vec2)
-    return float(np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2)))
+embedding_cache = EmbeddingCache.from_env()
 
 
 images = [
@@ -28,29 +20,32 @@ images = [
 ]
 
 
-def get_embeddings(image_path: str) -> list[float]:
+def read_image(image_path: str) -> bytes:
     with open(image_path, "rb") as image:
-        base_image = base64.b64encode(image.read()).decode("utf8")
+        return image.read()
 
-    response = client.invoke_model(
-        modelId=model_id,
-        body=json.dumps({"inputImage": base_image}),
-        accept="application/json",
-        contentType="application/json",
+
+def get_embeddings(image_path: str) -> list[float]:
+    image_bytes = read_image(image_path)
+    # Keyed on the image content, so renamed/copied files are still cache hits
+    return embedding_cache.get_or_compute(
+        model_id, image_bytes, lambda: invoke_embedding_model(image_bytes)
     )
-    response_body = json.loads(response.get("body").read())
-    return response_body["embedding"]
 
 
-images_embeddings = []
-for image in images:
-    images_embeddings.append({"Path": image, "embedding": get_embeddings(image)})
+def invoke_embedding_model(image_bytes: bytes) -> list[float]:
+    base_image = base64.b64encode(image_bytes).decode("utf8")
+    return invoke(model_id, {"inputImage": base_image})["embedding"]
+
+
+# New embeddings are cached together in one transaction
+image_embeddings = embedding_cache.get_or_compute_many(
+    model_id, [read_image(image) for image in images], invoke_embedding_model
+)
+images_index = SimilarityIndex(image_embeddings, labels=images)
 
 test_image = "images/stability_image.png"
 test_image_embedding = get_embeddings(test_image)
 
-for image_embedding in images_embeddings:
-    similarity = cosine_similarity(test_image_embedding, image_embedding["embedding"])
-    print(
-        f"Similarity between {test_image} and {image_embedding['Path']}: {similarity:.3f}"
-    )
+for image, similarity in zip(images, images_index.scores(test_image_embedding)):
+    print(f"Similarity between {test_image} and {image}: {similarity:.3f}")
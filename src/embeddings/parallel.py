@@ -0,0 +1,136 @@
+"""Concurrent embedding stage for LangChain vector stores.
+
+BedrockEmbeddings.embed_documents makes one Bedrock call per text, one after the
+other, so indexing throughput is bounded by per-call latency. ConcurrentEmbeddings
+issues those calls from a bounded thread pool and reassembles the vectors in
+input order, so FAISS.from_documents / add_documents still bulk-add one list.
+
+Throttling is handled with a backoff shared by all workers: a throttled call
+doubles the pacing delay every worker waits before its next call, successes
+decay it again, so the pool settles at the rate the Bedrock quota allows
+instead of every thread retrying on its own. Calls also take a token from the
+model's rate limiter in the shared Bedrock client (src/bedrock/client.py), so
+they are paced together with every other caller of that model.
+
+Configuration (environment variables):
+- EMBED_CONCURRENCY  (default 8)
+"""
+
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from botocore.exceptions import ClientError
+from langchain_core.embeddings import Embeddings
+
+from src.bedrock.client import TokenBucket, get_client, is_throttling_error
+
+
+T = TypeVar("T")
+
+
+class AdaptiveBackoff:
+    """Pacing delay shared by every worker: doubles on throttling, decays on success."""
+
+    def __init__(
+        self, base_delay: float = 0.1, max_delay: float = 20.0, decay: float = 0.5
+    ) -> None:
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.decay = decay
+        self.delay = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        delay = self.delay
+        if delay > 0:
+            # Jitter spreads the workers out instead of waking them together
+            time.sleep(random.uniform(delay / 2, delay))
+
+    def on_throttle(self) -> None:
+        with self._lock:
+            self.delay = min(self.max_delay, max(self.base_delay, self.delay * 2))
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.delay *= self.decay
+            if self.delay < self.base_delay / 2:
+                self.delay = 0.0
+
+
+class ConcurrentEmbeddings(Embeddings):
+    """
+    LangChain `Embeddings` wrapper that embeds documents concurrently.
+
+    `texts_per_call` > 1 only makes sense for models that embed several texts
+    per request (e.g. Cohere); Titan embeds one text per call.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model_id: str,
+        max_workers: int = 8,
+        max_retries: int = 6,
+        texts_per_call: int = 1,
+        backoff: Optional[AdaptiveBackoff] = None,
+        limiter: Optional[TokenBucket] = None,
+    ) -> None:
+        self.embeddings = embeddings
+        self.model_id = model_id
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.texts_per_call = texts_per_call
+        self.backoff = backoff or AdaptiveBackoff()
+        self.limiter = limiter
+
+    @classmethod
+    def from_env(cls, embeddings: Embeddings, model_id: str) -> "ConcurrentEmbeddings":
+        return cls(
+            embeddings,
+            model_id=model_id,
+            max_workers=int(os.getenv("EMBED_CONCURRENCY", "8")),
+            limiter=get_client().limiter(model_id),
+        )
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        batches = [
+            texts[start : start + self.texts_per_call]
+            for start in range(0, len(texts), self.texts_per_call)
+        ]
+        if len(batches) <= 1 or self.max_workers <= 1:
+            results = [self._embed_batch(batch) for batch in batches]
+        else:
+            workers = min(self.max_workers, len(batches))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                # map() yields in submission order: vectors line up with texts
+                results = list(pool.map(self._embed_batch, batches))
+        return [vector for batch in results for vector in batch]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._call(lambda: self.embeddings.embed_query(text))
+
+    def _embed_batch(self, batch: list[str]) -> list[list[float]]:
+        return self._call(lambda: self.embeddings.embed_documents(batch))
+
+    def _call(self, fn: Callable[[], T]) -> T:
+        for attempt in range(self.max_retries + 1):
+            self.backoff.wait()
+            if self.limiter is not None:
+                self.limiter.acquire()
+            try:
+                result = fn()
+            except ClientError as e:
+                if not is_throttling_error(e) or attempt == self.max_retries:
+                    raise
+                self.backoff.on_throttle()
+                if self.limiter is not None:
+                    self.limiter.on_throttle()
+                continue
+            self.backoff.on_success()
+            if self.limiter is not None:
+                self.limiter.on_success()
+            return result
@@ -0,0 +1,110 @@
+"""Vectorized cosine similarity over an embedding corpus.
+
+The corpus is stacked once into a row-normalized float32 matrix, so cosine
+similarity against every vector is a single matrix-vector product and top-k
+selection uses `np.argpartition` (O(n)) instead of a full sort. Batched queries
+are answered with matrix-matrix products, in query blocks to bound memory.
+"""
+
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+
+def normalize(vectors: Any) -> np.ndarray:
+    """Return a float32 2-D array whose rows have unit L2 norm (zero rows stay zero)."""
+    matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def cosine_similarity(vec1: Sequence[float], vec2: Sequence[float]) -> float:
+    """Cosine similarity of a single pair (prefer SimilarityIndex for many pairs)."""
+    v1, v2 = normalize([vec1, vec2])
+    return float(np.dot(v1, v2))
+
+
+def _top_k_rows(scores: np.ndarray, k: int) -> np.ndarray:
+    """Column indices of the k best scores per row, best first."""
+    n = scores.shape[1]
+    k = min(k, n)
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(n), scores.shape)
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+class SimilarityIndex:
+    """
+    In-memory nearest-neighbour index over embedding vectors.
+
+    `labels` are returned alongside scores (e.g. the source text or image
+    path); they default to the row positions.
+    """
+
+    def __init__(
+        self, vectors: Any = None, labels: Optional[Sequence[Any]] = None
+    ) -> None:
+        self.matrix = np.empty((0, 0), dtype=np.float32)
+        self.labels: list[Any] = []
+        if vectors is not None and len(vectors):
+            self.add(vectors, labels)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def add(self, vectors: Any, labels: Optional[Sequence[Any]] = None) -> None:
+        """Append vectors (normalized once, here) to the corpus."""
+        rows = normalize(vectors)
+        if labels is None:
+            labels = range(len(self.labels), len(self.labels) + len(rows))
+        labels = list(labels)
+        if len(labels) != len(rows):
+            raise ValueError("Got a different number of vectors and labels")
+        if self.matrix.size and rows.shape[1] != self.matrix.shape[1]:
+            raise ValueError(
+                f"Expected vectors of dimension {self.matrix.shape[1]}, "
+                f"got {rows.shape[1]}"
+            )
+        self.matrix = rows if not self.matrix.size else np.vstack([self.matrix, rows])
+        self.labels.extend(labels)
+
+    def scores(self, query: Sequence[float]) -> np.ndarray:
+        """Cosine similarity of `query` against every vector, in corpus order."""
+        return self.matrix @ normalize(query)[0]
+
+    def top_k(self, query: Sequence[float], k: int = 5) -> list[tuple[Any, float]]:
+        """The k most similar corpus entries as (label, score), best first."""
+        return self.top_k_batch([query], k)[0]
+
+    def top_k_batch(
+        self, queries: Any, k: int = 5, block_size: int = 1024
+    ) -> list[list[tuple[Any, float]]]:
+        """
+        Top-k for many queries at once.
+
+        Queries are processed `block_size` at a time, so the score matrix never
+        exceeds block_size x len(corpus).
+        """
+        if not len(self) or k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        query_matrix = normalize(queries)
+        results = []
+        for start in range(0, len(query_matrix), block_size):
+            block = query_matrix[start : start + block_size]
+            scores = block @ self.matrix.T
+            best = _top_k_rows(scores, k)
+            best_scores = np.take_along_axis(scores, best, axis=1)
+            for row_indices, row_scores in zip(best, best_scores):
+                results.append(
+                    [
+                        (self.labels[index], float(score))
+                        for index, score in zip(row_indices, row_scores)
+                    ]
+                )
+        return results
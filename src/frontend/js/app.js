@@ -197,7 +197,8 @@ async function handleGenerateImage() {
   setButtonLoading(generateBtn, true);
 
   try {
-    const response = await fetch(CONFIG.IMAGE_PROXY_URL, {
+    // Submit an async job, then poll it until the image is ready
+    const response = await fetch(`${CONFIG.IMAGE_PROXY_URL}/jobs`, {
       method: "POST",
       headers: {
         "Content-Type": "application/json",
@@ -218,7 +219,8 @@ async function handleGenerateImage() {
       );
     }
 
-    const data = await response.json();
+    const { job_id } = await response.json();
+    const data = await pollImageJob(job_id, token);
 
     // Display result
     generatedImage.src = data.image_url;
@@ -232,6 +234,56 @@ async function handleGenerateImage() {
   }
 }
 
+const IMAGE_JOB_POLL_INTERVAL_MS = 1500;
+// Overall deadline for a job: above the worker's 90s Lambda timeout, after
+// which the status endpoint reports a still-running job as failed
+const IMAGE_JOB_TIMEOUT_MS = 120000;
+
+async function pollImageJob(jobId, token) {
+  const deadline = Date.now() + IMAGE_JOB_TIMEOUT_MS;
+
+  while (Date.now() + IMAGE_JOB_POLL_INTERVAL_MS < deadline) {
+    await new Promise((resolve) =>
+      setTimeout(resolve, IMAGE_JOB_POLL_INTERVAL_MS)
+    );
+
+    // A hanging status request must not outlive the deadline either
+    const controller = new AbortController();
+    const abortTimer = setTimeout(
+      () => controller.abort(),
+      Math.max(0, deadline - Date.now())
+    );
+    let response;
+    let data;
+    try {
+      response = await fetch(`${CONFIG.IMAGE_PROXY_URL}/jobs/${jobId}`, {
+        method: "GET",
+        headers: { Authorization: `Bearer ${token}` },
+        signal: controller.signal,
+      });
+      data = await response.json().catch(() => ({}));
+    } catch (error) {
+      if (error.name === "AbortError") {
+        break;
+      }
+      throw error;
+    } finally {
+      clearTimeout(abortTimer);
+    }
+
+    if (!response.ok) {
+      throw new Error(data.error || `HTTP error! status: ${response.status}`);
+    }
+    if (data.status === "SUCCEEDED") {
+      return data;
+    }
+    if (data.status === "FAILED") {
+      throw new Error(data.error || "Image generation failed");
+    }
+  }
+  throw new Error("Timed out waiting for the image");
+}
+
 // ============================================
 // Image Download
 // ============================================
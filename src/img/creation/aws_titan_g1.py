@@ -1,15 +1,12 @@
 import base64
-import boto3
 import json
 import os
 from dotenv import load_dotenv
 
+from src.bedrock.client import invoke
 
-load_dotenv()
 
-client = boto3.client(
-    service_name="bedrock-runtime", region_name=os.getenv("AWS_REGION")
-)
+load_dotenv()
 
 prompt = "A photo of a cat"
 
@@ -29,15 +26,7 @@ titan_g1_image_config = json.dumps(
 )
 
 # Invoke the model with the request.
-response = client.invoke_model(
-    body=titan_g1_image_config,
-    modelId=os.getenv("IMAGE_MODEL_ID"),
-    accept="application/json",
-    contentType="application/json",
-)
-
-
-response_body = json.loads(response.get("body").read())
+response_body = invoke(os.getenv("IMAGE_MODEL_ID"), titan_g1_image_config)
 
 base64_image = response_body.get("images")[0]
 base64_bytes = base64_image.encode("ascii")
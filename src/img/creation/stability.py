@@ -1,14 +1,11 @@
-import boto3
 import os
 import json
 from dotenv import load_dotenv
 import base64
 
-load_dotenv()
+from src.bedrock.client import invoke
 
-client = boto3.client(
-    service_name="bedrock-runtime", region_name=os.getenv("AWS_REGION")
-)
+load_dotenv()
 
 stability_image_config = json.dumps(
     {
@@ -17,15 +14,7 @@ stability_image_config = json.dumps(
 )
 
 # Invoke the model with the request.
-response = client.invoke_model(
-    modelId=os.getenv("IMAGE_MODEL_ID"),
-    body=stability_image_config,
-    accept="application/json",
-    contentType="application/json",
-)
-
-
-response_body = json.loads(response.get("body").read())
+response_body = invoke(os.getenv("IMAGE_MODEL_ID"), stability_image_config)
 base64_image_data = response_body.get("images")[0]
 
 # Extract the image data.
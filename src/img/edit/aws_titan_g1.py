@@ -1,15 +1,12 @@
 import base64
-import boto3
 import json
 import os
 from dotenv import load_dotenv
 
+from src.bedrock.client import invoke
 
-load_dotenv()
 
-client = boto3.client(
-    service_name="bedrock-runtime", region_name=os.getenv("AWS_REGION")
-)
+load_dotenv()
 
 image_file_path = "images/titan_g1_image.png"
 with open(image_file_path, "rb") as file:
@@ -34,14 +31,7 @@ titan_g1_image_edit_config = json.dumps(
     }
 )
 
-response = client.invoke_model(
-    body=titan_g1_image_edit_config,
-    modelId=os.getenv("IMAGE_MODEL_ID"),
-    accept="application/json",
-    contentType="application/json",
-)
-
-response_body = json.loads(response.get("body").read())
+response_body = invoke(os.getenv("IMAGE_MODEL_ID"), titan_g1_image_edit_config)
 base64_image = response_body.get("images")[0]
 base64_bytes = base64_image.encode("ascii")
 image_bytes = base64.b64decode(base64_bytes)
@@ -6,6 +6,12 @@ This script demonstrates:
 - Wiring a retriever -> prompt -> model -> output parser chain (LCEL)
 - Printing the final answer and the retrieved sources
 
+Embeddings go through the shared embedding cache (src/embeddings/cache.py), so
+re-running the example does not re-embed the corpus.
+
+Run from the repository root:
+    python -m src.langchain.basic_rag --question "..."
+
 Required env vars:
 - AWS_REGION
 - MODEL_ID          (LLM for generation)
@@ -16,7 +22,6 @@ import argparse
 import os
 from typing import Iterable
 
-import boto3
 from dotenv import load_dotenv
 
 from langchain_aws import BedrockEmbeddings
@@ -27,6 +32,10 @@ from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableLambda, RunnablePassthrough
 
+from src.bedrock.client import get_runtime_client
+from src.embeddings.cache import CachedEmbeddings, EmbeddingCache
+from src.embeddings.parallel import ConcurrentEmbeddings
+
 
 load_dotenv()
 
@@ -42,15 +51,27 @@ def require_env(var_name: str) -> str:
     return value
 
 
-def build_bedrock() -> tuple[LLM, BedrockEmbeddings]:
-    """Initialize Bedrock runtime client, LLM and Embeddings."""
+def build_bedrock() -> tuple[LLM, CachedEmbeddings]:
+    """Initialize Bedrock runtime client, LLM and (cached) Embeddings."""
     region = require_env("AWS_REGION")
     model_id = require_env("MODEL_ID")
     embed_model_id = require_env("EMBED_MODEL_ID")
 
-    client = boto3.client(service_name="bedrock-runtime", region_name=region)
+    # LangChain calls the SDK itself, bypassing the BedrockClient wrapper, so
+    # it gets the shared pooled client that keeps botocore's retries
+    # (src/bedrock/client.py); embedding calls still go through the wrapper's
+    # per-model rate limiter via ConcurrentEmbeddings
+    client = get_runtime_client(region)
     llm = LLM(model_id=model_id, client=client)
-    embeddings = BedrockEmbeddings(model_id=embed_model_id, client=client)
+    # Cache misses are embedded concurrently (see src/embeddings/parallel.py)
+    embeddings = CachedEmbeddings(
+        ConcurrentEmbeddings.from_env(
+            BedrockEmbeddings(model_id=embed_model_id, client=client),
+            model_id=embed_model_id,
+        ),
+        model_id=embed_model_id,
+        cache=EmbeddingCache.from_env(),
+    )
     return llm, embeddings
 
 
@@ -97,7 +118,7 @@ def build_corpus() -> list[Document]:
     return [Document(page_content=txt, metadata=meta) for txt, meta in examples]
 
 
-def build_vector_store(embeddings: BedrockEmbeddings) -> FAISS:
+def build_vector_store(embeddings: CachedEmbeddings) -> FAISS:
     """Create a FAISS vector store from the demo corpus."""
     docs = build_corpus()
     return FAISS.from_documents(docs, embedding=embeddings)
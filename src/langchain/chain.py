@@ -1,15 +1,15 @@
-import boto3
 import os
 from dotenv import load_dotenv
 
 from langchain_aws import BedrockLLM as LLM
 from langchain_core.prompts import PromptTemplate
 
+from src.bedrock.client import get_runtime_client
+
 load_dotenv()
 
-client = boto3.client(
-    service_name="bedrock-runtime", region_name=os.getenv("AWS_REGION")
-)
+# LangChain calls the SDK itself, so use the client that keeps botocore's retries
+client = get_runtime_client()
 
 model_id = os.getenv("MODEL_ID")
 
@@ -0,0 +1,259 @@
+"""Persist a FAISS vector store on disk and keep it in sync incrementally.
+
+An index directory holds three files:
+- index.faiss     the raw FAISS index (memory-mapped on load when supported)
+- index.pkl       the LangChain docstore and id mapping
+- manifest.json   embedding/chunking settings, source file hashes and, per
+                  page, a content hash plus the ids of its chunks
+
+`sync_index` compares the sources against the manifest:
+- every source file hash unchanged -> the saved index is loaded as is
+- a file changed -> only that file is parsed; pages whose content hash changed
+  are re-embedded, their old chunks are deleted from the store
+- a page or a whole file disappeared -> its chunks are deleted
+
+Changing the embedding model or the chunking settings invalidates the whole
+index.
+
+The .pkl file is loaded with pickle, so only load index directories you
+created yourself.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import faiss
+from langchain_community.vectorstores.faiss import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+
+MANIFEST_VERSION = 2
+INDEX_NAME = "index"
+MANIFEST_NAME = "manifest.json"
+
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    """Hash a file in fixed-size blocks so large PDFs are not read at once."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def text_sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def read_manifest(index_dir: str) -> Optional[dict]:
+    """Return the saved manifest, or None when there is no usable one."""
+    try:
+        with open(Path(index_dir) / MANIFEST_NAME, encoding="utf-8") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def load_index(
+    index_dir: str, embeddings: Embeddings, mmap: bool = True
+) -> Optional[FAISS]:
+    """
+    Load the index saved in `index_dir`, or None when there is none.
+
+    With `mmap=True` the FAISS index is memory-mapped read-only, so a read-only
+    store opens without copying the vectors into memory; pass `mmap=False` to
+    get an index that can be updated in place.
+    """
+    path = Path(index_dir)
+    index_file = path / f"{INDEX_NAME}.faiss"
+    docstore_file = path / f"{INDEX_NAME}.pkl"
+    if not index_file.exists() or not docstore_file.exists():
+        return None
+
+    index = None
+    if mmap:
+        try:
+            index = faiss.read_index(
+                str(index_file), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+            )
+        except RuntimeError:
+            # Not every index type can be memory-mapped; fall back to a full read
+            index = None
+    if index is None:
+        index = faiss.read_index(str(index_file))
+
+    with open(docstore_file, "rb") as file:
+        docstore, index_to_docstore_id = pickle.load(file)
+
+    return FAISS(embeddings, index, docstore, index_to_docstore_id)
+
+
+def save_index(vectorstore: FAISS, index_dir: str, manifest: dict) -> None:
+    """
+    Save the vector store and its manifest.
+
+    The manifest is written last (and atomically), so an interrupted save never
+    leaves an index that looks valid.
+    """
+    path = Path(index_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    manifest_path = path / MANIFEST_NAME
+    if manifest_path.exists():
+        manifest_path.unlink()
+
+    vectorstore.save_local(str(path), index_name=INDEX_NAME)
+
+    tmp_path = path / f"{MANIFEST_NAME}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def sync_index(
+    index_dir: str,
+    embeddings: Embeddings,
+    sources: Iterable[str],
+    embed_model_id: str,
+    settings: dict,
+    load_page_chunks: Callable[
+        [list[str]], Iterable[tuple[Document, list[Document]]]
+    ],
+    rebuild: bool = False,
+) -> FAISS:
+    """
+    Bring the index in `index_dir` up to date with `sources` and return it.
+
+    `load_page_chunks` streams (page, chunks of the page) pairs for source
+    files, with "source" and "page" metadata on the page; it is only called
+    for changed files, and only the chunks of pages that are new or whose
+    content changed are kept and embedded.
+    """
+    sources = [str(source) for source in sources]
+    file_hashes = {source: file_sha256(source) for source in sources}
+
+    saved = None if rebuild else read_manifest(index_dir)
+    reason = saved and incompatibility(saved, embed_model_id, settings)
+    if reason:
+        print(f"Index rebuild: {reason}")
+        saved = None
+
+    vectorstore = None
+    if saved:
+        if saved["sources"] == file_hashes:
+            vectorstore = load_index(index_dir, embeddings, mmap=True)
+            if vectorstore is not None:
+                return vectorstore
+            saved = None
+        else:
+            vectorstore = load_index(index_dir, embeddings, mmap=False)
+            if vectorstore is None:
+                print("Index rebuild: index files missing")
+                saved = None
+
+    saved_sources = saved["sources"] if saved else {}
+    saved_pages = saved["pages"] if saved else {}
+    pages: dict[str, dict] = {}
+    pending: list[tuple[str, str, list[Document]]] = []
+
+    changed = []
+    for source in sources:
+        if saved_sources.get(source) == file_hashes[source]:
+            # Unchanged file: keep its pages without parsing it
+            pages.update(
+                {
+                    key: entry
+                    for key, entry in saved_pages.items()
+                    if entry["source"] == source
+                }
+            )
+        else:
+            changed.append(source)
+
+    if changed:
+        # Pages stream in as they are parsed; only changed ones keep their chunks
+        for page, page_chunks in load_page_chunks(changed):
+            key = f"{page.metadata['source']}#{page.metadata.get('page', 0)}"
+            digest = text_sha256(page.page_content)
+            if saved_pages.get(key, {}).get("hash") == digest:
+                pages[key] = saved_pages[key]
+            else:
+                pending.append((key, digest, page_chunks))
+
+    stale_ids = [
+        doc_id
+        for key, entry in saved_pages.items()
+        if pages.get(key) is not entry
+        for doc_id in entry["ids"]
+    ]
+
+    chunks: list[Document] = []
+    chunk_ids: list[str] = []
+    for key, digest, page_chunks in pending:
+        prefix = f"{text_sha256(key)[:16]}-{digest[:16]}"
+        ids = [f"{prefix}-{i}" for i in range(len(page_chunks))]
+        pages[key] = {"source": page_source(key), "hash": digest, "ids": ids}
+        chunks.extend(page_chunks)
+        chunk_ids.extend(ids)
+
+    if vectorstore is not None:
+        stored_ids = set(vectorstore.index_to_docstore_id.values())
+        consistent = stored_ids.issuperset(stale_ids) and stored_ids.isdisjoint(
+            chunk_ids
+        )
+        if not consistent:
+            # Index and manifest disagree (e.g. edited by hand): start over
+            print("Index rebuild: saved index does not match its manifest")
+            return sync_index(
+                index_dir,
+                embeddings,
+                sources,
+                embed_model_id,
+                settings,
+                load_page_chunks,
+                rebuild=True,
+            )
+        if stale_ids:
+            vectorstore.delete(stale_ids)
+        if chunks:
+            vectorstore.add_documents(chunks, ids=chunk_ids)
+    else:
+        if not chunks:
+            raise ValueError("No text found in the sources to index")
+        vectorstore = FAISS.from_documents(chunks, embedding=embeddings, ids=chunk_ids)
+
+    kept = len(pages) - len(pending)
+    print(
+        f"Index sync: {len(pending)} page(s) embedded ({len(chunks)} chunks), "
+        f"{len(stale_ids)} stale chunk(s) removed, {kept} page(s) unchanged"
+    )
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "embed_model_id": embed_model_id,
+        "settings": settings,
+        "sources": file_hashes,
+        "pages": pages,
+    }
+    save_index(vectorstore, index_dir, manifest)
+    return vectorstore
+
+
+def incompatibility(manifest: dict, embed_model_id: str, settings: dict) -> str:
+    """Why a saved index can't be updated in place ("" when it can)."""
+    if manifest.get("version") != MANIFEST_VERSION:
+        return f"manifest version {manifest.get('version')} != {MANIFEST_VERSION}"
+    if manifest.get("embed_model_id") != embed_model_id:
+        return f"embedding model changed to {embed_model_id}"
+    if manifest.get("settings") != settings:
+        return "chunking settings changed"
+    return ""
+
+
+def page_source(key: str) -> str:
+    """Source path of a "<source>#<page>" manifest key."""
+    return key.rsplit("#", 1)[0]
@@ -0,0 +1,191 @@
+"""Parallel PDF ingestion: extract and split pages across a process pool.
+
+Text extraction (pypdf) and splitting are CPU-bound, so PDFs are cut into page
+ranges that worker processes handle independently. Results are yielded in
+document order as soon as each range is done, with only a bounded number of
+ranges in flight, so the embedding stage can start on the first chunks while
+later pages are still being parsed, and memory stays flat for large drops.
+
+- `iter_pages`        one Document per page
+- `iter_chunks`       split chunks, ready to embed
+- `iter_page_chunks`  each page with its chunks (what the incremental indexer
+                      hashes, and embeds when the page changed)
+- `batched`      group a chunk stream into embedding batches
+"""
+
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document
+from pypdf import PdfReader
+
+
+DEFAULT_PAGES_PER_TASK = 16
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def extract_page_range(
+    pdf_path: str, start: int, stop: int
+) -> list[tuple[str, dict]]:
+    """Worker: text and metadata of pages [start, stop) of one PDF."""
+    reader = PdfReader(pdf_path)
+    total_pages = len(reader.pages)
+    # page_labels walks the whole label tree: read it once, not once per page
+    labels = reader.page_labels
+    return [
+        (
+            reader.pages[page].extract_text().strip(),
+            # Same page keys PyPDFLoader sets, so stored documents look alike
+            {
+                "source": pdf_path,
+                "total_pages": total_pages,
+                "page": page,
+                "page_label": labels[page],
+            },
+        )
+        for page in range(start, min(stop, total_pages))
+    ]
+
+
+def split_page_range(
+    pdf_path: str, start: int, stop: int, settings: dict
+) -> list[tuple[str, dict]]:
+    """Worker: extract pages [start, stop) and split them into chunks."""
+    return [
+        chunk
+        for _, _, chunks in split_pages_of_range(pdf_path, start, stop, settings)
+        for chunk in chunks
+    ]
+
+
+def split_pages_of_range(
+    pdf_path: str, start: int, stop: int, settings: dict
+) -> list[tuple[str, dict, list[tuple[str, dict]]]]:
+    """Worker: extract pages [start, stop), each with its own chunks."""
+    splitter = RecursiveCharacterTextSplitter(**settings)
+    results = []
+    for text, metadata in extract_page_range(pdf_path, start, stop):
+        page = Document(page_content=text, metadata=metadata)
+        chunks = splitter.split_documents([page])
+        results.append(
+            (text, metadata, [(chunk.page_content, chunk.metadata) for chunk in chunks])
+        )
+    return results
+
+
+def _page_ranges(pdf_paths: Iterable[str], pages_per_task: int) -> Iterator[tuple]:
+    for pdf_path in pdf_paths:
+        total_pages = len(PdfReader(pdf_path).pages)
+        for start in range(0, total_pages, pages_per_task):
+            yield pdf_path, start, start + pages_per_task
+
+
+def _ordered_map(
+    executor: Optional[Executor],
+    fn: Callable[..., Any],
+    tasks: Iterable[tuple],
+    window: int,
+) -> Iterator[Any]:
+    """
+    Like Executor.map, but submits lazily: at most `window` tasks are queued
+    or running, and results are yielded in task order as they complete.
+    Runs inline when `executor` is None.
+    """
+    if executor is None:
+        for task in tasks:
+            yield fn(*task)
+        return
+
+    pending: deque = deque()
+    for task in tasks:
+        pending.append(executor.submit(fn, *task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _run(
+    fn: Callable[..., list[Any]],
+    pdf_paths: Iterable[str],
+    extra_args: tuple,
+    workers: Optional[int],
+    pages_per_task: int,
+) -> Iterator[Any]:
+    """Run `fn` over the page ranges and yield the items of its results in order."""
+    workers = workers or default_workers()
+    tasks = (
+        (*page_range, *extra_args)
+        for page_range in _page_ranges(pdf_paths, pages_per_task)
+    )
+    if workers <= 1:
+        for result in _ordered_map(None, fn, tasks, window=1):
+            yield from result
+        return
+
+    # Two tasks per worker keeps every process busy while results are consumed
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for result in _ordered_map(executor, fn, tasks, window=workers * 2):
+            yield from result
+
+
+def iter_pages(
+    pdf_paths: Iterable[str],
+    workers: Optional[int] = None,
+    pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+) -> Iterator[Document]:
+    """Yield one Document per PDF page, in order, extracted in parallel."""
+    for text, metadata in _run(
+        extract_page_range, pdf_paths, (), workers, pages_per_task
+    ):
+        yield Document(page_content=text, metadata=metadata)
+
+
+def iter_chunks(
+    pdf_paths: Iterable[str],
+    settings: dict,
+    workers: Optional[int] = None,
+    pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+) -> Iterator[Document]:
+    """
+    Yield split chunks of the PDFs, in order, extracted and split in parallel.
+
+    `settings` are RecursiveCharacterTextSplitter keyword arguments.
+    """
+    for text, metadata in _run(
+        split_page_range, pdf_paths, (settings,), workers, pages_per_task
+    ):
+        yield Document(page_content=text, metadata=metadata)
+
+
+def iter_page_chunks(
+    pdf_paths: Iterable[str],
+    settings: dict,
+    workers: Optional[int] = None,
+    pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+) -> Iterator[tuple[Document, list[Document]]]:
+    """
+    Yield (page, chunks of the page) for every PDF page, in order, extracted
+    and split in parallel (see `iter_chunks` for `settings`).
+    """
+    for text, metadata, chunks in _run(
+        split_pages_of_range, pdf_paths, (settings,), workers, pages_per_task
+    ):
+        yield Document(page_content=text, metadata=metadata), [
+            Document(page_content=chunk_text, metadata=chunk_metadata)
+            for chunk_text, chunk_metadata in chunks
+        ]
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    """Group an iterable into lists of `size` items (the last may be shorter)."""
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
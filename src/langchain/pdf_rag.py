@@ -1,22 +1,52 @@
+"""RAG over a PDF using LangChain + AWS Bedrock.
+
+The FAISS index built from the PDFs is persisted (see index_store.py) and kept
+in sync incrementally: unchanged PDFs are not even parsed, and in a changed PDF
+only the pages whose content changed are re-embedded. PDF pages are extracted
+and split across a process pool (see ingestion.py), for a persisted index as
+for an in-memory one.
+
+Run from the repository root:
+    python -m src.langchain.pdf_rag --question "..." [--pdf a.pdf --pdf b.pdf]
+        [--rebuild] [--workers N] [--chunk-size N]
+
+Required env vars:
+- AWS_REGION
+- MODEL_ID          (LLM for generation)
+- EMBED_MODEL_ID    (model for embeddings)
+"""
+
 import argparse
-import boto3
 import os
 from dotenv import load_dotenv
-from typing import Iterable
+from functools import partial
+from typing import Iterable, Iterator, Optional
 
 from langchain_aws import BedrockEmbeddings
 from langchain_aws import BedrockLLM as LLM
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores.faiss import FAISS
-from langchain_community.document_loaders import PyPDFLoader
 from langchain_core.documents import Document
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableLambda, RunnablePassthrough
 
+from src.bedrock.client import get_runtime_client
+from src.embeddings.cache import CachedEmbeddings, EmbeddingCache
+from src.embeddings.parallel import ConcurrentEmbeddings
+from src.langchain.index_store import sync_index
+from src.langchain.ingestion import batched, iter_chunks, iter_page_chunks
+
 
 load_dotenv()
 
+PDF_PATH = "assets/books.pdf"
+DEFAULT_INDEX_DIR = ".cache/pdf_rag_index"
+# Part of the index manifest: changing them invalidates a saved index
+CHUNK_SETTINGS = {"separators": [". \n"], "chunk_size": 200}
+# Chunks handed to the embedding stage at a time when streaming; large enough
+# to keep every concurrent embedding worker busy
+EMBED_BATCH_SIZE = 256
+
 
 def require_env(var_name: str) -> str:
     """Return the value of an env var or raise with a clear message."""
@@ -29,31 +59,78 @@ def require_env(var_name: str) -> str:
     return value
 
 
-def build_bedrock() -> tuple[LLM, BedrockEmbeddings]:
-    """Initialize Bedrock runtime client, LLM and Embeddings."""
+def build_bedrock() -> tuple[LLM, CachedEmbeddings]:
+    """Initialize Bedrock runtime client, LLM and (cached) Embeddings."""
     region = require_env("AWS_REGION")
     model_id = require_env("MODEL_ID")
     embed_model_id = require_env("EMBED_MODEL_ID")
 
-    client = boto3.client(service_name="bedrock-runtime", region_name=region)
+    # LangChain calls the SDK itself, bypassing the BedrockClient wrapper, so
+    # it gets the shared pooled client that keeps botocore's retries
+    # (src/bedrock/client.py); embedding calls still go through the wrapper's
+    # per-model rate limiter via ConcurrentEmbeddings
+    client = get_runtime_client(region)
     llm = LLM(model_id=model_id, client=client)
-    embeddings = BedrockEmbeddings(model_id=embed_model_id, client=client)
+    # Cache misses are embedded concurrently (see src/embeddings/parallel.py)
+    embeddings = CachedEmbeddings(
+        ConcurrentEmbeddings.from_env(
+            BedrockEmbeddings(model_id=embed_model_id, client=client),
+            model_id=embed_model_id,
+        ),
+        model_id=embed_model_id,
+        cache=EmbeddingCache.from_env(),
+    )
     return llm, embeddings
 
 
-def load_ingestion() -> list[Document]:
-    """Load and ingest the PDF file."""
-    loader = PyPDFLoader("assets/books.pdf")
-    docs = loader.load()
-    splitter = RecursiveCharacterTextSplitter(separators=[". \n"], chunk_size=200)
-    docs = splitter.split_documents(docs)
-    return docs
+def load_ingestion(
+    pdf_paths: Iterable[str] = (PDF_PATH,),
+    settings: dict = CHUNK_SETTINGS,
+    workers: Optional[int] = None,
+) -> Iterator[Document]:
+    """Stream the chunks of the PDF files as worker processes produce them."""
+    return iter_chunks(pdf_paths, settings, workers=workers)
+
+
+def build_vector_store(
+    embeddings: CachedEmbeddings,
+    index_dir: Optional[str] = DEFAULT_INDEX_DIR,
+    rebuild: bool = False,
+    pdf_paths: Iterable[str] = (PDF_PATH,),
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SETTINGS["chunk_size"],
+) -> FAISS:
+    """
+    Load the persisted FAISS index, re-embedding only what changed in the PDFs.
 
+    With `index_dir=None` the index is built in memory and not persisted; chunks
+    are then embedded batch by batch while later pages are still being parsed.
+    """
+    settings = {**CHUNK_SETTINGS, "chunk_size": chunk_size}
 
-def build_vector_store(embeddings: BedrockEmbeddings) -> FAISS:
-    """Create a FAISS vector store from the demo corpus."""
-    docs = load_ingestion()
-    return FAISS.from_documents(docs, embedding=embeddings)
+    if not index_dir:
+        vectorstore = None
+        chunks = load_ingestion(pdf_paths, settings, workers=workers)
+        for batch in batched(chunks, EMBED_BATCH_SIZE):
+            if vectorstore is None:
+                vectorstore = FAISS.from_documents(batch, embedding=embeddings)
+            else:
+                vectorstore.add_documents(batch)
+        if vectorstore is None:
+            raise ValueError("No text found in the PDFs to index")
+        return vectorstore
+
+    return sync_index(
+        index_dir,
+        embeddings,
+        pdf_paths,
+        embed_model_id=embeddings.model_id,
+        settings=settings,
+        load_page_chunks=partial(
+            iter_page_chunks, settings=settings, workers=workers
+        ),
+        rebuild=rebuild,
+    )
 
 
 def format_docs(docs: Iterable[Document]) -> str:
@@ -89,10 +166,24 @@ def build_chain(llm: LLM, vectorstore: FAISS):
     return chain, retriever
 
 
-def run(question: str) -> None:
+def run(
+    question: str,
+    index_dir: Optional[str] = DEFAULT_INDEX_DIR,
+    rebuild: bool = False,
+    pdf_paths: Iterable[str] = (PDF_PATH,),
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SETTINGS["chunk_size"],
+) -> None:
     """Execute the RAG pipeline for a given question and print results."""
     llm, embeddings = build_bedrock()
-    vectorstore = build_vector_store(embeddings)
+    vectorstore = build_vector_store(
+        embeddings,
+        index_dir=index_dir,
+        rebuild=rebuild,
+        pdf_paths=pdf_paths,
+        workers=workers,
+        chunk_size=chunk_size,
+    )
     chain, retriever = build_chain(llm, vectorstore)
 
     answer = chain.invoke(question)
@@ -125,8 +216,43 @@ def main() -> None:
         default="What themes does Gone with the Wind explore?",
         help="User question to answer using RAG",
     )
+    parser.add_argument(
+        "--pdf",
+        action="append",
+        dest="pdf_paths",
+        help=f"PDF file to index, repeatable (default: {PDF_PATH})",
+    )
+    parser.add_argument(
+        "--index-dir",
+        default=DEFAULT_INDEX_DIR,
+        help="Directory of the persisted FAISS index ('' to keep it in memory only)",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Re-embed every PDF even if the saved index is up to date",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes used to extract and split PDF pages (default: CPU count)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=CHUNK_SETTINGS["chunk_size"],
+        help="Maximum characters per chunk",
+    )
     args = parser.parse_args()
-    run(args.question)
+    run(
+        args.question,
+        index_dir=args.index_dir,
+        rebuild=args.rebuild,
+        pdf_paths=args.pdf_paths or [PDF_PATH],
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+    )
 
 
 if __name__ == "__main__":
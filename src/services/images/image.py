@@ -1,22 +1,28 @@
 import boto3
 import json
 import base64
-from time import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional
+
+from src.bedrock.client import get_client
 
 AWS_REGION_BEDROCK = "us-west-2"
 S3_BUCKET = "images-bucket-1503"
+MAX_IMAGES = 5  # Titan Image Generator G1 limit per invocation
 
-client = boto3.client(service_name="bedrock-runtime", region_name=AWS_REGION_BEDROCK)
+bedrock = get_client(AWS_REGION_BEDROCK)
 s3_client = boto3.client(service_name="s3")
 
 
-def get_titan_config(description: str):
+def get_titan_config(description: str, number_of_images: int = 1):
     return json.dumps(
         {
             "taskType": "TEXT_IMAGE",
             "textToImageParams": {"text": description},
             "imageGenerationConfig": {
-                "numberOfImages": 1,
+                "numberOfImages": number_of_images,
                 "height": 512,
                 "width": 512,
                 "cfgScale": 8.0,
@@ -25,10 +31,16 @@ def get_titan_config(description: str):
     )
 
 
+def new_image_key(now: Optional[datetime] = None) -> str:
+    """Unique, sharded (first hex digits of the id) and date-partitioned key."""
+    now = now or datetime.now(timezone.utc)
+    object_id = uuid.uuid4().hex
+    return f"images/{object_id[:2]}/{now:%Y/%m/%d}/{object_id}.jpg"
+
+
 def save_image_to_s3(base64_image: str):
     image_file = base64.b64decode(base64_image)
-    timestamp = int(time())
-    image_name = str(timestamp) + ".jpg"
+    image_name = new_image_key()
 
     s3_client.put_object(
         Bucket=S3_BUCKET,
@@ -44,24 +56,43 @@ def save_image_to_s3(base64_image: str):
     return signed_url
 
 
+def parse_number_of_images(body: dict) -> int:
+    number_of_images = body.get("number_of_images", 1)
+    if (
+        not isinstance(number_of_images, int)
+        or isinstance(number_of_images, bool)
+        or not 1 <= number_of_images <= MAX_IMAGES
+    ):
+        raise ValueError(f"number_of_images must be between 1 and {MAX_IMAGES}")
+    return number_of_images
+
+
 def handler(event, context):
     body = json.loads(event["body"])
     description = body.get("description")
+    try:
+        number_of_images = parse_number_of_images(body)
+    except ValueError as e:
+        return {"statusCode": 400, "body": json.dumps({"error": str(e)})}
     if description:
-        titan_config = get_titan_config(description)
-        response = client.invoke_model(
-            body=titan_config,
-            modelId="amazon.titan-image-generator-v1",
-            accept="application/json",
-            contentType="application/json",
-        )
-        response_body = json.loads(response.get("body").read())
-        base64_image = response_body.get("images")[0]
-        signeg_url = save_image_to_s3(base64_image)
+        titan_config = get_titan_config(description, number_of_images)
+        response_body = bedrock.invoke("amazon.titan-image-generator-v1", titan_config)
+        base64_images = response_body.get("images") or []
+        if not base64_images:
+            return {
+                "statusCode": 502,
+                "body": json.dumps({"error": "No images returned by model"}),
+            }
+        # One invocation, N images: upload them concurrently
+        workers = max(1, min(len(base64_images), MAX_IMAGES))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            signed_urls = list(executor.map(save_image_to_s3, base64_images))
         return {
             "statusCode": 200,
             "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"image_url": signeg_url}),
+            "body": json.dumps(
+                {"image_url": signed_urls[0], "image_urls": signed_urls}
+            ),
         }
     else:
         return {
@@ -1,13 +1,13 @@
-import boto3
 import json
 import os
+from typing import Iterator
 from dotenv import load_dotenv
 
+from src.bedrock.client import get_client
+
 load_dotenv()
 
-client = boto3.client(
-    service_name="bedrock-runtime", region_name=os.getenv("AWS_REGION")
-)
+bedrock = get_client()
 
 
 def get_config(text: str, points: int) -> str:
@@ -25,6 +25,15 @@ def get_config(text: str, points: int) -> str:
     )
 
 
+def stream_summary(text: str, points: int) -> Iterator[str]:
+    """Yield the summary chunk by chunk as Bedrock generates it."""
+    chunks = bedrock.invoke_stream(os.getenv("MODEL_ID"), get_config(text, points))
+    for chunk in chunks:
+        delta = chunk.get("outputText", "")
+        if delta:
+            yield delta
+
+
 # Lambda handler
 # API Gateway event
 def handler(event, context):
@@ -33,13 +42,7 @@ def handler(event, context):
     points = event["queryStringParameters"]["points"]
     if text and points:
         config = get_config(text, points)
-        response = client.invoke_model(
-            modelId=os.getenv("MODEL_ID"),
-            body=config,
-            accept="application/json",
-            contentType="application/json",
-        )
-        response_body = json.loads(response.get("body").read())
+        response_body = bedrock.invoke(os.getenv("MODEL_ID"), config)
         result = response_body.get("results")[0].get("outputText")
         return {
             "statusCode": 200,
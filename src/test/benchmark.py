@@ -0,0 +1,431 @@
+"""Load-generation benchmark of the Lambda handlers against the AWS stand-in.
+
+N virtual users (threads) send requests back to back to each handler:
+
+- summary      infra/services/summary.handler
+- image        infra_images/services/image.handler
+- proxy-text   infra_auth_stack/services/auth.proxy_handler -> HTTP -> summary
+- proxy-image  infra_auth_stack/services/auth.proxy_handler -> HTTP -> image
+
+AWS calls go to the in-process stand-in (src/test/standin) with the given
+latency / throttling behaviour; the proxy paths go through a local HTTP
+server playing API Gateway in front of the backend handler, so the pooled
+keep-alive transport and the JWT check are part of what is measured. The
+handlers' own client-side Bedrock rate limit applies (BEDROCK_DEFAULT_RATE,
+BEDROCK_RATE_LIMITS), as it would in Lambda.
+
+Each handler runs in its own process (fresh imports, cold start measured,
+peak RSS not shared). Results are printed and saved as JSON, and can be
+compared with an earlier run:
+
+    python -m src.test.benchmark --users 16 --requests 400
+    python -m src.test.benchmark --compare benchmarks/<earlier run>.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+ROOT = Path(__file__).resolve().parents[2]
+SERVICE_DIRS = {
+    "summary": ROOT / "infra" / "services",
+    "image": ROOT / "infra_images" / "services",
+    "auth": ROOT / "infra_auth_stack" / "services",
+}
+HANDLERS = ("summary", "image", "proxy-text", "proxy-image")
+
+# Scaled-down but realistically shaped AWS latencies (seconds)
+DEFAULT_BEHAVIOR = (
+    "bedrock-runtime=lognormal:0.2,0.35;"
+    "s3=lognormal:0.015,0.3;"
+    "dynamodb=lognormal:0.004,0.3"
+)
+DEFAULT_OUTPUT_DIR = ROOT / "benchmarks"
+
+API_KEY = "benchmark-api-key"
+JWT_SECRET = "benchmark-jwt-secret-at-least-32-bytes"
+
+TEXT = (
+    "Vincent was a jazzman, a saxophonist with a smooth, soulful sound that "
+    "could melt the coldest of hearts. Mia was an actress, a rising star with a "
+    "talent for drama and a fierce determination to succeed. One night they "
+    "crossed paths at a jazz club in the city, and before long they were "
+    "inseparable, until her career kept her constantly on the road. "
+) * 4
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(p / 100 * len(sorted_values) + 0.5))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize_latencies(latencies_ms: list[float]) -> dict:
+    values = sorted(latencies_ms)
+    return {
+        "mean": round(sum(values) / len(values), 2) if values else 0.0,
+        "p50": round(percentile(values, 50), 2),
+        "p95": round(percentile(values, 95), 2),
+        "p99": round(percentile(values, 99), 2),
+        "max": round(values[-1], 2) if values else 0.0,
+    }
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+# ━━━ events ━━━
+
+
+def summary_event(index: int) -> dict:
+    return {
+        "body": json.dumps({"text": f"{TEXT} (request {index})"}),
+        "queryStringParameters": {"points": "3"},
+    }
+
+
+def image_event(index: int) -> dict:
+    return {
+        "resource": "/image",
+        "body": json.dumps({"description": f"A photo of a cat, variation {index}"}),
+    }
+
+
+def proxy_event(path: str, backend_event: dict, token: str) -> dict:
+    return {
+        "path": path,
+        "httpMethod": "POST",
+        "headers": {"Authorization": f"Bearer {token}"},
+        "queryStringParameters": backend_event.get("queryStringParameters"),
+        "body": backend_event["body"],
+    }
+
+
+# ━━━ API Gateway stand-in for the proxy paths ━━━
+
+
+class _ApiGateway(BaseHTTPRequestHandler):
+    """Turns HTTP requests into API Gateway events for a backend handler."""
+
+    protocol_version = "HTTP/1.1"
+    backend: Callable[[dict, object], dict]
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.headers.get("x-api-key") != API_KEY:
+            response = {"statusCode": 403, "body": '{"message": "Forbidden"}'}
+        else:
+            event = {
+                "resource": url.path,
+                "path": url.path,
+                "httpMethod": "POST",
+                "headers": dict(self.headers.items()),
+                "queryStringParameters": dict(parse_qsl(url.query)) or None,
+                "body": body.decode(),
+            }
+            response = self.backend(event, None)
+        payload = response.get("body", "").encode()
+        self.send_response(response["statusCode"])
+        for name, value in (response.get("headers") or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def start_api_gateway(backend: Callable) -> ThreadingHTTPServer:
+    handler = type("ApiGateway", (_ApiGateway,), {"backend": staticmethod(backend)})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ━━━ worker (one handler per process) ━━━
+
+
+def prepare_environment() -> None:
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ.setdefault("S3_BUCKET", "benchmark-images")
+    os.environ.setdefault("SUMMARY_CACHE_TABLE", "benchmark-summary-cache")
+    os.environ.setdefault("IMAGE_CACHE_TABLE", "benchmark-image-cache")
+    os.environ.setdefault("USERS_TABLE", "benchmark-users")
+    os.environ["JWT_SECRET"] = JWT_SECRET
+    os.environ["IMAGE_API_KEY"] = os.environ["TEXT_API_KEY"] = API_KEY
+    for path in SERVICE_DIRS.values():
+        sys.path.insert(0, str(path))
+
+
+def build_target(name: str) -> tuple[Callable[[int], dict], Callable, dict]:
+    """(event factory, handler, import timings) for one benchmarked path."""
+    import_ms = {}
+
+    def timed_import(module: str):
+        start = time.perf_counter()
+        imported = __import__(module)
+        import_ms[module] = round((time.perf_counter() - start) * 1000, 2)
+        return imported
+
+    if name == "summary":
+        return summary_event, timed_import("summary").handler, import_ms
+    if name == "image":
+        return image_event, timed_import("image").handler, import_ms
+
+    backend_name, path = {
+        "proxy-text": ("summary", "/text"),
+        "proxy-image": ("image", "/image"),
+    }[name]
+    backend = timed_import(backend_name).handler
+    gateway = start_api_gateway(backend)
+    url = f"http://127.0.0.1:{gateway.server_address[1]}"
+    os.environ["TEXT_API_URL"] = f"{url}/text"
+    os.environ["IMAGE_API_URL"] = f"{url}/image"
+    auth = timed_import("auth")
+    token = auth.generate_jwt("benchmark", JWT_SECRET)
+    backend_event = summary_event if backend_name == "summary" else image_event
+
+    def event(index: int) -> dict:
+        return proxy_event(f"/proxy{path}", backend_event(index), token)
+
+    return event, auth.proxy_handler, import_ms
+
+
+def drive(
+    handler: Callable, make_event: Callable[[int], dict], users: int, requests: int
+) -> tuple[list[float], int, float]:
+    """Run `requests` calls from `users` threads; (latencies ms, errors, seconds)."""
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+    next_index = iter(range(requests))
+
+    def virtual_user() -> None:
+        nonlocal errors
+        while True:
+            with lock:
+                index = next(next_index, None)
+            if index is None:
+                return
+            event = make_event(index)
+            start = time.perf_counter()
+            try:
+                failed = handler(event, None).get("statusCode", 500) >= 400
+            except Exception:
+                failed = True
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(elapsed)
+                errors += failed
+
+    threads = [threading.Thread(target=virtual_user) for _ in range(users)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - start
+
+
+def run_worker(name: str, args: argparse.Namespace) -> dict:
+    from src.test.standin import StandIn, parse_behaviors
+
+    prepare_environment()
+    standin = StandIn(parse_behaviors(args.behavior, args.seed), args.image_bytes)
+    # Handlers log every request; keep the report readable
+    quiet = contextlib.redirect_stdout(open(os.devnull, "w"))
+    with standin.activate(), quiet:
+        make_event, handler, import_ms = build_target(name)
+
+        # First request pays client creation and connection setup
+        cold, _, _ = drive(handler, lambda i: make_event(-1), 1, 1)
+        if args.warmup:
+            drive(handler, lambda i: make_event(-2 - i), args.users, args.warmup)
+        latencies, errors, seconds = drive(
+            handler, make_event, args.users, args.requests
+        )
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "duration_s": round(seconds, 3),
+        "throughput_rps": round(len(latencies) / seconds, 2) if seconds else 0.0,
+        "latency_ms": summarize_latencies(latencies),
+        "cold_start_ms": round(cold[0], 2),
+        "import_ms": import_ms,
+        "peak_rss_mb": peak_rss_mb(),
+        "aws_calls": dict(sorted(standin.calls.items())),
+    }
+
+
+# ━━━ runner ━━━
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_handler(name: str, argv: list[str]) -> dict:
+    """Benchmark one handler in a fresh interpreter."""
+    with tempfile.TemporaryDirectory() as tmp:
+        result_file = Path(tmp) / "result.json"
+        subprocess.run(
+            [sys.executable, "-m", "src.test.benchmark", *argv]
+            + ["--worker", name, "--result-file", str(result_file)],
+            cwd=ROOT,
+            check=True,
+        )
+        return json.loads(result_file.read_text())
+
+
+def print_report(results: dict) -> None:
+    header = (
+        f"{'handler':<12} {'reqs':>5} {'err':>4} {'rps':>8} {'p50':>8} "
+        f"{'p95':>8} {'p99':>8} {'cold':>8} {'rss MB':>7}"
+    )
+    print(header)
+    print("-" * len(header))
+    for name, r in results["handlers"].items():
+        latency = r["latency_ms"]
+        print(
+            f"{name:<12} {r['requests']:>5} {r['errors']:>4} "
+            f"{r['throughput_rps']:>8.1f} {latency['p50']:>8.1f} "
+            f"{latency['p95']:>8.1f} {latency['p99']:>8.1f} "
+            f"{r['cold_start_ms']:>8.1f} {r['peak_rss_mb']:>7.1f}"
+        )
+
+
+def print_comparison(baseline: dict, results: dict) -> None:
+    """Relative change per handler and metric (latency: lower is better)."""
+    metrics = [
+        ("rps", lambda r: r["throughput_rps"]),
+        ("p50", lambda r: r["latency_ms"]["p50"]),
+        ("p95", lambda r: r["latency_ms"]["p95"]),
+        ("p99", lambda r: r["latency_ms"]["p99"]),
+        ("rss", lambda r: r["peak_rss_mb"]),
+    ]
+    print(
+        f"\nvs {baseline.get('commit') or '?'} ({baseline.get('timestamp', '?')}):"
+    )
+    for name, r in results["handlers"].items():
+        before = baseline.get("handlers", {}).get(name)
+        if before is None:
+            continue
+        changes = []
+        for label, metric in metrics:
+            old, new = metric(before), metric(r)
+            delta = (new - old) / old * 100 if old else 0.0
+            changes.append(f"{label} {old:g} -> {new:g} ({delta:+.1f}%)")
+        print(f"  {name:<12} " + ", ".join(changes))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Lambda handlers")
+    parser.add_argument(
+        "--handlers",
+        default=",".join(HANDLERS),
+        help=f"Comma separated, from {', '.join(HANDLERS)}",
+    )
+    parser.add_argument("--users", type=int, default=8, help="Concurrent users")
+    parser.add_argument("--requests", type=int, default=200, help="Per handler")
+    parser.add_argument(
+        "--warmup", type=int, default=None, help="Unmeasured requests (default: users)"
+    )
+    parser.add_argument(
+        "--behavior",
+        default=os.getenv("STANDIN_BEHAVIOR", DEFAULT_BEHAVIOR),
+        help="Stand-in latency/throttling spec (see src/test/standin)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--image-bytes", type=int, default=256 * 1024)
+    parser.add_argument(
+        "--output", type=Path, default=None, help="Result file (default: benchmarks/)"
+    )
+    parser.add_argument("--compare", type=Path, default=None, help="Earlier result")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.warmup is None:
+        args.warmup = args.users
+
+    if args.worker:
+        args.result_file.write_text(json.dumps(run_worker(args.worker, args)))
+        return
+
+    names = [name.strip() for name in args.handlers.split(",") if name.strip()]
+    unknown = set(names) - set(HANDLERS)
+    if unknown:
+        parser.error(f"Unknown handlers: {', '.join(sorted(unknown))}")
+
+    worker_argv = [
+        f"--users={args.users}",
+        f"--requests={args.requests}",
+        f"--warmup={args.warmup}",
+        f"--behavior={args.behavior}",
+        f"--seed={args.seed}",
+        f"--image-bytes={args.image_bytes}",
+    ]
+    now = datetime.now(timezone.utc)
+    results = {
+        "timestamp": now.isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "config": {
+            "users": args.users,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "behavior": args.behavior,
+            "seed": args.seed,
+            "image_bytes": args.image_bytes,
+        },
+        "handlers": {},
+    }
+    for name in names:
+        print(f"Benchmarking {name}...", file=sys.stderr)
+        results["handlers"][name] = run_handler(name, worker_argv)
+
+    print_report(results)
+    if args.compare:
+        print_comparison(json.loads(args.compare.read_text()), results)
+
+    output = args.output
+    if output is None:
+        stamp = now.strftime("%Y%m%dT%H%M%SZ")
+        output = DEFAULT_OUTPUT_DIR / f"{stamp}-{results['commit'] or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"\nSaved {output}")
+
+
+if __name__ == "__main__":
+    main()
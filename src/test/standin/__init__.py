@@ -0,0 +1,18 @@
+"""Local stand-in for the AWS services the handlers use.
+
+Bedrock runtime, Bedrock agent runtime, S3, DynamoDB and Lambda, in process
+(`StandIn.activate()`) or over HTTP (`python -m src.test.standin.server`),
+with configurable latency and throttling and deterministic payloads, so the
+handlers can be exercised, load-tested and benchmarked offline.
+
+    from src.test.standin import StandIn, parse_behaviors
+
+    standin = StandIn(parse_behaviors("bedrock-runtime=lognormal:0.8,0.35@0.05"))
+    with standin.activate():
+        response = handler(event, context)
+"""
+
+from src.test.standin.behavior import Behavior, Latency
+from src.test.standin.services import StandIn, parse_behaviors
+
+__all__ = ["Behavior", "Latency", "StandIn", "parse_behaviors"]
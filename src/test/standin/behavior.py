@@ -0,0 +1,100 @@
+"""Latency and throttling behaviour of the stand-in services.
+
+A behaviour is configured per service ("bedrock-runtime") and optionally per
+operation ("bedrock-runtime.InvokeModel", which wins over the service). Every
+call first rolls for throttling, then sleeps a latency drawn from the
+distribution, so load tests see realistic tails and retry storms.
+
+Latency specs (seconds):
+    "0.05"                   fixed
+    "uniform:0.02,0.08"      uniform between the two bounds
+    "normal:0.5,0.1"         normal(mean, stddev), clipped at 0
+    "lognormal:0.8,0.35"     lognormal with that median and sigma (long tail)
+"""
+
+import math
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+from botocore.exceptions import ClientError
+
+# Error code and HTTP status each service returns when it throttles
+THROTTLING_ERRORS = {
+    "bedrock-runtime": ("ThrottlingException", 429),
+    "bedrock-agent-runtime": ("ThrottlingException", 429),
+    "s3": ("SlowDown", 503),
+    "dynamodb": ("ThrottlingException", 400),
+    "lambda": ("TooManyRequestsException", 429),
+}
+
+
+class Latency:
+    """A latency distribution, sampled in seconds."""
+
+    KINDS = ("fixed", "uniform", "normal", "lognormal")
+
+    def __init__(self, kind: str = "fixed", *params: float) -> None:
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        self.kind = kind
+        self.params = params or (0.0,)
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        kind, _, params = spec.partition(":")
+        if not params:
+            return cls("fixed", float(kind))
+        return cls(kind, *(float(value) for value in params.split(",")))
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "normal":
+            return max(0.0, rng.gauss(*self.params))
+        median, sigma = self.params
+        return rng.lognormvariate(math.log(median), sigma)
+
+    def __repr__(self) -> str:
+        return f"{self.kind}:{','.join(str(p) for p in self.params)}"
+
+
+class Behavior:
+    """Latency + throttle rate of one service or operation."""
+
+    def __init__(
+        self,
+        latency: Optional[Latency] = None,
+        throttle_rate: float = 0.0,
+        seed: int = 0,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.latency = latency or Latency()
+        self.throttle_rate = throttle_rate
+        self.sleep = sleep
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def before_call(self, service: str, operation: str) -> None:
+        """Raise a throttling error or wait the sampled latency."""
+        with self._lock:
+            throttled = self._rng.random() < self.throttle_rate
+            delay = self.latency.sample(self._rng)
+        if throttled:
+            raise throttling_error(service, operation)
+        if delay > 0:
+            self.sleep(delay)
+
+
+def throttling_error(service: str, operation: str) -> ClientError:
+    code, status = THROTTLING_ERRORS.get(service, ("ThrottlingException", 429))
+    return ClientError(
+        {
+            "Error": {"Code": code, "Message": "Rate exceeded (stand-in)"},
+            "ResponseMetadata": {"HTTPStatusCode": status},
+        },
+        operation,
+    )
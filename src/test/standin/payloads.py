@@ -0,0 +1,172 @@
+"""Deterministic model responses for the stand-in Bedrock.
+
+The same request always gets the same response, so runs are comparable and
+caches behave as they would against the real model:
+
+- embeddings: unit vectors derived from a hash of the input
+- Titan text: canned sentences picked by the prompt hash, with token counts
+- Titan / Stability images: pseudo-random bytes wrapped in JPEG markers,
+  seeded by the request (size configurable, real ones are a few hundred KB)
+- knowledge base answers: canned text with one citation
+"""
+
+import base64
+import hashlib
+import json
+import math
+import random
+import struct
+from typing import Any, Iterator
+
+DEFAULT_IMAGE_BYTES = 256 * 1024
+
+SENTENCES = [
+    "The text describes a sequence of events and the people involved in them.",
+    "Its main point is stated early and developed through concrete examples.",
+    "Several details support the central argument without changing it.",
+    "A turning point changes the situation for everyone involved.",
+    "The outcome depends on choices made under pressure.",
+    "Background information explains why the situation matters.",
+    "The closing part summarizes the consequences and open questions.",
+    "Overall, the tone is measured and the structure easy to follow.",
+]
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, (len(text) + 3) // 4)
+
+
+def seed_of(*parts: Any) -> int:
+    digest = hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def embedding(data: bytes, dimensions: int) -> list[float]:
+    """Unit vector of `dimensions` floats derived from SHA-256 of `data`."""
+    values = []
+    counter = 0
+    while len(values) < dimensions:
+        block = hashlib.sha256(data + struct.pack(">I", counter)).digest()
+        values.extend(b / 127.5 - 1.0 for b in block)
+        counter += 1
+    values = values[:dimensions]
+    norm = math.sqrt(sum(v * v for v in values)) or 1.0
+    return [v / norm for v in values]
+
+
+def titan_text(prompt: str, max_tokens: int = 512) -> str:
+    rng = random.Random(seed_of(prompt))
+    text, budget = [], max_tokens
+    for sentence in rng.sample(SENTENCES, k=rng.randint(3, len(SENTENCES))):
+        cost = estimate_tokens(sentence)
+        if cost > budget:
+            break
+        text.append(f"- {sentence}")
+        budget -= cost
+    return "\n".join(text)
+
+
+def jpeg_bytes(seed: int, size: int) -> bytes:
+    body = random.Random(seed).randbytes(max(0, size - 4))
+    return b"\xff\xd8" + body + b"\xff\xd9"
+
+
+def _text_generation_config(request: dict) -> dict:
+    return request.get("textGenerationConfig") or {}
+
+
+def invoke_model(model_id: str, request: dict, image_bytes: int) -> dict:
+    """Response body of InvokeModel for `model_id`."""
+    if model_id.startswith("amazon.titan-embed-image"):
+        data = request.get("inputImage") or request.get("inputText", "")
+        dimensions = (request.get("embeddingConfig") or {}).get(
+            "outputEmbeddingLength", 1024
+        )
+        return {
+            "embedding": embedding(data.encode(), dimensions),
+            "inputTextTokenCount": estimate_tokens(request.get("inputText", "")),
+        }
+    if model_id.startswith("amazon.titan-embed"):
+        text = request.get("inputText", "")
+        default = 1536 if model_id.startswith("amazon.titan-embed-text-v1") else 1024
+        return {
+            "embedding": embedding(text.encode(), request.get("dimensions", default)),
+            "inputTextTokenCount": estimate_tokens(text),
+        }
+    if model_id.startswith(("amazon.titan-image", "amazon.nova-canvas")):
+        config = request.get("imageGenerationConfig") or {}
+        seed = seed_of(model_id, request)
+        images = [
+            base64.b64encode(jpeg_bytes(seed + i, image_bytes)).decode()
+            for i in range(config.get("numberOfImages", 1))
+        ]
+        return {"images": images, "error": None}
+    if model_id.startswith("stability."):
+        image = jpeg_bytes(seed_of(model_id, request), image_bytes)
+        return {"images": [base64.b64encode(image).decode()], "finish_reasons": [None]}
+
+    # Titan text (and anything else that takes inputText)
+    prompt = request.get("inputText", "")
+    max_tokens = _text_generation_config(request).get("maxTokenCount", 512)
+    output = titan_text(prompt, max_tokens)
+    return {
+        "inputTextTokenCount": estimate_tokens(prompt),
+        "results": [
+            {
+                "tokenCount": estimate_tokens(output),
+                "outputText": output,
+                "completionReason": "FINISH",
+            }
+        ],
+    }
+
+
+def invoke_model_stream(
+    model_id: str, request: dict, image_bytes: int, chunk_chars: int = 24
+) -> Iterator[dict]:
+    """Chunks of InvokeModelWithResponseStream, as Titan text streams them."""
+    response = invoke_model(model_id, request, image_bytes)
+    if "results" not in response:
+        yield response
+        return
+    output = response["results"][0]["outputText"]
+    pieces = [output[i : i + chunk_chars] for i in range(0, len(output), chunk_chars)]
+    for index, piece in enumerate(pieces or [""]):
+        last = index == len(pieces) - 1 or not pieces
+        chunk = {
+            "outputText": piece,
+            "index": index,
+            "totalOutputTextTokenCount": estimate_tokens(output) if last else None,
+            "completionReason": "FINISH" if last else None,
+            "inputTextTokenCount": response["inputTextTokenCount"],
+        }
+        if last:
+            chunk["amazon-bedrock-invocationMetrics"] = {
+                "inputTokenCount": response["inputTextTokenCount"],
+                "outputTokenCount": estimate_tokens(output),
+            }
+        yield chunk
+
+
+def retrieve_and_generate(query: str, knowledge_base_id: str) -> dict:
+    answer = titan_text(query, 200)
+    return {
+        "sessionId": f"standin-{seed_of(query) % 10**12:012d}",
+        "output": {"text": answer},
+        "citations": [
+            {
+                "generatedResponsePart": {"textResponsePart": {"text": answer}},
+                "retrievedReferences": [
+                    {
+                        "content": {"text": SENTENCES[seed_of(query) % len(SENTENCES)]},
+                        "location": {
+                            "type": "S3",
+                            "s3Location": {
+                                "uri": f"s3://{knowledge_base_id or 'kb'}/doc.txt"
+                            },
+                        },
+                    }
+                ],
+            }
+        ],
+    }
@@ -0,0 +1,379 @@
+"""HTTP front end of the stand-in services.
+
+Speaks enough of each AWS wire protocol for unmodified boto3 clients:
+
+- bedrock-runtime        POST /model/{id}/invoke, /invoke-with-response-stream
+                         (application/vnd.amazon.eventstream)
+- bedrock-agent-runtime  POST /retrieveAndGenerate
+- DynamoDB               JSON 1.0 (X-Amz-Target: DynamoDB_20120810.*)
+- Lambda                 POST /2015-03-31/functions/{name}/invocations
+- S3                     path-style PUT / GET / HEAD / DELETE object and
+                         multipart uploads (other sub-resources: 501)
+
+so any process (a handler under test, the benchmark runner, `sam local`) can
+use it through boto3's endpoint override, without code changes:
+
+    python -m src.test.standin.server --port 4566 \\
+        --behavior "bedrock-runtime=lognormal:0.8,0.35@0.05"
+
+    export AWS_ENDPOINT_URL=http://127.0.0.1:4566
+    export AWS_ACCESS_KEY_ID=standin AWS_SECRET_ACCESS_KEY=standin
+"""
+
+import argparse
+import base64
+import json
+import re
+import struct
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+from botocore.exceptions import ClientError
+
+from src.test.standin.services import StandIn, client_error, parse_behaviors
+
+S3_NAMESPACE = "http://s3.amazonaws.com/doc/2006-03-01/"
+DYNAMODB_TARGET = "DynamoDB_20120810."
+DYNAMODB_OPERATIONS = {
+    "GetItem": "get_item",
+    "PutItem": "put_item",
+    "UpdateItem": "update_item",
+    "DeleteItem": "delete_item",
+    "Scan": "scan",
+}
+
+
+def encode_event(payload: bytes, event_type: str = "chunk") -> bytes:
+    """One message of the AWS event stream encoding (CRC-protected frames)."""
+    headers = b""
+    for name, value in (
+        (":event-type", event_type),
+        (":content-type", "application/json"),
+        (":message-type", "event"),
+    ):
+        name_bytes, value_bytes = name.encode(), value.encode()
+        headers += struct.pack(">B", len(name_bytes)) + name_bytes
+        headers += struct.pack(">BH", 7, len(value_bytes)) + value_bytes  # 7: string
+    total = 12 + len(headers) + len(payload) + 4
+    prelude = struct.pack(">II", total, len(headers))
+    message = prelude + struct.pack(">I", zlib.crc32(prelude)) + headers + payload
+    return message + struct.pack(">I", zlib.crc32(message))
+
+
+def s3_xml(root: str, fields: dict) -> bytes:
+    elements = "".join(f"<{k}>{escape(str(v))}</{k}>" for k, v in fields.items())
+    return (
+        f"<?xml version='1.0' encoding='UTF-8'?>"
+        f'<{root} xmlns="{S3_NAMESPACE}">{elements}</{root}>'
+    ).encode()
+
+
+def parse_completed_parts(body: bytes) -> list[dict]:
+    """Parts listed in a CompleteMultipartUpload request body."""
+    parts = []
+    for element in ElementTree.fromstring(body).iter():
+        if element.tag.rpartition("}")[2] != "Part":
+            continue
+        fields = {child.tag.rpartition("}")[2]: child.text for child in element}
+        parts.append({"PartNumber": int(fields["PartNumber"]), "ETag": fields["ETag"]})
+    return parts
+
+
+def decode_aws_chunked(body: bytes) -> bytes:
+    """Payload of an `aws-chunked` body (signed or unsigned, with trailers)."""
+    data, pos = b"", 0
+    while True:
+        end = body.index(b"\r\n", pos)
+        size = int(body[pos:end].split(b";")[0], 16)
+        if size == 0:
+            return data
+        data += body[end + 2 : end + 2 + size]
+        pos = end + 2 + size + 2
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "StandInServer"
+
+    def log_message(self, format, *args):  # quiet by default
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # ━━━ plumbing ━━━
+
+    def _body(self) -> bytes:
+        if "chunked" in self.headers.get("Transfer-Encoding", ""):
+            data = b""
+            while True:
+                size = int(self.rfile.readline().split(b";")[0], 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                data += self.rfile.read(size)
+                self.rfile.readline()
+        else:
+            data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if "aws-chunked" in self.headers.get("Content-Encoding", ""):
+            data = decode_aws_chunked(data)
+        return data
+
+    def _send(
+        self, status: int, body: bytes = b"", headers: Optional[dict] = None
+    ) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _send_json(self, status: int, payload, content_type="application/json"):
+        self._send(status, json.dumps(payload).encode(), {"Content-Type": content_type})
+
+    def _send_error(self, error: ClientError, protocol: str) -> None:
+        code = error.response["Error"]["Code"]
+        message = error.response["Error"].get("Message", "")
+        status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 400)
+        if protocol == "dynamodb":
+            error_type = f"com.amazonaws.dynamodb.v20120810#{code}"
+            self._send_json(
+                status,
+                {"__type": error_type, "message": message},
+                "application/x-amz-json-1.0",
+            )
+        elif protocol == "s3":
+            xml = (
+                f"<?xml version='1.0' encoding='UTF-8'?><Error><Code>{code}</Code>"
+                f"<Message>{escape(message)}</Message></Error>"
+            )
+            self._send(status, xml.encode(), {"Content-Type": "application/xml"})
+        else:
+            self.send_response(status)
+            body = json.dumps({"message": message}).encode()
+            self.send_header("x-amzn-ErrorType", code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def _route(self) -> None:
+        url = urlsplit(self.path)
+        path = url.path
+        target = self.headers.get("X-Amz-Target", "")
+        body = self._body() if self.command in ("POST", "PUT") else b""
+        if target.startswith(DYNAMODB_TARGET):
+            protocol = "dynamodb"
+        elif path.startswith(("/model/", "/retrieveAndGenerate", "/2015-03-31/")):
+            protocol = "rest-json"
+        else:
+            protocol = "s3"
+        try:
+            if protocol == "dynamodb":
+                self._dynamodb(target[len(DYNAMODB_TARGET) :], body)
+            elif path.startswith("/model/"):
+                self._bedrock(path, body)
+            elif path.startswith("/retrieveAndGenerate"):
+                response = self.server.standin.client(
+                    "bedrock-agent-runtime"
+                ).retrieve_and_generate(**json.loads(body))
+                self._send_json(200, response)
+            elif path.startswith("/2015-03-31/functions/"):
+                self._lambda(path, body)
+            else:
+                self._s3(path, parse_qs(url.query, keep_blank_values=True), body)
+        except ClientError as e:
+            self._send_error(e, protocol)
+
+    do_GET = do_PUT = do_POST = do_HEAD = do_DELETE = _route
+
+    # ━━━ services ━━━
+
+    def _dynamodb(self, operation: str, body: bytes) -> None:
+        method = DYNAMODB_OPERATIONS.get(operation)
+        if method is None:
+            raise ClientError(
+                {"Error": {"Code": "UnknownOperationException", "Message": operation}},
+                operation,
+            )
+        client = self.server.standin.client("dynamodb")
+        response = getattr(client, method)(**json.loads(body or b"{}"))
+        self._send_json(200, response, "application/x-amz-json-1.0")
+
+    def _bedrock(self, path: str, body: bytes) -> None:
+        match = re.fullmatch(r"/model/(.+)/(invoke|invoke-with-response-stream)", path)
+        if not match:
+            self._send(404)
+            return
+        model_id, action = unquote(match[1]), match[2]
+        client = self.server.standin.client("bedrock-runtime")
+        if action == "invoke":
+            response = client.invoke_model(modelId=model_id, body=body)
+            self._send(
+                200, response["body"].read(), {"Content-Type": "application/json"}
+            )
+            return
+
+        response = client.invoke_model_with_response_stream(modelId=model_id, body=body)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.amazon.eventstream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for event in response["body"]:
+            payload = json.dumps(
+                {"bytes": base64.b64encode(event["chunk"]["bytes"]).decode()}
+            ).encode()
+            frame = encode_event(payload)
+            self.wfile.write(f"{len(frame):x}\r\n".encode() + frame + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _lambda(self, path: str, body: bytes) -> None:
+        name = unquote(path.split("/")[3])
+        invocation_type = self.headers.get("X-Amz-Invocation-Type", "RequestResponse")
+        response = self.server.standin.client("lambda").invoke(
+            FunctionName=name, InvocationType=invocation_type, Payload=body
+        )
+        payload = response["Payload"].read() if "Payload" in response else b""
+        self._send(response["StatusCode"], payload)
+
+    def _s3(self, path: str, query: dict, body: bytes) -> None:
+        bucket, _, key = path.lstrip("/").partition("/")
+        key = unquote(key)
+        s3 = self.server.standin.client("s3")
+        upload_id = query.get("uploadId", [None])[0]
+        metadata = {
+            name[len("x-amz-meta-") :]: value
+            for name, value in self.headers.items()
+            if name.lower().startswith("x-amz-meta-")
+        }
+        if set(query) - {"uploads", "uploadId", "partNumber", "x-id"}:
+            raise client_error(
+                "NotImplemented",
+                f"Unsupported S3 request: {self.command} ?{'&'.join(query)}",
+                "S3",
+                501,
+            )
+        if self.command == "POST" and "uploads" in query:
+            response = s3.create_multipart_upload(
+                Bucket=bucket,
+                Key=key,
+                Metadata=metadata,
+                ContentType=self.headers.get("Content-Type"),
+            )
+            xml = s3_xml("InitiateMultipartUploadResult", response)
+            self._send(200, xml, {"Content-Type": "application/xml"})
+        elif self.command == "POST" and upload_id:
+            response = s3.complete_multipart_upload(
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parse_completed_parts(body)},
+            )
+            xml = s3_xml("CompleteMultipartUploadResult", response)
+            self._send(200, xml, {"Content-Type": "application/xml"})
+        elif self.command == "PUT" and upload_id:
+            response = s3.upload_part(
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=int(query["partNumber"][0]),
+                Body=body,
+            )
+            self._send(200, headers={"ETag": response["ETag"]})
+        elif self.command == "DELETE" and upload_id:
+            s3.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+            self._send(204)
+        elif self.command == "PUT":
+            response = s3.put_object(
+                Bucket=bucket,
+                Key=key,
+                Body=body,
+                Metadata=metadata,
+                ContentType=self.headers.get("Content-Type"),
+            )
+            self._send(200, headers={"ETag": response["ETag"]})
+        elif self.command == "GET":
+            response = s3.get_object(Bucket=bucket, Key=key)
+            headers = {"Content-Type": response["ContentType"]}
+            headers.update(
+                {f"x-amz-meta-{k}": v for k, v in response["Metadata"].items()}
+            )
+            self._send(200, response["Body"].read(), headers)
+        elif self.command == "HEAD":
+            response = s3.head_object(Bucket=bucket, Key=key)
+            self.send_response(200)
+            self.send_header("Content-Length", str(response["ContentLength"]))
+            for k, v in response["Metadata"].items():
+                self.send_header(f"x-amz-meta-{k}", v)
+            self.end_headers()
+        elif self.command == "DELETE":
+            s3.delete_object(Bucket=bucket, Key=key)
+            self._send(204)
+        else:
+            raise client_error(
+                "NotImplemented", f"Unsupported S3 request: {self.command}", "S3", 501
+            )
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        standin: StandIn,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        verbose: bool = False,
+    ) -> None:
+        super().__init__((host, port), _Handler)
+        self.standin = standin
+        self.verbose = verbose
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> threading.Thread:
+        """Serve from a daemon thread (call `shutdown()` to stop)."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local AWS stand-in over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4566)
+    parser.add_argument(
+        "--behavior",
+        default=None,
+        help='Latency/throttling, e.g. "bedrock-runtime=lognormal:0.8,0.35@0.05" '
+        "(default: STANDIN_BEHAVIOR)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    standin = StandIn.from_env()
+    if args.behavior is not None:
+        standin.behaviors = parse_behaviors(args.behavior, args.seed)
+    server = StandInServer(standin, args.host, args.port, args.verbose)
+    print(f"Stand-in AWS listening on {server.url}")
+    print(f"  export AWS_ENDPOINT_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
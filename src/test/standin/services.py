@@ -0,0 +1,721 @@
+"""In-process stand-ins for bedrock-runtime, bedrock-agent-runtime, S3,
+DynamoDB and Lambda.
+
+`StandIn` holds the state (objects, tables, registered functions) and the
+per-service behaviour; `client()` / `resource()` return fakes with the same
+call signatures and response shapes as the boto3 ones the handlers use.
+`activate()` swaps them in for `boto3.client` / `boto3.resource`, so handlers
+that create their clients on first use run unmodified against them.
+"""
+
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+import uuid
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+import boto3
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.exceptions import ClientError
+from botocore.response import StreamingBody
+
+from src.test.standin import payloads
+from src.test.standin.behavior import Behavior, Latency
+
+# Partition keys tried, in order, for tables nobody declared
+KEY_CANDIDATES = ("cache_key", "job_id", "username", "id", "pk")
+
+# Items per Scan page when the request sets no Limit (DynamoDB stops a page
+# at 1 MB, which is about this many small items)
+SCAN_PAGE_ITEMS = 1000
+
+
+def client_error(code: str, message: str, operation: str, status: int = 400):
+    return ClientError(
+        {
+            "Error": {"Code": code, "Message": message},
+            "ResponseMetadata": {"HTTPStatusCode": status},
+        },
+        operation,
+    )
+
+
+def parse_behaviors(spec: str, seed: int = 0) -> dict[str, Behavior]:
+    """
+    "bedrock-runtime=lognormal:0.8,0.35@0.05;s3=0.02" -> behaviours
+
+    Each entry is `target=latency[@throttle_rate]`; a target is a service or
+    `service.Operation`.
+    """
+    behaviors = {}
+    for index, entry in enumerate(filter(None, map(str.strip, spec.split(";")))):
+        target, _, value = entry.partition("=")
+        latency, _, throttle_rate = value.partition("@")
+        behaviors[target.strip()] = Behavior(
+            Latency.parse(latency or "0"),
+            float(throttle_rate or 0),
+            seed=seed + index,
+        )
+    return behaviors
+
+
+def _streaming_body(data: bytes) -> StreamingBody:
+    return StreamingBody(io.BytesIO(data), len(data))
+
+
+class StandIn:
+    """Shared state and behaviour of every stand-in service."""
+
+    def __init__(
+        self,
+        behaviors: Optional[dict[str, Behavior]] = None,
+        image_bytes: int = payloads.DEFAULT_IMAGE_BYTES,
+    ) -> None:
+        self.behaviors = dict(behaviors or {})
+        self.image_bytes = image_bytes
+        self.objects: dict[tuple[str, str], dict] = {}
+        self.uploads: dict[str, dict] = {}
+        self.tables: dict[str, dict] = {}
+        self.key_schema: dict[str, str] = {}
+        self.functions: dict[str, Callable] = {}
+        self.invocations: list[dict] = []
+        self.calls: Counter = Counter()
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_env(cls) -> "StandIn":
+        """
+        STANDIN_BEHAVIOR: see parse_behaviors (default: no latency, no throttling)
+        STANDIN_SEED: seed of the latency / throttling draws (default 0)
+        STANDIN_IMAGE_BYTES: size of each generated image (default 256 KiB)
+        """
+        seed = int(os.getenv("STANDIN_SEED", "0"))
+        return cls(
+            behaviors=parse_behaviors(os.getenv("STANDIN_BEHAVIOR", ""), seed),
+            image_bytes=int(
+                os.getenv("STANDIN_IMAGE_BYTES", str(payloads.DEFAULT_IMAGE_BYTES))
+            ),
+        )
+
+    def call(self, service: str, operation: str) -> None:
+        """Count the call and apply its behaviour (may sleep or throttle)."""
+        with self._lock:
+            self.calls[f"{service}.{operation}"] += 1
+        behavior = self.behaviors.get(f"{service}.{operation}")
+        if behavior is None:
+            behavior = self.behaviors.get(service)
+        if behavior is not None:
+            behavior.before_call(service, operation)
+
+    # ━━━ DynamoDB state ━━━
+
+    def create_table(self, name: str, key: str) -> None:
+        with self._lock:
+            self.key_schema[name] = key
+            self.tables.setdefault(name, {})
+
+    def _table_key(self, table: str, item_or_key: dict) -> tuple[dict, Any]:
+        with self._lock:
+            key = self.key_schema.get(table)
+            if key is None:
+                key = next(
+                    (k for k in KEY_CANDIDATES if k in item_or_key),
+                    next(iter(item_or_key)),
+                )
+                self.key_schema[table] = key
+            return self.tables.setdefault(table, {}), item_or_key[key]
+
+    # ━━━ Lambda state ━━━
+
+    def register_function(self, name: str, handler: Callable) -> None:
+        """Run `handler(event, context)` when function `name` is invoked."""
+        self.functions[name] = handler
+
+    # ━━━ boto3 factories ━━━
+
+    def client(self, service_name: str, *args, **kwargs):
+        if service_name not in SERVICES:
+            raise ValueError(f"No stand-in for {service_name}")
+        return SERVICES[service_name](self)
+
+    def resource(self, service_name: str, *args, **kwargs):
+        if service_name != "dynamodb":
+            raise ValueError(f"No stand-in resource for {service_name}")
+        return DynamoDBResource(self)
+
+    @contextmanager
+    def activate(self) -> Iterator["StandIn"]:
+        """
+        Route `boto3.client` / `boto3.resource` to the stand-ins (other
+        services still get real clients). Clients created before activation,
+        e.g. by an already-warm handler module, are not affected.
+        """
+        real_client, real_resource = boto3.client, boto3.resource
+        faked = set(SERVICES)
+
+        def client(*args, **kwargs):
+            name = kwargs.pop("service_name", None) or args[0]
+            if name in faked:
+                return self.client(name)
+            return real_client(name, *args[1:], **kwargs)
+
+        def resource(*args, **kwargs):
+            name = kwargs.pop("service_name", None) or args[0]
+            if name == "dynamodb":
+                return self.resource(name)
+            return real_resource(name, *args[1:], **kwargs)
+
+        boto3.client, boto3.resource = client, resource
+        try:
+            yield self
+        finally:
+            boto3.client, boto3.resource = real_client, real_resource
+
+
+class _Service:
+    service = ""
+
+    def __init__(self, standin: StandIn) -> None:
+        self.standin = standin
+
+    def _call(self, operation: str) -> None:
+        self.standin.call(self.service, operation)
+
+
+class _EventStream:
+    """Iterable of {"chunk": {"bytes": ...}} events, like botocore's EventStream."""
+
+    def __init__(self, chunks: Iterator[dict]) -> None:
+        self._chunks = chunks
+        self.closed = False
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            if self.closed:
+                return
+            yield {"chunk": {"bytes": json.dumps(chunk).encode()}}
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class BedrockRuntime(_Service):
+    service = "bedrock-runtime"
+
+    def _request(self, body, operation: str) -> dict:
+        try:
+            return json.loads(body)
+        except (TypeError, ValueError):
+            raise client_error("ValidationException", "Malformed input", operation)
+
+    def invoke_model(self, modelId: str, body, **kwargs) -> dict:
+        self._call("InvokeModel")
+        request = self._request(body, "InvokeModel")
+        response = payloads.invoke_model(modelId, request, self.standin.image_bytes)
+        data = json.dumps(response).encode()
+        return {"body": _streaming_body(data), "contentType": "application/json"}
+
+    def invoke_model_with_response_stream(self, modelId: str, body, **kwargs) -> dict:
+        self._call("InvokeModelWithResponseStream")
+        request = self._request(body, "InvokeModelWithResponseStream")
+        chunks = payloads.invoke_model_stream(
+            modelId, request, self.standin.image_bytes
+        )
+        return {"body": _EventStream(chunks), "contentType": "application/json"}
+
+
+class BedrockAgentRuntime(_Service):
+    service = "bedrock-agent-runtime"
+
+    def retrieve_and_generate(self, input: dict, **kwargs) -> dict:
+        self._call("RetrieveAndGenerate")
+        config = kwargs.get("retrieveAndGenerateConfiguration") or {}
+        knowledge_base_id = (config.get("knowledgeBaseConfiguration") or {}).get(
+            "knowledgeBaseId", ""
+        )
+        return payloads.retrieve_and_generate(input["text"], knowledge_base_id)
+
+
+class S3(_Service):
+    service = "s3"
+
+    def put_object(
+        self, Bucket: str, Key: str, Body=b"", Metadata=None, ContentType=None, **_
+    ) -> dict:
+        self._call("PutObject")
+        data = Body.read() if hasattr(Body, "read") else Body
+        if isinstance(data, str):
+            data = data.encode()
+        with self.standin._lock:
+            self.standin.objects[(Bucket, Key)] = {
+                "Body": bytes(data),
+                "Metadata": dict(Metadata or {}),
+                "ContentType": ContentType or "binary/octet-stream",
+            }
+        return {"ETag": f'"{payloads.seed_of(Bucket, Key, len(data)):x}"'}
+
+    def upload_fileobj(
+        self, Fileobj, Bucket: str, Key: str, ExtraArgs=None, Config=None, **_
+    ) -> None:
+        self.put_object(Bucket=Bucket, Key=Key, Body=Fileobj, **(ExtraArgs or {}))
+
+    def create_multipart_upload(
+        self, Bucket: str, Key: str, Metadata=None, ContentType=None, **_
+    ) -> dict:
+        self._call("CreateMultipartUpload")
+        upload_id = uuid.uuid4().hex
+        with self.standin._lock:
+            self.standin.uploads[upload_id] = {
+                "Bucket": Bucket,
+                "Key": Key,
+                "Metadata": dict(Metadata or {}),
+                "ContentType": ContentType or "binary/octet-stream",
+                "Parts": {},
+            }
+        return {"Bucket": Bucket, "Key": Key, "UploadId": upload_id}
+
+    def _upload(self, Bucket: str, Key: str, UploadId: str, operation: str) -> dict:
+        upload = self.standin.uploads.get(UploadId)
+        if upload is None or (upload["Bucket"], upload["Key"]) != (Bucket, Key):
+            raise client_error("NoSuchUpload", "Unknown upload id", operation, 404)
+        return upload
+
+    def upload_part(
+        self, Bucket: str, Key: str, UploadId: str, PartNumber: int, Body=b"", **_
+    ) -> dict:
+        self._call("UploadPart")
+        data = Body.read() if hasattr(Body, "read") else Body
+        upload = self._upload(Bucket, Key, UploadId, "UploadPart")
+        etag = f'"{hashlib.md5(data).hexdigest()}"'
+        with self.standin._lock:
+            upload["Parts"][int(PartNumber)] = (etag, bytes(data))
+        return {"ETag": etag}
+
+    def complete_multipart_upload(
+        self, Bucket: str, Key: str, UploadId: str, MultipartUpload=None, **_
+    ) -> dict:
+        """Join the listed parts (which must match the uploaded ones) in order."""
+        self._call("CompleteMultipartUpload")
+        upload = self._upload(Bucket, Key, UploadId, "CompleteMultipartUpload")
+        listed = [
+            (int(part["PartNumber"]), part["ETag"])
+            for part in (MultipartUpload or {}).get("Parts", [])
+        ]
+        if not listed or listed != sorted(listed):
+            raise client_error(
+                "InvalidPartOrder",
+                "Parts must be listed in ascending order",
+                "CompleteMultipartUpload",
+            )
+        parts = upload["Parts"]
+        if any(parts.get(number, (None,))[0] != etag for number, etag in listed):
+            raise client_error(
+                "InvalidPart",
+                "A listed part was not uploaded",
+                "CompleteMultipartUpload",
+            )
+        data = b"".join(parts[number][1] for number, _ in listed)
+        digests = b"".join(bytes.fromhex(etag.strip('"')) for _, etag in listed)
+        etag = f'"{hashlib.md5(digests).hexdigest()}-{len(listed)}"'
+        with self.standin._lock:
+            self.standin.uploads.pop(UploadId, None)
+            self.standin.objects[(Bucket, Key)] = {
+                "Body": data,
+                "Metadata": upload["Metadata"],
+                "ContentType": upload["ContentType"],
+            }
+        return {"Bucket": Bucket, "Key": Key, "ETag": etag}
+
+    def abort_multipart_upload(self, Bucket: str, Key: str, UploadId: str, **_):
+        self._call("AbortMultipartUpload")
+        self._upload(Bucket, Key, UploadId, "AbortMultipartUpload")
+        with self.standin._lock:
+            self.standin.uploads.pop(UploadId, None)
+        return {}
+
+    def _object(self, Bucket: str, Key: str, operation: str) -> dict:
+        obj = self.standin.objects.get((Bucket, Key))
+        if obj is None:
+            raise client_error("NoSuchKey", "Not found", operation, 404)
+        return obj
+
+    def get_object(self, Bucket: str, Key: str, **_) -> dict:
+        self._call("GetObject")
+        obj = self._object(Bucket, Key, "GetObject")
+        return {
+            "Body": _streaming_body(obj["Body"]),
+            "ContentLength": len(obj["Body"]),
+            "ContentType": obj["ContentType"],
+            "Metadata": obj["Metadata"],
+        }
+
+    def head_object(self, Bucket: str, Key: str, **_) -> dict:
+        self._call("HeadObject")
+        obj = self._object(Bucket, Key, "HeadObject")
+        return {"ContentLength": len(obj["Body"]), "Metadata": obj["Metadata"]}
+
+    def delete_object(self, Bucket: str, Key: str, **_) -> dict:
+        self._call("DeleteObject")
+        with self.standin._lock:
+            self.standin.objects.pop((Bucket, Key), None)
+        return {}
+
+    def generate_presigned_url(self, ClientMethod, Params=None, ExpiresIn=3600, **_):
+        # Signed locally, like the real client: no call, no behaviour
+        params = Params or {}
+        return (
+            f"https://{params.get('Bucket')}.s3.amazonaws.com/{params.get('Key')}"
+            f"?X-Amz-Expires={ExpiresIn}&X-Amz-Signature=standin"
+        )
+
+
+# ━━━ DynamoDB ━━━
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def to_plain(typed: dict) -> dict:
+    return {k: _deserializer.deserialize(v) for k, v in typed.items()}
+
+
+def to_typed(plain: dict) -> dict:
+    return {k: _serializer.serialize(v) for k, v in plain.items()}
+
+
+def _normalize(value):
+    """Numbers come back as Decimal, as from the real resource API."""
+    return _deserializer.deserialize(_serializer.serialize(value))
+
+
+def _name(token: str, names: dict) -> str:
+    return names.get(token, token) if token.startswith("#") else token
+
+
+def check_condition(
+    expression: Optional[str], item: Optional[dict], names: dict, values: dict
+) -> bool:
+    """Supports `attribute_(not_)exists(a)` and `a = :v` / `a <> :v`, AND-ed."""
+    if not expression:
+        return True
+    for clause in re.split(r"\s+AND\s+", expression.strip(), flags=re.IGNORECASE):
+        clause = clause.strip()
+        exists = re.fullmatch(r"attribute_(not_)?exists\(\s*([#\w]+)\s*\)", clause)
+        compare = re.fullmatch(r"([#\w]+)\s*(=|<>)\s*(:\w+)", clause)
+        if exists:
+            present = item is not None and _name(exists[2], names) in item
+            if present == bool(exists[1]):
+                return False
+        elif compare:
+            actual = (item or {}).get(_name(compare[1], names))
+            equal = actual == values[compare[3]]
+            if equal != (compare[2] == "="):
+                return False
+        else:
+            raise client_error(
+                "ValidationException", f"Unsupported condition: {clause}", "Condition"
+            )
+    return True
+
+
+def apply_update(expression: str, item: dict, names: dict, values: dict) -> None:
+    """Supports `SET a = :v, #b = :w` and `REMOVE a, #b`."""
+    for action, body in re.findall(
+        r"(SET|REMOVE)\s+(.*?)(?=\s+(?:SET|REMOVE)\s+|$)",
+        expression.strip(),
+        flags=re.IGNORECASE,
+    ):
+        for part in body.split(","):
+            if action.upper() == "SET":
+                target, value = (token.strip() for token in part.split("="))
+                item[_name(target, names)] = _normalize(values[value])
+            else:
+                item.pop(_name(part.strip(), names), None)
+
+
+class _Table:
+    """Plain-value table operations shared by the client and resource APIs."""
+
+    def __init__(self, standin: StandIn, name: str) -> None:
+        self.standin = standin
+        self.name = name
+
+    def get(self, key: dict) -> Optional[dict]:
+        rows, key_value = self.standin._table_key(self.name, key)
+        item = rows.get(key_value)
+        return dict(item) if item is not None else None
+
+    def put(self, item: dict, condition=None, names=None, values=None) -> None:
+        with self.standin._lock:
+            rows, key_value = self.standin._table_key(self.name, item)
+            current = rows.get(key_value)
+            if not check_condition(condition, current, names or {}, values or {}):
+                raise client_error(
+                    "ConditionalCheckFailedException",
+                    "The conditional request failed",
+                    "PutItem",
+                )
+            rows[key_value] = {k: _normalize(v) for k, v in item.items()}
+
+    def update(
+        self, key: dict, update: str, condition=None, names=None, values=None
+    ) -> dict:
+        with self.standin._lock:
+            rows, key_value = self.standin._table_key(self.name, key)
+            current = rows.get(key_value)
+            if not check_condition(condition, current, names or {}, values or {}):
+                raise client_error(
+                    "ConditionalCheckFailedException",
+                    "The conditional request failed",
+                    "UpdateItem",
+                )
+            item = dict(current or key)
+            apply_update(update, item, names or {}, values or {})
+            rows[key_value] = item
+            return dict(item)
+
+    def delete(self, key: dict) -> None:
+        with self.standin._lock:
+            rows, key_value = self.standin._table_key(self.name, key)
+            rows.pop(key_value, None)
+
+    def scan(
+        self,
+        segment: Optional[int] = None,
+        total_segments: Optional[int] = None,
+        start_key: Optional[dict] = None,
+        limit: Optional[int] = None,
+        projection: Optional[str] = None,
+        names: Optional[dict] = None,
+    ) -> tuple[list[dict], Optional[dict]]:
+        """
+        One Scan page: (items, LastEvaluatedKey or None).
+
+        Items are spread over `total_segments` by a hash of their key, and each
+        segment is walked in a fixed order, so parallel segments see every
+        item exactly once and a page resumes right after `start_key`.
+        """
+        if (segment is None) != (total_segments is None) or (
+            total_segments is not None and not 0 <= segment < total_segments
+        ):
+            raise client_error(
+                "ValidationException",
+                "Segment and TotalSegments must be set together, with "
+                "0 <= Segment < TotalSegments",
+                "Scan",
+            )
+        total_segments = total_segments or 1
+        with self.standin._lock:
+            rows = self.standin.tables.get(self.name, {})
+            key_name = self.standin.key_schema.get(self.name)
+            positions = ((_scan_position(key_value), key_value) for key_value in rows)
+            order = sorted(
+                entry
+                for entry in positions
+                if entry[0][0] % total_segments == (segment or 0)
+            )
+            if start_key:
+                # Tables here only have a partition key
+                after = _scan_position(next(iter(start_key.values())))
+                order = [entry for entry in order if entry[0] > after]
+            page = order[: limit or SCAN_PAGE_ITEMS]
+            items = [dict(rows[key_value]) for _, key_value in page]
+        if projection:
+            fields = [_name(f.strip(), names or {}) for f in projection.split(",")]
+            items = [{f: item[f] for f in fields if f in item} for item in items]
+        last_key = {key_name: page[-1][1]} if len(order) > len(page) else None
+        return items, last_key
+
+
+def _scan_position(key_value) -> tuple[int, str]:
+    """Stable sort key of an item in a scan (its hash also picks the segment)."""
+    text = repr(key_value)
+    return zlib.crc32(text.encode()), text
+
+
+def _scan_kwargs(kwargs: dict) -> dict:
+    return {
+        "segment": kwargs.get("Segment"),
+        "total_segments": kwargs.get("TotalSegments"),
+        "limit": kwargs.get("Limit"),
+        "projection": kwargs.get("ProjectionExpression"),
+        "names": kwargs.get("ExpressionAttributeNames"),
+    }
+
+
+class DynamoDBClient(_Service):
+    """Low-level client API (typed attribute values)."""
+
+    service = "dynamodb"
+
+    def get_item(self, TableName: str, Key: dict, **_) -> dict:
+        self._call("GetItem")
+        item = _Table(self.standin, TableName).get(to_plain(Key))
+        return {"Item": to_typed(item)} if item is not None else {}
+
+    def put_item(self, TableName: str, Item: dict, **kwargs) -> dict:
+        self._call("PutItem")
+        _Table(self.standin, TableName).put(
+            to_plain(Item),
+            kwargs.get("ConditionExpression"),
+            kwargs.get("ExpressionAttributeNames"),
+            to_plain(kwargs.get("ExpressionAttributeValues") or {}),
+        )
+        return {}
+
+    def update_item(self, TableName: str, Key: dict, UpdateExpression: str, **kwargs):
+        self._call("UpdateItem")
+        item = _Table(self.standin, TableName).update(
+            to_plain(Key),
+            UpdateExpression,
+            kwargs.get("ConditionExpression"),
+            kwargs.get("ExpressionAttributeNames"),
+            to_plain(kwargs.get("ExpressionAttributeValues") or {}),
+        )
+        if kwargs.get("ReturnValues") == "ALL_NEW":
+            return {"Attributes": to_typed(item)}
+        return {}
+
+    def delete_item(self, TableName: str, Key: dict, **_) -> dict:
+        self._call("DeleteItem")
+        _Table(self.standin, TableName).delete(to_plain(Key))
+        return {}
+
+    def scan(self, TableName: str, **kwargs) -> dict:
+        self._call("Scan")
+        start_key = kwargs.get("ExclusiveStartKey")
+        items, last_key = _Table(self.standin, TableName).scan(
+            start_key=to_plain(start_key) if start_key else None,
+            **_scan_kwargs(kwargs),
+        )
+        response = {
+            "Items": [to_typed(item) for item in items],
+            "Count": len(items),
+            "ScannedCount": len(items),
+        }
+        if last_key is not None:
+            response["LastEvaluatedKey"] = to_typed(last_key)
+        return response
+
+
+class DynamoDBTable(_Service):
+    """`boto3.resource("dynamodb").Table(name)` (plain Python values)."""
+
+    service = "dynamodb"
+
+    def __init__(self, standin: StandIn, name: str) -> None:
+        super().__init__(standin)
+        self.name = name
+        self.table_name = name
+        self._table = _Table(standin, name)
+
+    def get_item(self, Key: dict, **_) -> dict:
+        self._call("GetItem")
+        item = self._table.get(Key)
+        return {"Item": item} if item is not None else {}
+
+    def put_item(self, Item: dict, **kwargs) -> dict:
+        self._call("PutItem")
+        self._table.put(
+            Item,
+            kwargs.get("ConditionExpression"),
+            kwargs.get("ExpressionAttributeNames"),
+            kwargs.get("ExpressionAttributeValues"),
+        )
+        return {}
+
+    def update_item(self, Key: dict, UpdateExpression: str, **kwargs) -> dict:
+        self._call("UpdateItem")
+        item = self._table.update(
+            Key,
+            UpdateExpression,
+            kwargs.get("ConditionExpression"),
+            kwargs.get("ExpressionAttributeNames"),
+            kwargs.get("ExpressionAttributeValues"),
+        )
+        return {"Attributes": item} if kwargs.get("ReturnValues") == "ALL_NEW" else {}
+
+    def delete_item(self, Key: dict, **_) -> dict:
+        self._call("DeleteItem")
+        self._table.delete(Key)
+        return {}
+
+    def scan(self, **kwargs) -> dict:
+        self._call("Scan")
+        items, last_key = self._table.scan(
+            start_key=kwargs.get("ExclusiveStartKey"), **_scan_kwargs(kwargs)
+        )
+        response = {"Items": items, "Count": len(items), "ScannedCount": len(items)}
+        if last_key is not None:
+            response["LastEvaluatedKey"] = last_key
+        return response
+
+
+class DynamoDBResource:
+    def __init__(self, standin: StandIn) -> None:
+        self.standin = standin
+
+    def Table(self, name: str) -> DynamoDBTable:
+        return DynamoDBTable(self.standin, name)
+
+
+class Lambda(_Service):
+    """Runs registered functions; `Event` invocations run in the background."""
+
+    service = "lambda"
+
+    def invoke(
+        self,
+        FunctionName: str,
+        InvocationType: str = "RequestResponse",
+        Payload=b"{}",
+        **_,
+    ) -> dict:
+        self._call("Invoke")
+        event = json.loads(Payload or b"{}")
+        self.standin.invocations.append(
+            {"function": FunctionName, "type": InvocationType, "event": event}
+        )
+        handler = self.standin.functions.get(FunctionName)
+        if handler is None:
+            if InvocationType == "Event":
+                return {"StatusCode": 202}
+            raise client_error(
+                "ResourceNotFoundException",
+                f"Function not found: {FunctionName}",
+                "Invoke",
+                404,
+            )
+        context = _Context(FunctionName)
+        if InvocationType == "Event":
+            threading.Thread(target=handler, args=(event, context), daemon=True).start()
+            return {"StatusCode": 202}
+        result = json.dumps(handler(event, context)).encode()
+        return {"StatusCode": 200, "Payload": _streaming_body(result)}
+
+
+class _Context:
+    """Minimal Lambda context for functions run by the stand-in."""
+
+    def __init__(self, function_name: str) -> None:
+        self.function_name = function_name
+        self.aws_request_id = f"standin-{threading.get_ident()}"
+        self.memory_limit_in_mb = 128
+
+    def get_remaining_time_in_millis(self) -> int:
+        return 30_000
+
+
+SERVICES = {
+    "bedrock-runtime": BedrockRuntime,
+    "bedrock-agent-runtime": BedrockAgentRuntime,
+    "s3": S3,
+    "dynamodb": DynamoDBClient,
+    "lambda": Lambda,
+}
@@ -1,6 +1,14 @@
 import json
+import os
+import sys
+from contextlib import nullcontext
 
-from src.services.text.summary import handler
+from src.test.standin import StandIn
+
+# Runs against the local stand-in; pass --live to call Bedrock
+live = "--live" in sys.argv
+if not live:
+    os.environ.setdefault("MODEL_ID", "amazon.titan-text-express-v1")
 
 event = {
     "body": json.dumps(
@@ -31,6 +39,9 @@ But as their love for each other grew, so did the challenges they faced. Mia's c
     "queryStringParameters": {"points": "3"},
 }
 
-response = handler(event, {})
+with nullcontext() if live else StandIn.from_env().activate():
+    from src.services.text.summary import handler
+
+    response = handler(event, {})
 
 print(response)
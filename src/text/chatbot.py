@@ -1,56 +1,142 @@
-import boto3
+"""Command-line chatbot on a Bedrock text model.
+
+The conversation is kept in a token-budgeted memory (src/text/memory.py): the
+recent turns plus a rolling summary of older ones, so the prompt sent each
+turn stays about the same size however long the session gets.
+
+Replies are streamed and printed as they are generated; press Ctrl+C while a
+reply is printing to stop it (what was received so far is kept in the
+conversation). Use --no-stream to wait for whole replies instead.
+
+Run from the repository root:
+    python -m src.text.chatbot [--no-stream]
+
+Env vars:
+- AWS_REGION
+- MODEL_ID
+- CHAT_MEMORY_TOKENS  (prompt budget for the conversation, default 2000)
+"""
+
+import argparse
 import os
 import json
+from typing import Iterator
 from dotenv import load_dotenv
 from botocore.exceptions import ClientError
 
+from src.bedrock.client import get_client
+from src.text.memory import ConversationMemory, render_turn
+
 load_dotenv()
 
-history = []
+SUMMARY_MAX_TOKENS = 256
+
+
+def invoke(client, model_id, prompt, max_tokens=512):
+    model_response = client.invoke(model_id, get_config(prompt, max_tokens))
+    results = model_response.get("results", [])
+    return results[0].get("outputText", "").strip()
+
+
+def stream(client, model_id, prompt, max_tokens=512) -> Iterator[str]:
+    """Yield the reply chunk by chunk as Bedrock generates it.
 
+    Closing the generator (e.g. on Ctrl+C) closes the response stream, which
+    cancels the rest of the generation.
+    """
+    chunks = client.invoke_stream(model_id, get_config(prompt, max_tokens))
+    try:
+        for chunk in chunks:
+            delta = chunk.get("outputText", "")
+            if delta:
+                yield delta
+    finally:
+        chunks.close()
 
-def get_history():
-    return "\n".join(history)
 
+def print_stream(chunks: Iterator[str]) -> str:
+    """Print chunks as they arrive; return the text, stopping on Ctrl+C."""
+    parts = []
+    try:
+        for delta in chunks:
+            if not parts:
+                delta = delta.lstrip()
+            print(delta, end="", flush=True)
+            parts.append(delta)
+    except KeyboardInterrupt:
+        chunks.close()
+        print(" [interrupted]", end="")
+    print()
+    return "".join(parts).strip()
 
-def get_config():
+
+def get_config(prompt, max_tokens=512):
     return json.dumps(
         {
-            "inputText": get_history(),
+            "inputText": prompt,
             "textGenerationConfig": {
-                "maxTokenCount": 512,
+                "maxTokenCount": max_tokens,
                 "temperature": 0,
             },
         }
     )
 
 
+def summarizer(client, model_id):
+    """Summarize evicted turns with the chat model itself."""
+
+    def summarize(summary, turns):
+        conversation = "\n".join(render_turn(turn) for turn in turns)
+        prompt = (
+            "Update the summary of a conversation with the new messages. "
+            "Keep names, facts and open questions; be brief.\n\n"
+            f"Summary so far: {summary or '(empty)'}\n\n"
+            f"New messages:\n{conversation}\n\n"
+            "Updated summary:"
+        )
+        return invoke(client, model_id, prompt, SUMMARY_MAX_TOKENS)
+
+    return summarize
+
+
 def main():
-    client = boto3.client(
-        service_name="bedrock-runtime", region_name=os.getenv("AWS_REGION")
+    parser = argparse.ArgumentParser(description="Chat with a Bedrock text model")
+    parser.add_argument(
+        "--no-stream",
+        action="store_true",
+        help="Print each reply once it is complete instead of streaming it",
     )
+    args = parser.parse_args()
+
+    client = get_client()
 
     model_id = os.getenv("MODEL_ID")
+    memory = ConversationMemory(
+        max_tokens=int(os.getenv("CHAT_MEMORY_TOKENS", "2000")),
+        summarize=summarizer(client, model_id),
+    )
 
     while True:
         try:
             user_input = input("You: ")
-            if user_input.lower() in ["exit", "quit", "bye"]:
-                break
-            if not user_input.strip():
-                continue
-            history.append("User: " + user_input)
-            response = client.invoke_model(
-                modelId=model_id,
-                body=get_config(),
-                accept="application/json",
-                contentType="application/json",
-            )
-            model_response = json.loads(response["body"].read())
-            results = model_response.get("results", [])
-            output_text = results[0].get("outputText", "").strip()
-            print(output_text)
-            history.append(output_text)
+        except (KeyboardInterrupt, EOFError):
+            print()
+            break
+        if user_input.lower() in ["exit", "quit", "bye"]:
+            break
+        if not user_input.strip():
+            continue
+
+        try:
+            memory.add("User", user_input)
+            prompt = memory.render() + "\nBot:"
+            if args.no_stream:
+                output_text = invoke(client, model_id, prompt)
+                print(output_text)
+            else:
+                output_text = print_stream(stream(client, model_id, prompt))
+            if output_text:
+                memory.add("Bot", output_text)
 
         except (ClientError, Exception) as e:
             print(f"ERROR: Can't invoke '{model_id}'. Reason: {e}")
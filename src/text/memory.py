@@ -0,0 +1,109 @@
+"""Token-budgeted conversation memory with a rolling summary.
+
+The prompt sent each turn is the rolling summary followed by the most recent
+turns, kept under a token budget. When the budget is exceeded, the oldest
+turns are folded into the summary in one call (down to a low-water mark, so
+summarization runs every few turns, not every turn) and the summary is cached
+until the next eviction. The payload per turn therefore stays bounded however
+long the session gets.
+
+Token counts are estimated (Titan has no local tokenizer); pass `count_tokens`
+to use an exact tokenizer.
+"""
+
+from typing import Callable, Optional
+
+
+def estimate_tokens(text: str) -> int:
+    """~4 characters per token, the usual rule of thumb for English text."""
+    return (len(text) + 3) // 4
+
+
+# (role, text), e.g. ("User", "Hi")
+Turn = tuple[str, str]
+
+# (previous summary, turns to fold in) -> new summary
+Summarizer = Callable[[str, list[Turn]], str]
+
+
+def render_turn(turn: Turn) -> str:
+    role, text = turn
+    return f"{role}: {text}"
+
+
+class ConversationMemory:
+    """
+    Rolling summary + recent turns, under `max_tokens`.
+
+    Without a `summarize` function, evicted turns are simply dropped.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 2000,
+        summarize: Optional[Summarizer] = None,
+        low_water_ratio: float = 0.6,
+        min_recent_turns: int = 2,
+        count_tokens: Callable[[str], int] = estimate_tokens,
+    ) -> None:
+        self.max_tokens = max_tokens
+        self.summarize = summarize
+        self.low_water_ratio = low_water_ratio
+        self.min_recent_turns = min_recent_turns
+        self.count_tokens = count_tokens
+        self.summary = ""
+        self.turns: list[Turn] = []
+        self._turn_tokens: list[int] = []
+        self.summaries = 0
+
+    def __len__(self) -> int:
+        return len(self.turns)
+
+    @property
+    def tokens(self) -> int:
+        """Estimated size of the rendered prompt."""
+        return self._summary_tokens() + sum(self._turn_tokens)
+
+    def _summary_tokens(self) -> int:
+        return self.count_tokens(self._render_summary()) if self.summary else 0
+
+    def _render_summary(self) -> str:
+        return f"Summary of the conversation so far: {self.summary}"
+
+    def add(self, role: str, text: str) -> None:
+        """Record a turn, compacting older turns if the budget is exceeded."""
+        turn = (role, text)
+        self.turns.append(turn)
+        self._turn_tokens.append(self.count_tokens(render_turn(turn)))
+        if self.tokens > self.max_tokens:
+            self._compact()
+
+    def _compact(self) -> None:
+        target = int(self.max_tokens * self.low_water_ratio)
+        evict = 0
+        remaining = self.tokens
+        keep = min(self.min_recent_turns, len(self.turns))
+        while evict < len(self.turns) - keep and remaining > target:
+            remaining -= self._turn_tokens[evict]
+            evict += 1
+        if not evict:
+            return
+
+        evicted = self.turns[:evict]
+        if self.summarize is not None:
+            # Summarize before trimming: if the call fails the turns are kept
+            self.summary = self.summarize(self.summary, evicted).strip()
+            self.summaries += 1
+        del self.turns[:evict]
+        del self._turn_tokens[:evict]
+
+    def render(self) -> str:
+        """Prompt text: the summary (if any) followed by the recent turns."""
+        lines = [self._render_summary()] if self.summary else []
+        lines.extend(render_turn(turn) for turn in self.turns)
+        return "\n".join(lines)
+
+    def clear(self) -> None:
+        self.summary = ""
+        self.turns.clear()
+        self._turn_tokens.clear()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Scripts under src/ import each other as `src.<package>.<module>`
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
@@ -0,0 +1,109 @@
+from langchain_core.embeddings import Embeddings
+
+from src.embeddings.cache import CachedEmbeddings, EmbeddingCache, content_key
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self, model_kwargs=None) -> None:
+        self.model_kwargs = model_kwargs
+        self.calls: list[list[str]] = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        self.calls.append([text])
+        return [float(len(text)), 1.0]
+
+
+def test_least_recently_used_vectors_are_evicted(monkeypatch):
+    clock = iter(range(100))
+    monkeypatch.setattr("src.embeddings.cache.time.time", lambda: next(clock))
+    cache = EmbeddingCache(":memory:", max_entries=3)
+    cache.put_many("m", ["a", "b", "c"], [[1.0], [2.0], [3.0]])
+    cache.get("m", "a")  # "b" is now the least recently used
+
+    cache.put("m", "d", [4.0])
+
+    assert len(cache) == 3
+    assert cache.get_many("m", ["a", "b", "c", "d"]) == [[1.0], None, [3.0], [4.0]]
+
+
+def test_count_tracks_replaced_and_new_vectors():
+    cache = EmbeddingCache(":memory:", max_entries=10)
+    cache.put_many("m", ["a", "b"], [[1.0], [2.0]])
+    cache.put_many("m", ["b", "c", "c"], [[5.0], [3.0], [3.0]])
+
+    assert len(cache) == 3
+    assert cache.get("m", "b") == [5.0]
+    (rows,) = cache._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+    assert rows == 3
+
+
+def test_count_survives_reopening(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    EmbeddingCache(path).put_many("m", ["a", "b"], [[1.0], [2.0]])
+
+    assert len(EmbeddingCache(path)) == 2
+
+
+def test_get_or_compute_many_only_computes_misses():
+    cache = EmbeddingCache(":memory:")
+    cache.put("m", "a", [1.0])
+    computed = []
+
+    def compute(text):
+        computed.append(text)
+        return [float(len(text))]
+
+    vectors = cache.get_or_compute_many("m", ["a", "bb", "bb", "ccc"], compute)
+
+    assert vectors == [[1.0], [2.0], [2.0], [3.0]]
+    assert computed == ["bb", "ccc"]
+    assert len(cache) == 3
+
+
+def test_model_kwargs_are_part_of_the_key():
+    assert content_key("m", "text") != content_key("m", "text", {"dimensions": 256})
+    assert content_key("m", "t", {"a": 1, "b": 2}) == content_key(
+        "m", "t", {"b": 2, "a": 1}
+    )
+
+    cache = EmbeddingCache(":memory:")
+    full = CachedEmbeddings(CountingEmbeddings(), "m", cache)
+    small = CachedEmbeddings(CountingEmbeddings({"dimensions": 256}), "m", cache)
+    full.embed_documents(["hello"])
+    small.embed_documents(["hello"])
+
+    assert small.embeddings.calls == [["hello"]]
+    assert len(cache) == 2
+
+
+def test_cached_embeddings_embed_each_missing_text_once():
+    model = CountingEmbeddings()
+    embeddings = CachedEmbeddings(model, "m", EmbeddingCache(":memory:"))
+
+    first = embeddings.embed_documents(["a", "bb", "a"])
+    second = embeddings.embed_documents(["bb", "ccc"])
+
+    assert first == [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0]]
+    assert second == [[2.0, 1.0], [3.0, 1.0]]
+    assert model.calls == [["a", "bb"], ["ccc"]]
+
+
+def test_model_kwargs_are_found_through_wrappers():
+    class Wrapper(Embeddings):
+        def __init__(self, embeddings):
+            self.embeddings = embeddings
+
+        def embed_documents(self, texts):
+            return self.embeddings.embed_documents(texts)
+
+        def embed_query(self, text):
+            return self.embeddings.embed_query(text)
+
+    inner = CountingEmbeddings({"normalize": True})
+    embeddings = CachedEmbeddings(Wrapper(inner), "m", EmbeddingCache(":memory:"))
+
+    assert embeddings.model_kwargs == {"normalize": True}
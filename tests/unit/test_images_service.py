@@ -0,0 +1,82 @@
+import base64
+import json
+import re
+from datetime import datetime, timezone
+
+import pytest
+
+from src.services.images import image
+
+
+class FakeBedrock:
+    def __init__(self, images) -> None:
+        self.images = images
+
+    def invoke(self, model_id, body):
+        return {"images": self.images}
+
+
+class FakeS3:
+    def __init__(self) -> None:
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[Key] = Body
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        return f"https://s3/{Params['Key']}?signed"
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    s3 = FakeS3()
+    monkeypatch.setattr(image, "s3_client", s3)
+    return s3
+
+
+def generate(monkeypatch, images, number_of_images=1):
+    monkeypatch.setattr(image, "bedrock", FakeBedrock(images))
+    event = {
+        "body": json.dumps(
+            {"description": "a red fox", "number_of_images": number_of_images}
+        )
+    }
+    response = image.handler(event, None)
+    return response["statusCode"], json.loads(response["body"])
+
+
+def test_every_image_is_uploaded(monkeypatch, s3):
+    images = [base64.b64encode(f"jpeg-{i}".encode()).decode() for i in range(3)]
+
+    status, body = generate(monkeypatch, images, number_of_images=3)
+
+    assert status == 200
+    assert len(body["image_urls"]) == 3
+    assert body["image_url"] == body["image_urls"][0]
+    assert sorted(s3.objects.values()) == [b"jpeg-0", b"jpeg-1", b"jpeg-2"]
+
+
+@pytest.mark.parametrize("images", [[], None])
+def test_no_images_from_the_model_is_an_error(monkeypatch, s3, images):
+    status, body = generate(monkeypatch, images)
+
+    assert status == 502
+    assert body == {"error": "No images returned by model"}
+    assert s3.objects == {}
+
+
+@pytest.mark.parametrize("number_of_images", [True, False, 0, 6, "2", 1.0])
+def test_invalid_number_of_images_is_rejected(monkeypatch, s3, number_of_images):
+    status, body = generate(monkeypatch, ["aW1n"], number_of_images)
+
+    assert status == 400
+    assert "number_of_images" in body["error"]
+    assert not s3.objects
+
+
+def test_image_keys_are_sharded_and_date_partitioned():
+    key = image.new_image_key(datetime(2024, 3, 9, tzinfo=timezone.utc))
+
+    match = re.fullmatch(r"images/([0-9a-f]{2})/2024/03/09/([0-9a-f]{32})\.jpg", key)
+    assert match and match[2].startswith(match[1])
+    assert image.new_image_key() != image.new_image_key()
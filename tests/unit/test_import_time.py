@@ -0,0 +1,99 @@
+"""
+Cold import time of the Lambda handler modules of every bundle
+
+Each handler module is imported in a fresh interpreter from its bundle's
+services directory, as on a Lambda cold start, and must stay under its budget:
+clients and heavy libraries belong in the code path that uses them, not at
+import time.
+
+Print the report (import time and slowest dependencies per handler):
+    python tests/unit/test_import_time.py
+
+Budgets default to HANDLER_BUDGETS_MS; IMPORT_BUDGET_MS overrides all of them.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# (bundle, handler module) -> cold import budget in milliseconds.
+# infra_auth_stack's auth.py holds both the login and the proxy handler
+HANDLER_BUDGETS_MS = {
+    ("infra", "summary"): 100,
+    ("infra_images", "image"): 100,
+    ("infra_auth_stack", "auth"): 100,
+}
+
+# Environment the handlers read at import time
+HANDLER_ENV = {
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "S3_BUCKET": "test-image-bucket",
+}
+
+RUNS = 3
+
+
+def measure_import(bundle: str, module: str) -> tuple[float, list[tuple[float, str]]]:
+    """
+    Cold import time of `module` from `bundle`/services in ms (best of RUNS
+    fresh interpreters) and its direct imports as (ms, name), slowest first
+    """
+    env = {**os.environ, **HANDLER_ENV}
+    best = None
+    for _ in range(RUNS):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT / bundle / "services",
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        # Lines are in completion order: a module's imports come right before it
+        total, children, pending = None, [], []
+        for line in result.stderr.splitlines():
+            if line.count("|") != 2:
+                continue
+            _, cumulative, name = line.split("|")
+            if not cumulative.strip().isdigit():
+                continue  # header line
+            ms = int(cumulative) / 1000
+            depth = (len(name) - len(name.lstrip())) // 2
+            if depth == 1:
+                pending.append((ms, name.strip()))
+            elif depth == 0:
+                if name.strip() == module:
+                    total, children = ms, pending
+                pending = []
+        if best is None or total < best[0]:
+            best = (total, sorted(children, reverse=True))
+    return best
+
+
+def budget_ms(bundle: str, module: str) -> float:
+    default = HANDLER_BUDGETS_MS[bundle, module]
+    return float(os.environ.get("IMPORT_BUDGET_MS", default))
+
+
+@pytest.mark.parametrize("bundle,module", sorted(HANDLER_BUDGETS_MS))
+def test_handler_cold_import_within_budget(bundle, module):
+    total, children = measure_import(bundle, module)
+    slowest = ", ".join(f"{name} {ms:.0f} ms" for ms, name in children[:5])
+    assert total <= budget_ms(bundle, module), (
+        f"Cold import of {bundle}/{module} took {total:.0f} ms "
+        f"(budget {budget_ms(bundle, module):.0f} ms); slowest imports: {slowest}"
+    )
+
+
+if __name__ == "__main__":
+    for bundle, module in sorted(HANDLER_BUDGETS_MS):
+        total, children = measure_import(bundle, module)
+        budget = budget_ms(bundle, module)
+        print(f"{bundle}/{module}: {total:.1f} ms (budget {budget:.0f} ms)")
+        for ms, name in children[:10]:
+            print(f"  {ms:8.1f} ms  {name}")
@@ -0,0 +1,155 @@
+import hashlib
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.langchain import index_store
+
+SETTINGS = {"chunk_size": 1000, "chunk_overlap": 0}
+
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic vectors; counts the texts it embeds."""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.embedded: list[str] = []
+        self.fail = fail
+
+    def _vector(self, text: str) -> list[float]:
+        digest = hashlib.sha256(text.encode()).digest()
+        return [b / 255 for b in digest[:8]]
+
+    def embed_documents(self, texts):
+        if self.fail:
+            raise ValueError("embedding service rejected the input")
+        self.embedded.extend(texts)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+def load_page_chunks(paths: list[str]):
+    """Pages of a text "document" are separated by form feeds, one chunk per line."""
+    for path in paths:
+        with open(path, encoding="utf-8") as file:
+            pages = file.read().split("\f")
+        for number, text in enumerate(pages):
+            metadata = {"source": path, "page": number}
+            chunks = [
+                Document(page_content=line, metadata=metadata)
+                for line in text.splitlines()
+                if line
+            ]
+            yield Document(page_content=text, metadata=metadata), chunks
+
+
+@pytest.fixture
+def sync(tmp_path):
+    index_dir = str(tmp_path / "index")
+
+    def run(sources, embeddings=None, model="embed-v1", settings=SETTINGS):
+        embeddings = embeddings or FakeEmbeddings()
+        store = index_store.sync_index(
+            index_dir,
+            embeddings,
+            sources,
+            model,
+            settings,
+            load_page_chunks,
+        )
+        return store, embeddings
+
+    return run
+
+
+def write(path, *pages: str) -> str:
+    path.write_text("\f".join(pages), encoding="utf-8")
+    return str(path)
+
+
+def stored_texts(store) -> list[str]:
+    return sorted(
+        store.docstore.search(doc_id).page_content
+        for doc_id in store.index_to_docstore_id.values()
+    )
+
+
+def test_unchanged_sources_are_loaded_without_embedding(sync, tmp_path):
+    source = write(tmp_path / "a.txt", "one\ntwo", "three")
+    sync([source])
+
+    store, embeddings = sync([source])
+
+    assert embeddings.embedded == []
+    assert stored_texts(store) == ["one", "three", "two"]
+
+
+def test_only_changed_pages_are_re_embedded(sync, tmp_path):
+    source = write(tmp_path / "a.txt", "one\ntwo", "three")
+    sync([source])
+
+    write(tmp_path / "a.txt", "one\ntwo", "THREE")
+    store, embeddings = sync([source])
+
+    assert embeddings.embedded == ["THREE"]
+    assert stored_texts(store) == ["THREE", "one", "two"]
+
+
+def test_removed_pages_and_sources_are_deleted(sync, tmp_path):
+    first = write(tmp_path / "a.txt", "one", "two")
+    second = write(tmp_path / "b.txt", "other")
+    sync([first, second])
+
+    write(tmp_path / "a.txt", "one")
+    store, embeddings = sync([first])
+
+    assert embeddings.embedded == []
+    assert stored_texts(store) == ["one"]
+
+
+def test_duplicate_pages_are_indexed_separately(sync, tmp_path):
+    first = write(tmp_path / "a.txt", "same", "same")
+    second = write(tmp_path / "b.txt", "same")
+
+    store, embeddings = sync([first, second])
+    assert stored_texts(store) == ["same"] * 3
+
+    write(tmp_path / "a.txt", "same")
+    store, _ = sync([first, second])
+    assert stored_texts(store) == ["same"] * 2
+
+
+def test_embedding_model_change_rebuilds(sync, tmp_path, capsys):
+    source = write(tmp_path / "a.txt", "one")
+    sync([source])
+
+    _, embeddings = sync([source], model="embed-v2")
+
+    assert embeddings.embedded == ["one"]
+    assert "Index rebuild: embedding model changed" in capsys.readouterr().out
+
+
+def test_index_out_of_sync_with_manifest_rebuilds(sync, tmp_path, capsys):
+    source = write(tmp_path / "a.txt", "one", "two")
+    store, _ = sync([source])
+    # Drop a chunk behind the manifest's back
+    store.delete([next(iter(store.index_to_docstore_id.values()))])
+    index_dir = str(tmp_path / "index")
+    index_store.save_index(store, index_dir, index_store.read_manifest(index_dir))
+
+    write(tmp_path / "a.txt", "ONE", "TWO")
+    store, _ = sync([source])
+
+    assert stored_texts(store) == ["ONE", "TWO"]
+    assert "does not match its manifest" in capsys.readouterr().out
+
+
+def test_embedding_errors_are_not_mistaken_for_a_broken_index(sync, tmp_path):
+    source = write(tmp_path / "a.txt", "one")
+    sync([source])
+
+    write(tmp_path / "a.txt", "changed")
+    with pytest.raises(ValueError, match="rejected"):
+        sync([source], embeddings=FakeEmbeddings(fail=True))
@@ -0,0 +1,96 @@
+import pytest
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from src.langchain import ingestion
+
+SETTINGS = {"separators": [". "], "chunk_size": 20, "chunk_overlap": 0}
+
+
+def write_pdf(path, texts: list[str]) -> str:
+    """A PDF with one line of Helvetica text per page, labelled i, ii, 1, 2..."""
+    writer = PdfWriter()
+    font = DictionaryObject(
+        {
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/Type1"),
+            NameObject("/BaseFont"): NameObject("/Helvetica"),
+        }
+    )
+    for text in texts:
+        page = writer.add_blank_page(400, 200)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})}
+        )
+        content = DecodedStreamObject()
+        content.set_data(f"BT /F1 10 Tf 10 100 Td ({text}) Tj ET".encode())
+        page.replace_contents(content)
+    writer.set_page_label(0, min(1, len(texts) - 1), style="/r")
+    if len(texts) > 2:
+        writer.set_page_label(2, len(texts) - 1, style="/D")
+    with open(path, "wb") as file:
+        writer.write(file)
+    return str(path)
+
+
+@pytest.fixture
+def pdfs(tmp_path):
+    first = write_pdf(
+        tmp_path / "a.pdf",
+        [f"Page {n} of a. It has two sentences" for n in range(5)],
+    )
+    second = write_pdf(tmp_path / "b.pdf", ["Only page of b. Short"])
+    return [first, second]
+
+
+def test_pages_come_in_document_order_with_labels(pdfs):
+    pages = list(ingestion.iter_pages(pdfs, workers=1, pages_per_task=2))
+
+    assert [(p.metadata["source"], p.metadata["page"]) for p in pages] == [
+        (pdfs[0], n) for n in range(5)
+    ] + [(pdfs[1], 0)]
+    assert [p.metadata["page_label"] for p in pages] == [
+        "i", "ii", "1", "2", "3", "i"
+    ]
+    assert pages[3].page_content == "Page 3 of a. It has two sentences"
+    assert pages[3].metadata["total_pages"] == 5
+
+
+def test_worker_pool_matches_inline_run(pdfs):
+    inline = list(ingestion.iter_chunks(pdfs, SETTINGS, workers=1, pages_per_task=2))
+    pooled = list(ingestion.iter_chunks(pdfs, SETTINGS, workers=2, pages_per_task=2))
+
+    assert pooled == inline
+    assert len(inline) > 6
+
+
+def test_page_chunks_match_the_chunk_stream(pdfs):
+    pairs = list(ingestion.iter_page_chunks(pdfs, SETTINGS, workers=2))
+
+    assert [page.metadata["page"] for page, _ in pairs] == [0, 1, 2, 3, 4, 0]
+    assert [chunk for _, chunks in pairs for chunk in chunks] == list(
+        ingestion.iter_chunks(pdfs, SETTINGS, workers=1)
+    )
+    for page, chunks in pairs:
+        assert all(chunk.metadata == page.metadata for chunk in chunks)
+
+
+def test_page_labels_are_read_once_per_task(pdfs, monkeypatch):
+    reads = []
+    page_labels = PdfReader.page_labels
+
+    def counting(reader):
+        reads.append(1)
+        return page_labels.fget(reader)
+
+    monkeypatch.setattr(PdfReader, "page_labels", property(counting))
+
+    list(ingestion.iter_pages(pdfs, workers=1, pages_per_task=2))
+
+    # a.pdf: pages [0, 2), [2, 4), [4, 6); b.pdf: [0, 2)
+    assert len(reads) == 4
+
+
+def test_batched():
+    assert list(ingestion.batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(ingestion.batched([], 3)) == []
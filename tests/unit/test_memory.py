@@ -0,0 +1,102 @@
+import pytest
+
+from src.text.memory import ConversationMemory, estimate_tokens
+
+
+def word_count(text: str) -> int:
+    return len(text.split())
+
+
+class RecordingSummarizer:
+    def __init__(self, fail: bool = False) -> None:
+        self.calls: list[tuple[str, list]] = []
+        self.fail = fail
+
+    def __call__(self, summary, turns):
+        self.calls.append((summary, list(turns)))
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        return f" {summary}+{len(turns)} "
+
+
+def test_turns_under_budget_are_kept_verbatim():
+    memory = ConversationMemory(max_tokens=100, count_tokens=word_count)
+    memory.add("User", "Hi there")
+    memory.add("Bot", "Hello")
+
+    assert memory.render() == "User: Hi there\nBot: Hello"
+    assert memory.tokens == 5
+
+
+def test_compaction_folds_oldest_turns_down_to_the_low_water_mark():
+    summarize = RecordingSummarizer()
+    memory = ConversationMemory(
+        max_tokens=20,
+        summarize=summarize,
+        low_water_ratio=0.5,
+        count_tokens=word_count,
+    )
+    for n in range(5):
+        memory.add("User", f"message {n} with four")  # 5 tokens per turn
+
+    # 25 tokens > 20: evict until <= 10 tokens (summary included) remain
+    evicted = [("User", f"message {n} with four") for n in range(3)]
+    assert summarize.calls == [("", evicted)]
+    assert memory.summary == "+3"
+    assert memory.turns == [("User", f"message {n} with four") for n in (3, 4)]
+    assert memory.summaries == 1
+    assert memory.render().splitlines()[0] == "Summary of the conversation so far: +3"
+    assert memory.tokens <= memory.max_tokens
+
+
+def test_recent_turns_are_kept_even_over_budget():
+    summarize = RecordingSummarizer()
+    memory = ConversationMemory(
+        max_tokens=4, summarize=summarize, min_recent_turns=2, count_tokens=word_count
+    )
+    memory.add("User", "a b c d e")
+    memory.add("Bot", "f g h i j")
+
+    assert summarize.calls == []
+    assert len(memory) == 2
+
+
+def test_turns_are_kept_when_summarizing_fails():
+    memory = ConversationMemory(
+        max_tokens=9,
+        summarize=RecordingSummarizer(fail=True),
+        min_recent_turns=1,
+        count_tokens=word_count,
+    )
+    memory.add("User", "one two three four")
+
+    with pytest.raises(RuntimeError):
+        memory.add("User", "five six seven eight")
+
+    assert memory.turns == [
+        ("User", "one two three four"),
+        ("User", "five six seven eight"),
+    ]
+    assert memory.tokens == 10
+    assert memory.summary == ""
+
+
+def test_without_a_summarizer_old_turns_are_dropped():
+    memory = ConversationMemory(max_tokens=10, count_tokens=word_count)
+    for n in range(6):
+        memory.add("User", f"turn {n} x")
+
+    assert memory.summary == ""
+    assert memory.turns[-1] == ("User", "turn 5 x")
+    assert memory.tokens <= 10
+
+
+def test_clear_and_estimate():
+    memory = ConversationMemory()
+    memory.add("User", "hello")
+    memory.clear()
+
+    assert len(memory) == 0 and memory.tokens == 0
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
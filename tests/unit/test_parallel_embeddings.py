@@ -0,0 +1,123 @@
+import threading
+
+import pytest
+from botocore.exceptions import ClientError
+from langchain_core.embeddings import Embeddings
+
+from src.embeddings.parallel import AdaptiveBackoff, ConcurrentEmbeddings
+
+
+def client_error(code: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": code}}, "InvokeModel")
+
+
+class FlakyEmbeddings(Embeddings):
+    """Raises the queued errors first, then embeds a text as [len(text)]."""
+
+    def __init__(self, errors=()) -> None:
+        self.errors = list(errors)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self._lock:
+            self.calls += 1
+            if self.errors:
+                raise self.errors.pop(0)
+        return [[float(len(text))] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+class RecordingLimiter:
+    def __init__(self) -> None:
+        self.events: list[str] = []
+
+    def acquire(self) -> float:
+        self.events.append("acquire")
+        return 0.0
+
+    def on_throttle(self) -> None:
+        self.events.append("throttle")
+
+    def on_success(self) -> None:
+        self.events.append("success")
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps: list[float] = []
+    monkeypatch.setattr("src.embeddings.parallel.time.sleep", sleeps.append)
+    return sleeps
+
+
+def test_vectors_keep_input_order_across_workers():
+    texts = ["x" * n for n in range(1, 40)]
+    embeddings = ConcurrentEmbeddings(FlakyEmbeddings(), "m", max_workers=8)
+
+    assert embeddings.embed_documents(texts) == [[float(n)] for n in range(1, 40)]
+
+
+def test_texts_per_call_groups_requests():
+    model = FlakyEmbeddings()
+    embeddings = ConcurrentEmbeddings(model, "m", max_workers=2, texts_per_call=4)
+
+    assert len(embeddings.embed_documents(["a"] * 10)) == 10
+    assert model.calls == 3
+
+
+def test_throttled_calls_are_retried_with_backoff(sleeps):
+    model = FlakyEmbeddings([client_error("ThrottlingException")] * 2)
+    limiter = RecordingLimiter()
+    backoff = AdaptiveBackoff(base_delay=0.1)
+    embeddings = ConcurrentEmbeddings(
+        model, "m", max_workers=1, backoff=backoff, limiter=limiter
+    )
+
+    assert embeddings.embed_query("abc") == [3.0]
+    assert model.calls == 3
+    assert limiter.events == [
+        "acquire", "throttle", "acquire", "throttle", "acquire", "success"
+    ]
+    # Waits before the 2nd and 3rd attempts: delay 0.1, then doubled to 0.2
+    assert len(sleeps) == 2
+    assert 0.05 <= sleeps[0] <= 0.1
+    assert 0.1 <= sleeps[1] <= 0.2
+    # The success decayed the shared delay
+    assert backoff.delay == pytest.approx(0.1)
+
+
+def test_other_client_errors_are_not_retried(sleeps):
+    model = FlakyEmbeddings([client_error("ValidationException")])
+    embeddings = ConcurrentEmbeddings(model, "m", max_workers=1)
+
+    with pytest.raises(ClientError, match="ValidationException"):
+        embeddings.embed_documents(["a"])
+    assert model.calls == 1
+    assert sleeps == []
+
+
+def test_gives_up_after_max_retries(sleeps):
+    model = FlakyEmbeddings([client_error("ThrottlingException")] * 10)
+    embeddings = ConcurrentEmbeddings(model, "m", max_workers=1, max_retries=3)
+
+    with pytest.raises(ClientError, match="ThrottlingException"):
+        embeddings.embed_documents(["a"])
+    assert model.calls == 4
+
+
+def test_backoff_doubles_up_to_the_cap_and_decays_to_zero():
+    backoff = AdaptiveBackoff(base_delay=1.0, max_delay=3.0, decay=0.5)
+
+    delays = []
+    for _ in range(3):
+        backoff.on_throttle()
+        delays.append(backoff.delay)
+    assert delays == [1.0, 2.0, 3.0]
+
+    backoff.on_success()
+    backoff.on_success()
+    assert backoff.delay == 0.75
+    backoff.on_success()
+    assert backoff.delay == 0.0
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from src.embeddings.similarity import (
+    SimilarityIndex,
+    _top_k_rows,
+    cosine_similarity,
+    normalize,
+)
+
+
+@pytest.mark.parametrize("k", [1, 5, 49, 50, 80])
+def test_top_k_matches_a_full_sort(k):
+    rng = np.random.default_rng(k)
+    corpus = rng.normal(size=(50, 16))
+    queries = rng.normal(size=(7, 16))
+    index = SimilarityIndex(corpus)
+
+    results = index.top_k_batch(queries, k=k, block_size=3)
+
+    scores = normalize(queries) @ normalize(corpus).T
+    for row, result in zip(scores, results):
+        expected = np.argsort(-row, kind="stable")[:k]
+        assert [label for label, _ in result] == expected.tolist()
+        np.testing.assert_allclose([s for _, s in result], row[expected], atol=1e-6)
+
+
+def test_top_k_rows_orders_ties_by_position():
+    scores = np.array([[0.5, 0.9, 0.5, 0.9, 0.1]], dtype=np.float32)
+
+    assert _top_k_rows(scores, 5).tolist() == [[1, 3, 0, 2, 4]]
+    assert _top_k_rows(scores, 2)[0].tolist() in ([1, 3], [3, 1])
+
+
+def test_scores_are_cosine_similarities():
+    corpus = [[1.0, 0.0], [0.0, 2.0], [1.0, 1.0], [0.0, 0.0]]
+    index = SimilarityIndex(corpus, labels=["x", "y", "xy", "zero"])
+
+    scores = index.scores([3.0, 0.0])
+
+    expected = [cosine_similarity([3.0, 0.0], vector) for vector in corpus]
+    np.testing.assert_allclose(scores, expected, atol=1e-6)
+    assert index.top_k([3.0, 0.0], k=2)[0] == ("x", pytest.approx(1.0))
+
+
+def test_add_checks_dimensions_and_labels():
+    index = SimilarityIndex([[1.0, 0.0]])
+
+    with pytest.raises(ValueError, match="dimension"):
+        index.add([[1.0, 0.0, 0.0]])
+    with pytest.raises(ValueError, match="number of vectors and labels"):
+        index.add([[0.0, 1.0]], labels=["a", "b"])
+
+    index.add([[0.0, 1.0]])
+    assert index.labels == [0, 1]
+
+
+def test_empty_index_returns_no_matches():
+    assert SimilarityIndex().top_k_batch([[1.0], [2.0]], k=3) == [[], []]
@@ -0,0 +1,216 @@
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+import pytest
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from src.test.standin import StandIn
+from src.test.standin.server import StandInServer, decode_aws_chunked
+from src.test.standin.services import apply_update, check_condition
+
+
+@pytest.fixture
+def server():
+    server = StandInServer(StandIn())
+    server.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def real_client(server, service_name, **config):
+    """An unmodified boto3 client talking to the stand-in over HTTP."""
+    return boto3.client(
+        service_name,
+        endpoint_url=server.url,
+        region_name="us-east-1",
+        aws_access_key_id="standin",
+        aws_secret_access_key="standin",
+        config=Config(retries={"max_attempts": 1}, **config),
+    )
+
+
+def test_condition_expressions():
+    item = {"username": "ada", "status": "PENDING"}
+    names = {"#status": "status"}
+    values = {":pending": "PENDING", ":running": "RUNNING"}
+
+    assert check_condition(None, item, names, values)
+    assert check_condition("attribute_not_exists(username)", None, names, values)
+    assert not check_condition("attribute_not_exists(username)", item, {}, {})
+    assert check_condition(
+        "attribute_exists(username) AND #status = :pending", item, names, values
+    )
+    assert not check_condition("#status <> :pending", item, names, values)
+    with pytest.raises(ClientError):
+        check_condition("begins_with(username, :pending)", item, names, values)
+
+
+def test_update_expressions():
+    item = {"job_id": "1", "status": "PENDING", "error": "old"}
+
+    apply_update(
+        "SET #status = :running, updated_at = :now REMOVE error",
+        item,
+        {"#status": "status"},
+        {":running": "RUNNING", ":now": 5},
+    )
+
+    assert item == {"job_id": "1", "status": "RUNNING", "updated_at": 5}
+
+
+def test_aws_chunked_body_is_decoded_with_signatures_and_trailers():
+    body = (
+        b"5;chunk-signature=abc\r\nhello\r\n"
+        b"6;chunk-signature=def\r\n world\r\n"
+        b"0;chunk-signature=ghi\r\nx-amz-checksum-crc32:AAAAAA==\r\n\r\n"
+    )
+    assert decode_aws_chunked(body) == b"hello world"
+
+
+def test_parallel_scan_segments_see_every_item_once():
+    standin = StandIn()
+    standin.create_table("users", "username")
+    table = standin.resource("dynamodb").Table("users")
+    for number in range(250):
+        table.put_item(Item={"username": f"user-{number}", "email": "x"})
+
+    def scan_segment(segment):
+        kwargs = {"Segment": segment, "TotalSegments": 4, "Limit": 30}
+        usernames = []
+        while True:
+            response = table.scan(**kwargs)
+            usernames += [item["username"] for item in response["Items"]]
+            if "LastEvaluatedKey" not in response:
+                return usernames
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    segments = [scan_segment(segment) for segment in range(4)]
+
+    assert all(segments)
+    assert sorted(sum(segments, [])) == sorted(f"user-{n}" for n in range(250))
+    with pytest.raises(ClientError):
+        table.scan(Segment=4, TotalSegments=4)
+
+
+def test_s3_round_trip_over_http(server):
+    s3 = real_client(server, "s3", s3={"addressing_style": "path"})
+
+    s3.put_object(Bucket="b", Key="a/b.txt", Body=b"hello", Metadata={"user": "ada"})
+    response = s3.get_object(Bucket="b", Key="a/b.txt")
+    assert response["Body"].read() == b"hello"
+    assert response["Metadata"] == {"user": "ada"}
+
+    s3.delete_object(Bucket="b", Key="a/b.txt")
+    with pytest.raises(ClientError) as error:
+        s3.get_object(Bucket="b", Key="a/b.txt")
+    assert error.value.response["Error"]["Code"] == "NoSuchKey"
+
+
+def test_s3_multipart_upload_over_http(server):
+    s3 = real_client(server, "s3", s3={"addressing_style": "path"})
+    data = bytes(range(256)) * (10 * 1024 * 1024 // 256)  # 10 MiB: two parts
+
+    s3.upload_fileobj(
+        io.BytesIO(data),
+        "b",
+        "big.jpg",
+        ExtraArgs={"Metadata": {"prompt-hash": "abc"}},
+        Config=TransferConfig(multipart_threshold=8 * 1024 * 1024),
+    )
+
+    assert server.standin.calls["s3.UploadPart"] == 2
+    assert server.standin.calls["s3.CompleteMultipartUpload"] == 1
+    response = s3.get_object(Bucket="b", Key="big.jpg")
+    assert response["Body"].read() == data
+    assert response["Metadata"] == {"prompt-hash": "abc"}
+    assert not server.standin.uploads
+
+
+def test_s3_unsupported_request_is_rejected(server):
+    s3 = real_client(server, "s3", s3={"addressing_style": "path"})
+    with pytest.raises(ClientError) as error:
+        s3.get_object_tagging(Bucket="b", Key="k")
+    assert error.value.response["Error"]["Code"] == "NotImplemented"
+
+
+def test_dynamodb_conditional_writes_over_http(server):
+    dynamodb = real_client(server, "dynamodb")
+    item = {"username": {"S": "ada"}, "status": {"S": "PENDING"}}
+    dynamodb.put_item(
+        TableName="users",
+        Item=item,
+        ConditionExpression="attribute_not_exists(username)",
+    )
+
+    with pytest.raises(ClientError) as error:
+        dynamodb.put_item(
+            TableName="users",
+            Item=item,
+            ConditionExpression="attribute_not_exists(username)",
+        )
+    assert error.value.response["Error"]["Code"] == "ConditionalCheckFailedException"
+
+    claim = {
+        "TableName": "users",
+        "Key": {"username": {"S": "ada"}},
+        "UpdateExpression": "SET #status = :running",
+        "ConditionExpression": "#status = :pending",
+        "ExpressionAttributeNames": {"#status": "status"},
+        "ExpressionAttributeValues": {
+            ":running": {"S": "RUNNING"},
+            ":pending": {"S": "PENDING"},
+        },
+    }
+    dynamodb.update_item(**claim)
+    with pytest.raises(ClientError):
+        dynamodb.update_item(**claim)
+    response = dynamodb.get_item(TableName="users", Key={"username": {"S": "ada"}})
+    assert response["Item"]["status"] == {"S": "RUNNING"}
+
+
+def test_dynamodb_parallel_scan_over_http(server):
+    server.standin.create_table("users", "username")
+    table = server.standin.resource("dynamodb").Table("users")
+    for number in range(40):
+        table.put_item(Item={"username": f"user-{number}", "password_hash": "h"})
+    dynamodb = real_client(server, "dynamodb")
+
+    def scan_segment(segment):
+        paginator = dynamodb.get_paginator("scan")
+        pages = paginator.paginate(
+            TableName="users",
+            Segment=segment,
+            TotalSegments=3,
+            ProjectionExpression="username",
+            PaginationConfig={"PageSize": 5},
+        )
+        return [item for page in pages for item in page["Items"]]
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        items = sum(executor.map(scan_segment, range(3)), [])
+
+    assert sorted(item["username"]["S"] for item in items) == sorted(
+        f"user-{n}" for n in range(40)
+    )
+    assert all(set(item) == {"username"} for item in items)
+
+
+def test_bedrock_response_stream_over_http(server):
+    bedrock = real_client(server, "bedrock-runtime")
+    body = json.dumps({"inputText": "Summarize this", "textGenerationConfig": {}})
+
+    response = bedrock.invoke_model_with_response_stream(
+        modelId="amazon.titan-text-express-v1", body=body
+    )
+    chunks = [json.loads(event["chunk"]["bytes"]) for event in response["body"]]
+
+    whole = bedrock.invoke_model(modelId="amazon.titan-text-express-v1", body=body)
+    expected = json.loads(whole["body"].read())["results"][0]["outputText"]
+    assert len(chunks) > 1
+    assert "".join(chunk["outputText"] for chunk in chunks) == expected
+    assert chunks[-1]["completionReason"] == "FINISH"